@@ -0,0 +1,84 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+import pytest
+
+import tests.testing_medias as tests_medias
+from vikit.common.audio_analysis import (
+    ANALYSIS_SAMPLE_RATE,
+    detect_pauses_async,
+    detect_silences,
+    get_rms_envelope,
+    load_pcm_async,
+)
+
+
+def _create_speech_like_samples(sample_rate: int = ANALYSIS_SAMPLE_RATE):
+    # 1s of tone, 0.5s of silence, 1s of tone, 0.1s of silence, 1s of tone
+    def tone(duration):
+        time = np.arange(int(duration * sample_rate)) / sample_rate
+        return (0.5 * np.sin(2 * np.pi * 440 * time) * 32767).astype(np.int16)
+
+    def silence(duration):
+        return np.zeros(int(duration * sample_rate), dtype=np.int16)
+
+    return np.concatenate([tone(1), silence(0.5), tone(1), silence(0.1), tone(1)])
+
+
+class TestAudioAnalysis:
+
+    @pytest.mark.unit
+    def test_rms_envelope(self):
+        samples = _create_speech_like_samples()
+
+        envelope = get_rms_envelope(samples, ANALYSIS_SAMPLE_RATE, frame_duration=0.02)
+
+        assert len(envelope) == 180
+        # the RMS of a sine wave is its amplitude divided by sqrt(2)
+        assert envelope[10] == pytest.approx(0.5 / np.sqrt(2), rel=0.01)
+        assert envelope[60] == 0
+
+    @pytest.mark.unit
+    def test_only_long_silences_are_detected(self):
+        envelope = get_rms_envelope(_create_speech_like_samples(), ANALYSIS_SAMPLE_RATE)
+
+        assert detect_silences(envelope, min_silence_duration=0.3) == [(1.0, 1.5)]
+        assert detect_silences(envelope, min_silence_duration=0.1) == [
+            (1.0, 1.5),
+            (2.5, 2.6),
+        ]
+
+    @pytest.mark.unit
+    def test_trailing_silence(self):
+        envelope = np.array([0.5, 0.5, 0, 0, 0])
+
+        silences = detect_silences(
+            envelope, frame_duration=0.1, min_silence_duration=0.2
+        )
+        assert silences == [(0.2, 0.5)]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pauses_of_a_recording(self):
+        recording = tests_medias.get_test_prompt_recording_trainboy()
+
+        samples = await load_pcm_async(recording)
+        pauses = await detect_pauses_async(recording, min_silence_duration=0.3)
+
+        assert len(samples) / ANALYSIS_SAMPLE_RATE == pytest.approx(13, abs=0.2)
+        assert len(pauses) > 0
+        # the recording pauses around 4s, between two sentences
+        assert any(start < 4.1 and end > 4.1 for start, end in pauses)
@@ -0,0 +1,130 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+import tests.testing_medias as tests_medias
+from vikit.benchmark import (
+    COMPARED_METRICS,
+    _count_ffmpeg_processes,
+    compare_benchmark_runs,
+    format_comparison,
+    load_benchmark_runs,
+    run_scenario_async,
+    save_benchmark_run,
+)
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
+from vikit.wrappers.ffmpeg_executor import get_ffmpeg_executor
+from vikit.wrappers.ffmpeg_wrapper import clear_media_probe_cache, probe_media
+
+
+def _create_run(label: str, latency: float):
+    return {
+        "label": label,
+        "results": [
+            dict(
+                {metric: 100 for metric in COMPARED_METRICS},
+                scenario="raw_text_videos",
+                latency=latency,
+            )
+        ],
+    }
+
+
+class TestBenchmark:
+
+    @pytest.mark.unit
+    def test_runs_are_stored_and_compared(self):
+        with WorkingFolderContext():
+            save_benchmark_run(_create_run("before", latency=10), "results.json")
+            save_benchmark_run(_create_run("after", latency=5), "results.json")
+
+            before, after = load_benchmark_runs("results.json")
+
+        comparison = compare_benchmark_runs(before, after)
+        assert comparison["raw_text_videos"]["latency"] == {
+            "baseline": 10,
+            "value": 5,
+            "ratio": 0.5,
+        }
+        assert comparison["raw_text_videos"]["ffmpeg_jobs"]["ratio"] == 1
+        assert "raw_text_videos" in format_comparison(comparison)
+
+    @pytest.mark.unit
+    def test_benchmark_runs_without_resource_and_test_modules(self):
+        # resource is not available on Windows, nor the testing tools in the package
+        code = (
+            "import sys\n"
+            "sys.modules['resource'] = None\n"
+            "sys.modules['tests.testing_tools'] = None\n"
+            "import vikit.benchmark as benchmark\n"
+            "assert benchmark._get_peak_rss() == (None, None)\n"
+            "assert benchmark._get_cpu_time() > 0\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+        run = _create_run("windows", latency=5)
+        run["results"][0]["peak_rss"] = None
+        comparison = compare_benchmark_runs(_create_run("linux", latency=10), run)
+        assert comparison["raw_text_videos"]["peak_rss"]["ratio"] is None
+        assert "peak_rss" in format_comparison(comparison)
+
+    @pytest.mark.unit
+    def test_no_stored_runs(self):
+        with WorkingFolderContext():
+            assert load_benchmark_runs("results.json") == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_fake_gateway_latency_is_injected(self):
+        start_time = time.perf_counter()
+        await FakeMLModelsGateway(sleep_time=0.2).get_music_generation_keywords_async(
+            "calm music"
+        )
+        assert time.perf_counter() - start_time >= 0.2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ffmpeg_processes_are_counted_with_or_without_the_executor(self):
+        clear_media_probe_cache()
+        with _count_ffmpeg_processes() as nb_ffmpeg_jobs:
+            probe_media(tests_medias.get_cat_video_path())
+            await get_ffmpeg_executor().run(["ffmpeg", "-version"])
+            subprocess.run([sys.executable, "--version"], capture_output=True)
+
+        assert nb_ffmpeg_jobs == [2]
+        assert subprocess.Popen.__name__ == "Popen"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unknown_scenario(self):
+        with pytest.raises(ValueError):
+            await run_scenario_async("unknown")
+
+    @pytest.mark.local_integration
+    @pytest.mark.asyncio
+    async def test_run_scenario(self):
+        result = await run_scenario_async("raw_text_videos", latency=0.1, nb_videos=2)
+
+        assert result["latency"] > 0.1
+        assert result["ffmpeg_jobs"] > 0
+        assert result["bytes_written"] > 0
+        assert result["peak_rss"] > 0
+        assert result["stages"]["video:build"]["count"] == 3
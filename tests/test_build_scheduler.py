@@ -0,0 +1,107 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import uuid as uid
+
+import pytest
+
+from vikit.video.building.build_scheduler import DependencyGraphScheduler
+
+
+class StubVideo:
+    """
+    Minimal video like object, exposing what the scheduler relies on
+    """
+
+    def __init__(self, build_time: float = 0, dependencies: list = None):
+        self.id = str(uid.uuid4())
+        self.video_dependencies = dependencies if dependencies else []
+        self._is_video_built = False
+        self.build_time = build_time
+
+
+class TestDependencyGraphScheduler:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_dependent_starts_before_unrelated_slow_video_ends(self):
+        slow = StubVideo(build_time=0.5)
+        fast = StubVideo(build_time=0.01)
+        depends_on_fast = StubVideo(build_time=0.01, dependencies=[fast])
+        built_order = []
+
+        async def build(video):
+            await asyncio.sleep(video.build_time)
+            video._is_video_built = True
+            built_order.append(video)
+            return video
+
+        await DependencyGraphScheduler().run([slow, fast, depends_on_fast], build)
+
+        assert built_order == [fast, depends_on_fast, slow]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_max_concurrency_is_respected(self):
+        videos = [StubVideo(build_time=0.02) for _ in range(10)]
+        running = 0
+        max_running = 0
+
+        async def build(video):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(video.build_time)
+            running -= 1
+            video._is_video_built = True
+            return video
+
+        await DependencyGraphScheduler(max_concurrency=3).run(videos, build)
+
+        assert max_running == 3
+        assert all(video._is_video_built for video in videos)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_dependency_cycle_raises(self):
+        first = StubVideo()
+        second = StubVideo(dependencies=[first])
+        first.video_dependencies.append(second)
+
+        async def build(video):
+            video._is_video_built = True
+            return video
+
+        with pytest.raises(ValueError):
+            await DependencyGraphScheduler().run([first, second], build)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_build_error_stops_dependents(self):
+        failing = StubVideo()
+        dependent = StubVideo(dependencies=[failing])
+        built = []
+
+        async def build(video):
+            if video is failing:
+                raise RuntimeError("provider failure")
+            built.append(video)
+            video._is_video_built = True
+            return video
+
+        with pytest.raises(RuntimeError):
+            await DependencyGraphScheduler().run([failing, dependent], build)
+        assert built == []
@@ -31,6 +31,7 @@ from vikit.common.context_managers import WorkingFolderContext
 from vikit.local_engine import LocalEngine
 from vikit.music_building_context import MusicBuildingContext
 from vikit.prompt.prompt_factory import PromptFactory
+from vikit.video.building.edit_decision_list import EditDecisionList
 from vikit.video.composite_video import CompositeVideo
 from vikit.video.imported_video import ImportedVideo
 from vikit.video.raw_text_based_video import RawTextBasedVideo
@@ -471,3 +472,90 @@ class TestCompositeVideo:
             )
             # with pytest.raises(AssertionError):
             await LocalEngine(build_settings=bld_settings).generate(vid_cp_final)
+
+    @pytest.mark.unit
+    def test_edit_decision_list_speed_ratios(self):
+        child_list = EditDecisionList().append_media("a.mp4", duration=4)
+        child_list = child_list.with_speed_ratio(2)
+        edit_decision_list = (
+            EditDecisionList()
+            .append_edit_decision_list(child_list)
+            .append_media("b.mp4", duration=3)
+            .with_speed_ratio(0.5)
+        )
+
+        assert [
+            (segment.media_path, segment.speed_ratio)
+            for segment in edit_decision_list.segments
+        ] == [("a.mp4", 1), ("b.mp4", 0.5)]
+        assert edit_decision_list.get_duration() == 10
+
+    @pytest.mark.local_integration
+    @pytest.mark.asyncio
+    async def test_nested_composites_are_flattened_and_encoded_once(self):
+        with WorkingFolderContext():
+            child_composite = CompositeVideo()
+            child_composite.append_video(
+                ImportedVideo(test_media.get_generated_3s_forest_video_1_path())
+            ).append_video(
+                ImportedVideo(test_media.get_generated_3s_forest_video_2_path())
+            )
+            root_composite = CompositeVideo()
+            root_composite.append_video(child_composite).append_video(
+                ImportedVideo(test_media.get_cat_video_path())
+            )
+
+            await LocalEngine(
+                build_settings=VideoBuildSettings(flatten_composites=True)
+            ).generate_async(root_composite)
+
+            assert child_composite.edit_decision_list is not None
+            assert len(child_composite.edit_decision_list) == 2
+            assert child_composite.media_url is None
+            assert root_composite.media_url is not None
+            assert ffmpegwrapper.get_media_duration(
+                root_composite.media_url
+            ) == pytest.approx(
+                child_composite.edit_decision_list.get_duration()
+                + ffmpegwrapper.get_media_duration(test_media.get_cat_video_path()),
+                abs=1,
+            )
+
+    @pytest.mark.local_integration
+    @pytest.mark.asyncio
+    async def test_flattened_nested_composites_with_ratio_match_concatenation(self):
+        async def build_nested_composite(flatten_composites: bool):
+            child_composite = CompositeVideo()
+            child_composite.append_video(
+                ImportedVideo(test_media.get_generated_3s_forest_video_1_path())
+            ).append_video(
+                ImportedVideo(test_media.get_generated_3s_forest_video_2_path())
+            )
+            root_composite = CompositeVideo()
+            root_composite.append_video(child_composite).append_video(
+                ImportedVideo(test_media.get_generated_3s_forest_video_1_path())
+            )
+            # Every composite is boxed into 5 seconds, so both ratios differ from 1
+            await LocalEngine(
+                build_settings=VideoBuildSettings(
+                    expected_length=5,
+                    cascade_build_settings=True,
+                    flatten_composites=flatten_composites,
+                )
+            ).generate_async(root_composite)
+            return child_composite, root_composite
+
+        with WorkingFolderContext():
+            child_composite, flattened_root = await build_nested_composite(True)
+            assert child_composite.edit_decision_list is not None
+            flattened_duration = ffmpegwrapper.get_media_duration(
+                flattened_root.media_url
+            )
+        with WorkingFolderContext():
+            _, concatenated_root = await build_nested_composite(False)
+            concatenated_duration = ffmpegwrapper.get_media_duration(
+                concatenated_root.media_url
+            )
+
+        assert flattened_duration == pytest.approx(concatenated_duration, abs=0.5)
+        assert flattened_duration == pytest.approx(5, abs=0.5)
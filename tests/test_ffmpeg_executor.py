@@ -0,0 +1,109 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import os
+
+import pytest
+
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.wrappers.ffmpeg_executor import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    FFmpegExecutor,
+)
+
+
+def _append_to_file_command(text: str):
+    return ["sh", "-c", f"echo {text} >> order.txt"]
+
+
+class TestFFmpegExecutor:
+
+    @pytest.mark.unit
+    def test_threads_are_allocated_to_ffmpeg_jobs(self):
+        executor = FFmpegExecutor(max_concurrent_jobs=2, threads_per_job=3)
+
+        assert executor._allocate_threads(
+            ["ffmpeg", "-y", "-i", "in.mp4", "out.mp4"]
+        ) == ["ffmpeg", "-y", "-i", "in.mp4", "-threads", "3", "out.mp4"]
+        assert executor._allocate_threads(["ffprobe", "in.mp4"]) == [
+            "ffprobe",
+            "in.mp4",
+        ]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_jobs_are_bounded_and_started_by_priority(self):
+        with WorkingFolderContext():
+            executor = FFmpegExecutor(max_concurrent_jobs=1, threads_per_job=1)
+
+            running_job = asyncio.create_task(executor.run(["sleep", "0.3"]))
+            await asyncio.sleep(0.05)
+            low_priority_job = asyncio.create_task(
+                executor.run(_append_to_file_command("low"), priority=PRIORITY_LOW)
+            )
+            await asyncio.sleep(0.05)
+            high_priority_job = asyncio.create_task(
+                executor.run(_append_to_file_command("high"), priority=PRIORITY_HIGH)
+            )
+            await asyncio.sleep(0.05)
+            assert executor.queue_depth == 2
+
+            await asyncio.gather(running_job, low_priority_job, high_priority_job)
+
+            with open("order.txt") as f:
+                assert f.read().split() == ["high", "low"]
+            metrics = executor.get_metrics()
+            assert metrics["jobs_completed"] == 3
+            assert metrics["max_queue_depth"] == 2
+            assert metrics["running_jobs"] == 0
+            assert metrics["max_wait_time"] > 0.1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_job_raises_and_releases_its_slot(self):
+        executor = FFmpegExecutor(max_concurrent_jobs=1, threads_per_job=1)
+
+        with pytest.raises(Exception):
+            await executor.run(["ffprobe", "does_not_exist.mp4"])
+        returncode, _, _ = await executor.run(
+            ["ffprobe", "does_not_exist.mp4"], check=False
+        )
+
+        assert returncode != 0
+        assert executor.get_metrics()["jobs_failed"] == 2
+        assert executor.get_metrics()["running_jobs"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancelled_job_kills_its_process(self):
+        with WorkingFolderContext():
+            executor = FFmpegExecutor(max_concurrent_jobs=1, threads_per_job=1)
+
+            job = asyncio.create_task(
+                executor.run(["sh", "-c", "echo $$ > pid.txt; exec sleep 30"])
+            )
+            while not os.path.exists("pid.txt") or not os.path.getsize("pid.txt"):
+                await asyncio.sleep(0.05)
+            job.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await job
+
+            with open("pid.txt") as f:
+                pid = int(f.read())
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
+            assert executor.get_metrics()["running_jobs"] == 0
@@ -14,14 +14,24 @@
 # ==============================================================================
 
 import os
+import shutil
 import warnings
 
+import numpy as np
 import pytest
 from loguru import logger
 
 import tests.testing_medias as tests_medias
 from vikit.common.context_managers import WorkingFolderContext
-from vikit.wrappers.ffmpeg_wrapper import concatenate_videos, reencode_video
+import vikit.wrappers.ffmpeg_wrapper as ffmpeg_wrapper
+from vikit.wrappers.ffmpeg_executor import get_ffmpeg_executor
+from vikit.wrappers.ffmpeg_wrapper import (
+    concatenate_videos,
+    probe_media,
+    probe_media_async,
+    reencode_video,
+    split_audio_async,
+)
 
 
 class TestFFMPEGWrapper:
@@ -97,3 +107,178 @@ class TestFFMPEGWrapper:
             assert generated_vid_file != ""
             assert os.path.exists(generated_vid_file)
             assert os.path.getsize(generated_vid_file) > 0
+
+    @pytest.mark.unit
+    def test_probe_media(self):
+        probe = probe_media(tests_medias.get_cat_video_path())
+
+        assert probe["duration"] > 0
+        assert probe["fps"] > 0
+        assert probe["video_codec"] is not None
+        assert probe["width"] > 0 and probe["height"] > 0
+        assert len(probe["streams"]) > 0
+        assert probe["has_audio"] == any(
+            stream["codec_type"] == "audio" for stream in probe["streams"]
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_probe_media_is_cached_until_file_changes(self, monkeypatch):
+        with WorkingFolderContext():
+            shutil.copy(tests_medias.get_cat_video_path(), "media.mp4")
+            first_probe = await probe_media_async("media.mp4")
+
+            calls = []
+            parse_probe_output = ffmpeg_wrapper._parse_probe_output
+            monkeypatch.setattr(
+                ffmpeg_wrapper,
+                "_parse_probe_output",
+                lambda output: calls.append(output) or parse_probe_output(output),
+            )
+            assert probe_media("media.mp4") is first_probe
+            assert len(calls) == 0
+
+            shutil.copy(tests_medias.get_test_prompt_recording(), "media.mp4")
+            new_probe = probe_media("media.mp4")
+
+            assert len(calls) == 1
+            assert new_probe is not first_probe
+            assert new_probe["fps"] is None
+            assert new_probe["has_audio"]
+
+    @pytest.mark.local_integration
+    @pytest.mark.asyncio
+    async def test_reencode_and_merge_audio_in_one_pass(self):
+        with WorkingFolderContext():
+            generated_vid_file = await ffmpeg_wrapper.reencode_and_merge_audio(
+                media_url=tests_medias.get_cat_video_path(),
+                audio_tracks=[
+                    (tests_medias.get_sample_gen_background_music(), 1.0),
+                    (tests_medias.get_test_prompt_recording(), 1.0),
+                ],
+                reencode=True,
+                target_file_name="target.mp4",
+            )
+
+            assert generated_vid_file == "target.mp4"
+            probe = probe_media(generated_vid_file)
+            assert probe["has_audio"]
+            assert probe["fps"] == 24
+            assert probe["duration"] == pytest.approx(
+                probe_media(tests_medias.get_cat_video_path())["duration"], abs=0.5
+            )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stream_copy_needs_homogeneous_videos(self):
+        assert await ffmpeg_wrapper.can_concatenate_with_stream_copy(
+            [tests_medias.get_cat_video_path(), tests_medias.get_cat_video_path()]
+        )
+        assert not await ffmpeg_wrapper.can_concatenate_with_stream_copy(
+            [
+                tests_medias.get_cat_video_path(),
+                tests_medias.get_test_transition_stones_trainboy_path(),
+            ]
+        )
+        assert not await ffmpeg_wrapper.can_concatenate_with_stream_copy([])
+
+    @pytest.mark.local_integration
+    @pytest.mark.asyncio
+    async def test_concat_homogeneous_video_files_with_stream_copy(self):
+        with WorkingFolderContext():
+            concat_file_name = "concatenate.txt"
+            with open(concat_file_name, "w") as f:
+                f.write(f"file {tests_medias.get_cat_video_path()}\n")
+                f.write(f"file {tests_medias.get_cat_video_path()}\n")
+
+            generated_vid_file = await concatenate_videos(
+                input_file=concat_file_name,
+                target_file_name="target.mp4",
+                ratioToMultiplyAnimations=1,
+            )
+
+            assert generated_vid_file == "target.mp4"
+            source_probe = probe_media(tests_medias.get_cat_video_path())
+            target_probe = probe_media(generated_vid_file)
+            assert target_probe["video_codec"] == source_probe["video_codec"]
+            assert target_probe["fps"] == source_probe["fps"]
+            assert target_probe["duration"] == pytest.approx(
+                2 * source_probe["duration"], abs=0.5
+            )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_split_audio_in_one_pass(self):
+        recording = tests_medias.get_test_prompt_recording_trainboy()
+        with WorkingFolderContext():
+            slices = await split_audio_async(
+                recording, cut_times=[5, 10.2], target_file_prefix="slice"
+            )
+
+            assert [os.path.basename(path) for path, _, _ in slices] == [
+                "slice_000.mp3",
+                "slice_001.mp3",
+                "slice_002.mp3",
+            ]
+            assert not os.path.exists("slice_slices.csv")
+            assert slices[0][1] == 0
+            assert slices[1][1] == pytest.approx(5, abs=0.05)
+            assert slices[2][1] == pytest.approx(10.2, abs=0.05)
+            for (path, start, end), (_, next_start, _) in zip(slices, slices[1:]):
+                assert end == next_start
+            for path, start, end in slices:
+                assert probe_media(path)["duration"] == pytest.approx(
+                    end - start, abs=0.05
+                )
+            assert slices[-1][2] == pytest.approx(probe_media(recording)["duration"])
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_split_audio_without_cut(self):
+        recording = tests_medias.get_test_prompt_recording_trainboy()
+
+        slices = await split_audio_async(recording)
+
+        assert slices == [(recording, 0.0, probe_media(recording)["duration"])]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_reencode_and_merge_audio_with_existing_audio_track(self):
+        executor = get_ffmpeg_executor()
+        with WorkingFolderContext():
+            # A video with a silent stereo track, a tone on the right channel only
+            # and a silent stereo track to merge with it
+            await executor.run(
+                ["ffmpeg", "-y", "-f", "lavfi", "-i", "testsrc=duration=2:size=64x64"]
+                + ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo"]
+                + ["-shortest", "-c:a", "aac", "video.mp4"]
+            )
+            await executor.run(
+                ["ffmpeg", "-y", "-f", "lavfi", "-i"]
+                + ["aevalsrc=0|0.5*sin(2*PI*440*t):duration=2", "right.wav"]
+            )
+            await executor.run(
+                ["ffmpeg", "-y", "-f", "lavfi", "-i"]
+                + ["anullsrc=channel_layout=stereo:duration=2", "silence.wav"]
+            )
+            assert probe_media("video.mp4")["has_audio"]
+
+            await ffmpeg_wrapper.reencode_and_merge_audio(
+                media_url="video.mp4",
+                audio_tracks=[("right.wav", 1.0), ("silence.wav", 1.0)],
+                target_file_name="target.mp4",
+            )
+
+            audio_streams = [
+                stream
+                for stream in probe_media("target.mp4")["streams"]
+                if stream["codec_type"] == "audio"
+            ]
+            assert audio_streams[0]["channel_layout"] == "stereo"
+            _, stdout, _ = await executor.run(
+                ["ffmpeg", "-i", "target.mp4", "-vn", "-f", "s16le", "-"]
+            )
+            samples = np.frombuffer(stdout, dtype=np.int16).reshape(-1, 2)
+            # Merging the three tracks at once would make a 5.1 layout where the right
+            # channel of the tone is the LFE one, dropped by the stereo downmix
+            assert np.abs(samples[:, 1]).max() > 1000
@@ -13,16 +13,20 @@
 # limitations under the License.
 # ==============================================================================
 
+import asyncio
 import os
 import warnings
 
 import pytest
+from aiohttp import web
 from loguru import logger
 
 import tests.testing_medias as testing_medias
 from vikit.common.context_managers import WorkingFolderContext
 from vikit.common.file_tools import (
     download_or_copy_file,
+    url_exists_async,
+    wait_for_url_async,
 )
 
 logger.add("log_test_Filetools.txt", rotation="10 MB")
@@ -52,3 +56,57 @@ class TestFileTools:
             assert downloaded_file != ""
             assert os.path.exists(downloaded_file)
             assert os.path.getsize(downloaded_file) > 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_local_url_exists_async(self):
+        local_file = testing_medias.get_cat_video_path()
+
+        assert await url_exists_async(local_file)
+        assert await url_exists_async("file://" + os.path.abspath(local_file))
+        assert not await url_exists_async("does_not_exist.mp4")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_web_url_exists_async(self):
+        async def video(request):
+            return web.Response(body=b"video")
+
+        async def no_head(request):
+            if request.method == "HEAD":
+                return web.Response(status=405)
+            return web.Response(body=b"video")
+
+        app = web.Application()
+        app.router.add_get("/video.mp4", video)
+        app.router.add_route("*", "/no_head.mp4", no_head)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            assert await url_exists_async(f"http://127.0.0.1:{port}/video.mp4")
+            assert await url_exists_async(f"http://127.0.0.1:{port}/no_head.mp4")
+            assert not await url_exists_async(f"http://127.0.0.1:{port}/missing.mp4")
+        finally:
+            await runner.cleanup()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_wait_for_url_async(self):
+        with WorkingFolderContext():
+
+            async def upload_later():
+                await asyncio.sleep(0.3)
+                with open("uploaded.mp4", "wb") as f:
+                    f.write(b"video")
+
+            upload = asyncio.create_task(upload_later())
+            assert await wait_for_url_async(
+                "uploaded.mp4", timeout=5, initial_interval=0.1
+            )
+            await upload
+            assert not await wait_for_url_async(
+                "never_uploaded.mp4", timeout=0.3, initial_interval=0.1
+            )
@@ -0,0 +1,174 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import os
+import shutil
+import time
+
+import pytest
+
+from vikit.common.context_managers import WorkingFolderContext
+import tests.testing_medias as tests_medias
+from vikit.common.generated_media_cache import GeneratedMediaCache
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
+from vikit.video.building.handlers.interpolation_handler import (
+    VideoInterpolationHandler,
+)
+from vikit.video.imported_video import ImportedVideo
+from vikit.video.video_build_settings import VideoBuildSettings
+
+
+def _write_media(file_name: str, size: int):
+    with open(file_name, "wb") as f:
+        f.write(os.urandom(size))
+    return file_name
+
+
+class TestGeneratedMediaCache:
+
+    @pytest.mark.unit
+    def test_key_is_normalized(self):
+        key = GeneratedMediaCache.make_key(
+            prompt_text="A cat  in the\nrain ", model_provider="haiper"
+        )
+        same_key = GeneratedMediaCache.make_key(
+            model_provider="haiper", prompt_text="A cat in the rain"
+        )
+        other_key = GeneratedMediaCache.make_key(
+            prompt_text="A cat in the rain", model_provider="videocrafter"
+        )
+
+        assert key == same_key
+        assert key != other_key
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_put_and_get(self):
+        with WorkingFolderContext():
+            cache = GeneratedMediaCache(cache_dir="cache")
+            key = GeneratedMediaCache.make_key(prompt_text="A cat in the rain")
+            assert cache.get(key) is None
+
+            cached = await cache.put(key, _write_media("generated.mp4", 128))
+
+            assert cache.get(key) == cached
+            assert os.path.getsize(cached) == 128
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entries_are_evicted(self):
+        with WorkingFolderContext():
+            cache = GeneratedMediaCache(cache_dir="cache", max_size_bytes=250)
+            first_key = GeneratedMediaCache.make_key(prompt_text="first")
+            second_key = GeneratedMediaCache.make_key(prompt_text="second")
+            third_key = GeneratedMediaCache.make_key(prompt_text="third")
+
+            await cache.put(first_key, _write_media("first.mp4", 100))
+            await cache.put(second_key, _write_media("second.mp4", 100))
+            time.sleep(0.05)
+            assert cache.get(first_key)  # first is now more recent than second
+            await cache.put(third_key, _write_media("third.mp4", 100))
+
+            assert cache.get(first_key) is not None
+            assert cache.get(second_key) is None
+            assert cache.get(third_key) is not None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_checked_out_media_outlives_eviction(self):
+        with WorkingFolderContext():
+            cache = GeneratedMediaCache(cache_dir="cache", max_size_bytes=150)
+            first_key = GeneratedMediaCache.make_key(prompt_text="first")
+            second_key = GeneratedMediaCache.make_key(prompt_text="second")
+
+            built = await cache.put(
+                first_key, _write_media("first.mp4", 100), target_path="built.mp4"
+            )
+            assert built == "built.mp4"
+            assert cache.get(first_key, target_path="reused.mp4") == "reused.mp4"
+
+            await cache.put(second_key, _write_media("second.mp4", 100))
+
+            assert cache.get(first_key) is None
+            assert os.path.getsize("built.mp4") == 100
+            assert os.path.getsize("reused.mp4") == 100
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_puts_of_a_key(self):
+        with WorkingFolderContext():
+            cache = GeneratedMediaCache(cache_dir="cache")
+            key = GeneratedMediaCache.make_key(prompt_text="A cat in the rain")
+            media = _write_media("generated.mp4", 100_000)
+
+            built = await asyncio.gather(
+                *(
+                    cache.put(key, media, target_path=f"built_{i}.mp4")
+                    for i in range(4)
+                )
+            )
+
+            assert built == [f"built_{i}.mp4" for i in range(4)]
+            with open(media, "rb") as f:
+                content = f.read()
+            with open(cache.get(key), "rb") as f:
+                assert f.read() == content
+            assert not [
+                file_name
+                for _, _, file_names in os.walk("cache")
+                for file_name in file_names
+                if file_name.endswith(".part")
+            ]
+
+            # An entry already there is not downloaded again
+            assert (
+                await cache.put(key, "https://unreachable.invalid/generated.mp4")
+                == cache.get(key)
+            )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cached_interpolation_keeps_the_source_video(self, monkeypatch):
+        with WorkingFolderContext():
+            monkeypatch.setenv("GENERATED_MEDIA_CACHE_DIR", os.path.abspath("cache"))
+            shutil.copy(tests_medias.get_cat_video_path(), "source.mp4")
+            shutil.copy(tests_medias.get_interpolate_video(), "interpolated.mp4")
+
+            video = ImportedVideo("source.mp4")
+            video.build_settings = VideoBuildSettings(
+                ml_models_gateway=FakeMLModelsGateway()
+            )
+            source_file = video.get_file_name_by_state(video.build_settings)
+            shutil.copy("source.mp4", source_file)
+            video.media_url = source_file
+            handler = VideoInterpolationHandler()
+            cache_key = GeneratedMediaCache.make_key(
+                **handler._get_interpolation_request(video)
+            )
+            await GeneratedMediaCache(cache_dir="cache").put(
+                cache_key, "interpolated.mp4"
+            )
+
+            await handler.execute_async(video)
+
+            assert video.metadata.is_interpolated
+            assert video.media_url != source_file
+            assert GeneratedMediaCache.hash_file(
+                source_file
+            ) == GeneratedMediaCache.hash_file("source.mp4")
+            assert GeneratedMediaCache.hash_file(
+                video.media_url
+            ) == GeneratedMediaCache.hash_file("interpolated.mp4")
@@ -0,0 +1,83 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+
+import pytest
+
+from vikit.common.http_session import (
+    HttpSessionPool,
+    get_shared_http_session_pool,
+    http_sessions_scope,
+)
+
+
+class TestHttpSessionPool:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_session_is_shared_and_kept_open(self):
+        pool = HttpSessionPool(limit_per_host=4)
+        async with pool.borrow_session() as session:
+            pass
+        async with pool.borrow_session() as other_session:
+            pass
+
+        assert session is other_session
+        assert not session.closed
+        assert session.connector.limit_per_host == 4
+        await pool.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_session_is_recreated_after_close(self):
+        pool = HttpSessionPool()
+        session = pool.get_session()
+        await pool.close()
+
+        assert session.closed
+        new_session = pool.get_session()
+        assert new_session is not session
+        assert not new_session.closed
+        await pool.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sessions_are_closed_when_the_outermost_scope_exits(self):
+        pool = HttpSessionPool()
+        async with http_sessions_scope():
+            session = pool.get_session()
+            shared_session = get_shared_http_session_pool().get_session()
+            async with http_sessions_scope():
+                pass
+            assert not session.closed
+
+        assert session.closed
+        assert shared_session.closed
+        assert not pool._sessions
+
+    @pytest.mark.unit
+    def test_sessions_of_closed_loops_are_dropped(self):
+        pool = HttpSessionPool()
+
+        async def use_and_close_session():
+            await pool.get_session().close()
+            return asyncio.get_running_loop()
+
+        first_loop = asyncio.run(use_and_close_session())
+        second_loop = asyncio.run(use_and_close_session())
+
+        assert list(pool._sessions) == [second_loop]
+        assert first_loop not in pool._sessions
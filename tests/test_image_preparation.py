@@ -0,0 +1,102 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import base64
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from tests.testing_medias import get_test_prompt_image
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.common.image_preparation import (
+    ImagePreparationService,
+    prepare_transition_images,
+)
+from vikit.prompt.image_prompt import ImagePrompt
+
+
+def _decode_data_uri(data_uri: str):
+    return cv2.imdecode(
+        np.frombuffer(base64.b64decode(data_uri.split(",")[1]), np.uint8),
+        cv2.IMREAD_COLOR,
+    )
+
+
+def _read_test_image() -> bytes:
+    with open(get_test_prompt_image(), "rb") as image_file:
+        return image_file.read()
+
+
+class TestImagePreparation:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_images_are_prepared_outside_of_the_event_loop(self):
+        service = ImagePreparationService(executor_type="thread", max_workers=2)
+        try:
+            thread_id = await service.run(threading.get_ident)
+            encoded_image = await service.encode_image_async(
+                _read_test_image(), target_size=(160, 90)
+            )
+        finally:
+            service.shutdown()
+
+        assert thread_id != threading.get_ident()
+        assert _decode_data_uri(encoded_image).shape[:2] == (90, 160)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_images_are_prepared_in_processes(self):
+        service = ImagePreparationService(executor_type="process", max_workers=1)
+        try:
+            encoded_image = await service.resize_base64_image_async(
+                base64.b64encode(_read_test_image()).decode("utf-8"),
+                target_size=(90, 160),
+            )
+        finally:
+            service.shutdown()
+
+        assert _decode_data_uri(encoded_image).shape[:2] == (160, 90)
+
+    @pytest.mark.unit
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            ImagePreparationService(executor_type="gpu")
+
+    @pytest.mark.unit
+    def test_transition_images_get_the_same_size(self):
+        with WorkingFolderContext():
+            cv2.imwrite("source.png", np.zeros((72, 128, 3), np.uint8))
+            cv2.imwrite("target.png", np.zeros((100, 100, 3), np.uint8))
+
+            source_image, target_image = prepare_transition_images(
+                "source.png", "target.png"
+            )
+
+            assert cv2.imread("target.png").shape[:2] == (72, 128)
+        assert _decode_data_uri("," + target_image).shape[:2] == (72, 128)
+        assert _decode_data_uri("," + source_image).shape[:2] == (72, 128)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_image_prompt_encoding_is_shared(self):
+        prompt = ImagePrompt(image_path=get_test_prompt_image())
+
+        encoded_image = await prompt.get_encoded_image_async(target_size=(64, 36))
+
+        assert prompt.get_encoded_image(target_size=(64, 36)) is encoded_image
+        assert _decode_data_uri(encoded_image).shape[:2] == (36, 64)
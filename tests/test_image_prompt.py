@@ -0,0 +1,78 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from tests.testing_medias import get_test_prompt_image
+from vikit.prompt.image_prompt import ImagePrompt, as_image_prompt
+
+
+def _read_test_image() -> bytes:
+    with open(get_test_prompt_image(), "rb") as image_file:
+        return image_file.read()
+
+
+class TestImagePrompt:
+
+    @pytest.mark.unit
+    def test_image_is_loaded_lazily(self):
+        prompt = ImagePrompt(image_path=get_test_prompt_image(), text="a cat")
+
+        assert prompt._image_bytes is None
+        assert prompt.get_image_bytes() == _read_test_image()
+        assert prompt.image == base64.b64encode(_read_test_image()).decode("utf-8")
+
+    @pytest.mark.unit
+    def test_image_forms_share_their_digest(self):
+        image_bytes = _read_test_image()
+
+        from_path = ImagePrompt(image_path=get_test_prompt_image())
+        from_bytes = ImagePrompt(prompt_image=image_bytes)
+        from_base64 = as_image_prompt(base64.b64encode(image_bytes).decode("utf-8"))
+
+        assert from_path.get_digest() == from_bytes.get_digest()
+        assert from_path.get_digest() == from_base64.get_digest()
+        assert as_image_prompt(from_path) is from_path
+
+    @pytest.mark.unit
+    def test_encoded_image_is_computed_once_per_size(self):
+        prompt = ImagePrompt(image_path=get_test_prompt_image())
+        other_prompt = ImagePrompt(prompt_image=_read_test_image())
+
+        encoded_image = prompt.get_encoded_image(target_size=(128, 72))
+
+        assert encoded_image.startswith("data:image/png;base64,")
+        assert prompt.get_encoded_image(target_size=(128, 72)) is encoded_image
+        assert other_prompt.get_encoded_image(target_size=(128, 72)) is encoded_image
+        assert prompt.get_encoded_image(target_size=(72, 128)) is not encoded_image
+
+        image = cv2.imdecode(
+            np.frombuffer(base64.b64decode(encoded_image.split(",")[1]), np.uint8),
+            cv2.IMREAD_COLOR,
+        )
+        assert image.shape[:2] == (72, 128)
+
+    @pytest.mark.unit
+    def test_url_image(self):
+        prompt = ImagePrompt(prompt_image="https://vikit.ai/image.png")
+
+        assert prompt.is_url
+        assert prompt.get_encoded_image(target_size=(128, 72)) == prompt.image
+        with pytest.raises(ValueError):
+            prompt.get_image_bytes()
@@ -0,0 +1,156 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.common.handler import Handler
+from vikit.common.instrumentation import (
+    CATEGORY_GATEWAY,
+    CATEGORY_HANDLER,
+    CATEGORY_VIDEO,
+    Tracer,
+    get_tracer,
+)
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
+
+
+class _FakeVideo:
+    id = "video-1"
+    short_type_name = "Fake"
+    media_url = None
+
+
+class _PassThroughHandler(Handler):
+    async def execute_async(self, video):
+        return video
+
+
+@pytest.fixture
+def tracer():
+    tracer = get_tracer()
+    tracer.reset()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.reset()
+
+
+class TestInstrumentation:
+
+    @pytest.mark.unit
+    def test_nested_spans(self):
+        tracer = Tracer(enabled=True)
+
+        with tracer.span("build", CATEGORY_VIDEO, video_id="parent") as parent:
+            with tracer.span("execute_async", CATEGORY_HANDLER) as child:
+                child.set_attribute("bytes_out", 42)
+
+        spans = tracer.get_spans()
+        assert [span.name for span in spans] == ["execute_async", "build"]
+        assert child.parent_id == parent.id
+        assert parent.parent_id is None
+        assert child.attributes["bytes_out"] == 42
+        assert parent.wall_time >= child.wall_time
+        summary = tracer.get_summary()
+        assert summary["video:build"]["count"] == 1
+        assert summary["handler:execute_async"]["errors"] == 0
+
+    @pytest.mark.unit
+    def test_failed_span_records_error(self):
+        tracer = Tracer(enabled=True)
+
+        with pytest.raises(ValueError):
+            with tracer.span("build", CATEGORY_VIDEO):
+                raise ValueError("failed")
+
+        assert tracer.get_spans()[0].error == "ValueError"
+
+    @pytest.mark.unit
+    def test_nothing_recorded_when_disabled(self):
+        tracer = Tracer(enabled=False)
+
+        with tracer.span("build", CATEGORY_VIDEO) as span:
+            span.set_attribute("bytes_out", 42)
+
+        assert tracer.get_spans() == []
+
+    @pytest.mark.unit
+    def test_exports(self):
+        tracer = Tracer(enabled=True)
+        with tracer.span("build", CATEGORY_VIDEO, video_id="video-1"):
+            pass
+
+        with WorkingFolderContext():
+            with open(tracer.export_json("spans.json")) as f:
+                spans = json.load(f)
+            with open(tracer.export_chrome_trace("trace.json")) as f:
+                trace = json.load(f)
+
+        assert spans[0]["name"] == "build"
+        assert spans[0]["attributes"]["video_id"] == "video-1"
+        assert trace["traceEvents"][0]["ph"] == "X"
+        assert trace["traceEvents"][0]["cat"] == CATEGORY_VIDEO
+        assert trace["traceEvents"][0]["args"]["video_id"] == "video-1"
+
+    @pytest.mark.unit
+    def test_spans_without_the_resource_module(self):
+        # The resource module is Unix only, spans still work without it, e.g. on Windows
+        script = (
+            "import sys; sys.modules['resource'] = None; "
+            "from vikit.common.instrumentation import CATEGORY_VIDEO, Tracer; "
+            "tracer = Tracer(enabled=True); "
+            "span = tracer.span('build', CATEGORY_VIDEO); "
+            "span.__enter__(); span.__exit__(None, None, None); "
+            "print(tracer.get_spans()[0].name)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "build"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_handlers_are_traced(self, tracer):
+        video = _FakeVideo()
+
+        assert await _PassThroughHandler().execute_async(video) is video
+
+        span = tracer.get_spans()[0]
+        assert span.category == CATEGORY_HANDLER
+        assert span.name == "_PassThroughHandler.execute_async"
+        assert span.attributes["video_id"] == "video-1"
+        assert span.attributes["video_type"] == "Fake"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_gateways_are_traced(self, tracer):
+        await FakeMLModelsGateway().compose_music_from_text_async(
+            prompt_text="calm music", duration=2
+        )
+
+        summary = tracer.get_summary()
+        assert (
+            summary[
+                f"{CATEGORY_GATEWAY}:FakeMLModelsGateway.compose_music_from_text_async"
+            ]["count"]
+            == 1
+        )
@@ -0,0 +1,154 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+
+import pytest
+
+import tests.testing_medias as tests_medias
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
+from vikit.gateways.job_poller import JOB_SUCCEEDED, JobPoller, VideoJob
+
+
+def _finish_after(nb_polls: int, poll_times: list = None):
+    async def poll_job(job: VideoJob) -> bool:
+        if poll_times is not None:
+            poll_times.append(asyncio.get_running_loop().time())
+        if job.nb_polls >= nb_polls:
+            job.succeed(f"{job.job_id}.mp4")
+        return job.done
+
+    return poll_job
+
+
+class TestJobPoller:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_jobs_share_one_polling_loop(self):
+        poller = JobPoller(initial_interval=0.01, max_interval=0.05)
+        jobs = [VideoJob(job_id=str(i)) for i in range(50)]
+
+        results = await asyncio.gather(
+            *(poller.wait(job, _finish_after(3)) for job in jobs)
+        )
+
+        assert results == [f"{i}.mp4" for i in range(50)]
+        assert all(job.nb_polls == 3 for job in jobs)
+        assert poller.nb_pending_jobs == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_polling_backs_off(self):
+        poller = JobPoller(initial_interval=0.02, max_interval=0.08, jitter=0)
+        poll_times = []
+
+        await poller.wait(VideoJob(), _finish_after(5, poll_times))
+
+        intervals = [end - start for start, end in zip(poll_times, poll_times[1:])]
+        assert intervals[0] == pytest.approx(0.04, abs=0.015)
+        assert intervals[1] == pytest.approx(0.08, abs=0.015)
+        assert intervals[2] == pytest.approx(0.08, abs=0.015)  # capped
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_job_and_timeout(self):
+        poller = JobPoller(initial_interval=0.01, max_interval=0.01)
+
+        async def fail(job):
+            job.fail("out of credits")
+            return True
+
+        with pytest.raises(Exception, match="out of credits"):
+            await poller.wait(VideoJob(), fail)
+        with pytest.raises(asyncio.TimeoutError):
+            await poller.wait(VideoJob(), _finish_after(1000), timeout=0.1)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_polls_are_retried(self):
+        poller = JobPoller(initial_interval=0.01, max_interval=0.01, max_failures=3)
+
+        async def flaky_poll(job):
+            if job.nb_polls in (1, 2, 4):
+                raise ConnectionError("Connection reset by peer")
+            return await _finish_after(5)(job)
+
+        async def broken_poll(job):
+            raise ConnectionError("Connection refused")
+
+        assert await poller.wait(VideoJob(job_id="flaky"), flaky_poll) == "flaky.mp4"
+        broken_job = VideoJob()
+        with pytest.raises(ConnectionError):
+            await poller.wait(broken_job, broken_poll)
+        assert broken_job.nb_polls == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slow_poll_does_not_hold_back_other_jobs(self):
+        poller = JobPoller(initial_interval=0.01, max_interval=0.01, jitter=0)
+
+        async def slow_poll(job):
+            await asyncio.sleep(10)
+            return False
+
+        slow_waiter = asyncio.ensure_future(poller.wait(VideoJob(), slow_poll))
+        await asyncio.sleep(0.05)
+        result = await asyncio.wait_for(
+            poller.wait(VideoJob(job_id="fast"), _finish_after(3)), timeout=1
+        )
+
+        assert result == "fast.mp4"
+        slow_waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow_waiter
+        await asyncio.sleep(0)
+        assert poller.nb_pending_jobs == 0
+        assert not poller._polls
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancelled_wait_forgets_the_job(self):
+        poller = JobPoller(initial_interval=10)
+        waiter = asyncio.ensure_future(poller.wait(VideoJob(), _finish_after(1)))
+        await asyncio.sleep(0.01)
+        assert poller.nb_pending_jobs == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert poller._jobs == []
+
+        background_job = VideoJob(task=asyncio.ensure_future(asyncio.sleep(10)))
+        waiter = asyncio.ensure_future(poller.wait(background_job, None))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert background_job._task.cancelled()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_gateway_job_runs_in_background(self):
+        gateway = FakeMLModelsGateway(sleep_time=0.1)
+
+        job = await gateway.submit_video_job(
+            prompt_text="A cat in a forest", model_provider=None
+        )
+        assert not job.done and not job.is_polled
+
+        assert await gateway.await_video_job(job) == tests_medias.get_cat_video_path()
+        assert job.status == JOB_SUCCEEDED
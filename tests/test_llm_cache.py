@@ -0,0 +1,110 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import time
+
+import pytest
+
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.common.llm_cache import (
+    InMemoryLLMCache,
+    SQLiteLLMCache,
+    cached_llm_call,
+    get_llm_cache,
+    set_llm_cache,
+)
+
+
+class _KeywordsGateway:
+    def __init__(self):
+        self.nb_calls = 0
+
+    @cached_llm_call(model="test-model")
+    async def get_keywords_from_prompt_async(self, subtitleText):
+        self.nb_calls += 1
+        return f"keywords of {subtitleText}", "title"
+
+
+@pytest.fixture
+def llm_cache():
+    previous_cache = get_llm_cache()
+    cache = InMemoryLLMCache(max_entries=10)
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(previous_cache)
+
+
+class TestLLMCache:
+
+    @pytest.mark.unit
+    def test_in_memory_cache_expiration_and_eviction(self):
+        cache = InMemoryLLMCache(ttl=0.1, max_entries=2)
+        cache.set("a", "answer a")
+        cache.set("b", "answer b")
+        assert cache.get("a") == "answer a"
+        cache.set("c", "answer c")  # b is the least recently used
+
+        assert cache.get("b") is None
+        assert len(cache) == 2
+        time.sleep(0.15)
+        assert cache.get("a") is None
+
+    @pytest.mark.unit
+    def test_sqlite_cache_is_persisted(self):
+        with WorkingFolderContext():
+            cache = SQLiteLLMCache("cache/llm.db", max_entries=2)
+            cache.set("a", ["keywords", "title"])
+            cache.set("b", ["keywords", "title"])
+            cache.get("a")
+            cache.set("c", ["keywords", "title"])
+            cache.close()
+
+            cache = SQLiteLLMCache("cache/llm.db", ttl=3600)
+            assert cache.get("a") == ["keywords", "title"]
+            assert cache.get("b") is None
+            assert len(cache) == 2
+            cache.ttl = 0
+            assert cache.get("a") is None
+            cache.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_llm_calls_are_memoized(self, llm_cache):
+        gateway = _KeywordsGateway()
+
+        first_answer = await gateway.get_keywords_from_prompt_async("a forest")
+        other_gateway = _KeywordsGateway()
+        second_answer = await other_gateway.get_keywords_from_prompt_async(
+            subtitleText="a forest"
+        )
+        assert await gateway.get_keywords_from_prompt_async("a forest") == first_answer
+        await gateway.get_keywords_from_prompt_async("a river")
+
+        assert first_answer == ("keywords of a forest", "title")
+        assert second_answer == first_answer
+        assert gateway.nb_calls == 2
+        assert other_gateway.nb_calls == 0  # a keyword call is the same question
+        assert len(llm_cache) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_disabled_cache(self, llm_cache):
+        set_llm_cache(None)
+        gateway = _KeywordsGateway()
+
+        await gateway.get_keywords_from_prompt_async("a forest")
+        await gateway.get_keywords_from_prompt_async("a forest")
+
+        assert gateway.nb_calls == 2
@@ -13,11 +13,14 @@
 # limitations under the License.
 # ==============================================================================
 
+import asyncio
+import time
 import warnings
 
 import pytest
 from loguru import logger
 
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
 from vikit.prompt.prompt_build_settings import PromptBuildSettings
 from vikit.prompt.prompt_factory import PromptFactory
 
@@ -50,3 +53,47 @@ class TestPromptFactory:
             _ = await PromptFactory().get_reengineered_prompt_text_from_raw_text(
                 prompt=None, prompt_build_settings=None
             )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_reengineer_prompts_from_texts_as_a_batch(self):
+        pt_build_settings = PromptBuildSettings(
+            ml_models_gateway=FakeMLModelsGateway(sleep_time=0.2),
+            generate_from_llm_keyword=True,
+            generate_from_llm_prompt=True,
+        )
+
+        start_time = time.perf_counter()
+        text_prompts = await PromptFactory(
+            prompt_build_settings=pt_build_settings
+        ).get_reengineered_prompt_texts_from_raw_texts(
+            prompts=[f"test prompt {i}" for i in range(8)],
+            prompt_build_settings=pt_build_settings,
+        )
+
+        assert text_prompts == ["ENHANCED FROM PROMPT"] * 8
+        # 2 handlers, each one processing the 8 prompts concurrently
+        assert time.perf_counter() - start_time < 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batched_llm_calls_are_bounded(self):
+        in_flight = []
+        max_in_flight = []
+
+        class CountingGateway(FakeMLModelsGateway):
+            async def get_enhanced_prompt_async(self, subtitleText, **kwargs):
+                in_flight.append(subtitleText)
+                max_in_flight.append(len(in_flight))
+                await asyncio.sleep(0.05)
+                in_flight.remove(subtitleText)
+                return subtitleText.upper(), "title"
+
+        results = await CountingGateway().get_enhanced_prompts_async(
+            [f"prompt {i}" for i in range(10)], max_concurrency=3
+        )
+
+        assert [prompt for prompt, _ in results] == [
+            f"PROMPT {i}" for i in range(10)
+        ]
+        assert max(max_in_flight) == 3
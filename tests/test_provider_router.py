@@ -0,0 +1,122 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import time
+
+import pytest
+
+from vikit.gateways.provider_router import ProviderRouter
+
+_LATENCIES = {"slow": 1, "fast": 0.01}
+
+
+class _Providers:
+    def __init__(self, failing_providers: tuple = ()):
+        self.calls = []
+        self.cancelled = []
+        self.failing_providers = failing_providers
+
+    async def generate(self, provider: str):
+        self.calls.append(provider)
+        if provider in self.failing_providers:
+            raise Exception(f"{provider} is down")
+        try:
+            await asyncio.sleep(_LATENCIES[provider])
+        except asyncio.CancelledError:
+            self.cancelled.append(provider)
+            raise
+        return f"{provider}.mp4"
+
+
+def _create_router(**settings):
+    default_settings = dict(
+        enabled=True,
+        fallbacks={"slow": "fast", "down": "fast"},
+        default_hedge_delay=0.05,
+        max_consecutive_failures=2,
+    )
+    return ProviderRouter(**{**default_settings, **settings})
+
+
+class TestProviderRouter:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        router = _create_router()
+        providers = _Providers()
+
+        start_time = time.monotonic()
+        video = await router.route("slow", providers.generate)
+
+        assert video == "fast.mp4"
+        assert time.monotonic() - start_time < 0.5
+        await asyncio.sleep(0)  # let the losing request handle its cancellation
+        assert providers.cancelled == ["slow"]
+        assert router.get_stats("fast").nb_successes == 1
+        assert router.get_stats("slow").nb_failures == 0  # losing is not failing
+        # the losing request took at least the time it ran for
+        assert list(router.get_stats("slow").latencies) == [
+            pytest.approx(0.06, abs=0.05)
+        ]
+        assert router.get_stats("slow").nb_successes == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        router = _create_router(fallbacks={"fast": "slow"})
+        providers = _Providers()
+
+        assert await router.route("fast", providers.generate) == "fast.mp4"
+        assert providers.calls == ["fast"]
+
+    @pytest.mark.unit
+    def test_hedge_delay_follows_the_provider_latencies(self):
+        router = _create_router(hedge_quantile=0.9, min_samples=5)
+        stats = router.get_stats("slow")
+        for latency in range(1, 5):
+            stats.record_success(latency)
+        assert router.get_hedge_delay("slow") == 0.05  # not enough samples yet
+
+        for latency in range(5, 11):
+            stats.record_success(latency)
+        assert router.get_hedge_delay("slow") == 9
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failing_provider_is_failed_over(self):
+        router = _create_router()
+        providers = _Providers(failing_providers=("down",))
+
+        for _ in range(3):
+            assert await router.route("down", providers.generate) == "fast.mp4"
+
+        assert providers.calls == ["down", "fast", "down", "fast", "fast"]
+        assert not router.is_available("down")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_disabled_routing_only_measures(self):
+        router = _create_router(enabled=False)
+        providers = _Providers(failing_providers=("down",))
+
+        with pytest.raises(Exception, match="down is down"):
+            await router.route("down", providers.generate)
+        assert await router.route("fast", providers.generate) == "fast.mp4"
+
+        assert providers.calls == ["down", "fast"]
+        assert router.get_stats("down").consecutive_failures == 1
+        assert len(router.get_stats("fast").latencies) == 1
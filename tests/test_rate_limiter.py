@@ -0,0 +1,140 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+from tenacity import retry, stop_after_attempt
+
+import vikit.common.config as config
+from vikit.gateways.rate_limiter import (
+    ProviderRateLimiter,
+    RateLimitedError,
+    parse_retry_after,
+    raise_for_rate_limit,
+    wait_retry_after,
+)
+
+
+class _Response:
+    def __init__(self, status: int, headers: dict = None):
+        self.status = status
+        self.headers = headers if headers else {}
+
+
+class TestRateLimiter:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_requests_are_paced_after_a_burst(self):
+        limiter = ProviderRateLimiter(
+            "test", requests_per_second=20, burst=2, max_in_flight=0
+        )
+
+        start_time = time.monotonic()
+        for _ in range(4):
+            async with limiter.limit():
+                pass
+
+        # 2 requests go through at once, then one every 50ms
+        assert time.monotonic() - start_time == pytest.approx(0.1, abs=0.04)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_requests_in_flight_are_bounded(self):
+        limiter = ProviderRateLimiter("test", requests_per_second=0, max_in_flight=2)
+        max_in_flight = 0
+
+        async def request():
+            nonlocal max_in_flight
+            async with limiter.limit():
+                max_in_flight = max(max_in_flight, limiter.nb_in_flight)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(*(request() for _ in range(6)))
+
+        assert max_in_flight == 2
+        assert limiter.nb_in_flight == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honoured(self):
+        limiter = ProviderRateLimiter(
+            "test", requests_per_second=100, burst=10, max_in_flight=0
+        )
+        attempt_times = []
+
+        @retry(stop=stop_after_attempt(2), reraise=True, wait=wait_retry_after())
+        async def request():
+            async with limiter.limit():
+                attempt_times.append(time.monotonic())
+                if len(attempt_times) == 1:
+                    raise RateLimitedError("throttled", retry_after=0.2)
+                return "video.mp4"
+
+        assert await request() == "video.mp4"
+        assert attempt_times[1] - attempt_times[0] >= 0.2
+
+    @pytest.mark.unit
+    def test_throttled_responses(self):
+        raise_for_rate_limit(_Response(200))
+        raise_for_rate_limit(_Response(503))  # not a throttling without Retry-After
+
+        with pytest.raises(RateLimitedError) as error:
+            raise_for_rate_limit(_Response(429, {"Retry-After": "3"}), "haiper")
+        assert error.value.retry_after == 3
+
+        with pytest.raises(RateLimitedError) as error:
+            raise_for_rate_limit(_Response(429))
+        assert error.value.retry_after is None
+
+        assert parse_retry_after(formatdate(time.time() + 60)) == pytest.approx(
+            60, abs=2
+        )
+        assert parse_retry_after("soon") is None
+
+    @pytest.mark.unit
+    def test_limits_are_configured_per_provider(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT_MAX_IN_FLIGHT", "8")
+        monkeypatch.setenv("HAIPER_RATE_LIMIT_MAX_IN_FLIGHT", "3")
+
+        assert config.get_rate_limit_max_in_flight("haiper") == 3
+        assert config.get_rate_limit_max_in_flight("runway") == 8
+        assert ProviderRateLimiter("haiper").max_in_flight == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_limits_are_off_by_default(self, monkeypatch):
+        for name in (
+            "RATE_LIMIT_REQUESTS_PER_SECOND",
+            "RATE_LIMIT_BURST",
+            "RATE_LIMIT_MAX_IN_FLIGHT",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        limiter = ProviderRateLimiter("haiper")
+        nb_in_flight = []
+
+        async def request():
+            async with limiter.limit():
+                await asyncio.sleep(0.05)
+                nb_in_flight.append(limiter.nb_in_flight)
+
+        started_at = time.monotonic()
+        await asyncio.gather(*(request() for _ in range(20)))
+
+        assert max(nb_in_flight) == 20
+        assert time.monotonic() - started_at < 0.5
@@ -0,0 +1,122 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+
+import pytest
+
+import tests.testing_medias as tests_medias
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
+from vikit.gateways.single_flight import get_single_flight, single_flight
+
+
+class _VideoGateway:
+    def __init__(self, fail: bool = False):
+        self.nb_calls = 0
+        self.fail = fail
+
+    @single_flight(model="test-model")
+    async def generate_video_async(self, prompt_text: str, seed: int = None):
+        self.nb_calls += 1
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise Exception("out of credits")
+        return f"{prompt_text}-{seed}.mp4"
+
+
+class TestSingleFlight:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_identical_calls_are_coalesced(self):
+        gateway = _VideoGateway()
+
+        videos = await asyncio.gather(
+            gateway.generate_video_async("a cat"),
+            gateway.generate_video_async(prompt_text="a cat"),
+            gateway.generate_video_async("a cat", None),
+            gateway.generate_video_async("a dog"),
+        )
+
+        assert videos == ["a cat-None.mp4"] * 3 + ["a dog-None.mp4"]
+        assert gateway.nb_calls == 2
+        assert get_single_flight().nb_in_flight == 0
+
+        await gateway.generate_video_async("a cat")
+        assert gateway.nb_calls == 3  # finished calls are not reused
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_distinct_seeds_are_not_coalesced(self):
+        gateway = _VideoGateway()
+
+        videos = await asyncio.gather(
+            gateway.generate_video_async("a cat", seed=1),
+            gateway.generate_video_async("a cat", seed=2),
+        )
+
+        assert videos == ["a cat-1.mp4", "a cat-2.mp4"]
+        assert gateway.nb_calls == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_callers_can_opt_out(self):
+        gateway = _VideoGateway()
+
+        await asyncio.gather(
+            gateway.generate_video_async("a cat", coalesce=False),
+            gateway.generate_video_async("a cat", coalesce=False),
+            gateway.generate_video_async("a cat"),
+        )
+
+        assert gateway.nb_calls == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_errors_and_cancellations(self):
+        gateway = _VideoGateway(fail=True)
+
+        results = await asyncio.gather(
+            gateway.generate_video_async("a cat"),
+            gateway.generate_video_async("a cat"),
+            return_exceptions=True,
+        )
+        assert [str(result) for result in results] == ["out of credits"] * 2
+        assert gateway.nb_calls == 1
+
+        gateway = _VideoGateway()
+        first_call = asyncio.ensure_future(gateway.generate_video_async("a cat"))
+        second_call = asyncio.ensure_future(gateway.generate_video_async("a cat"))
+        await asyncio.sleep(0.01)
+        first_call.cancel()
+
+        assert await second_call == "a cat-None.mp4"
+        assert gateway.nb_calls == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_gateway_videos_share_one_job(self):
+        gateway = FakeMLModelsGateway(sleep_time=0.1)
+
+        first_video, second_video = await asyncio.gather(
+            *(
+                gateway.generate_video_from_job_async(
+                    prompt_text="A cat in a forest", model_provider=None
+                )
+                for _ in range(2)
+            )
+        )
+
+        assert first_video == second_video == tests_medias.get_cat_video_path()
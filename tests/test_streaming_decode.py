@@ -0,0 +1,125 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import base64
+import json
+import os
+
+import pytest
+from aiohttp import ClientSession, web
+
+import tests.testing_medias as tests_medias
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.common.streaming_decode import (
+    Base64StreamDecoder,
+    JsonStringFieldExtractor,
+    stream_base64_field_to_file,
+)
+
+_PAYLOAD = os.urandom(1000)
+
+
+def _create_document(video: bytes = _PAYLOAD) -> bytes:
+    # The escaped slashes and the decoy "video" value are what a backend may send
+    return json.dumps(
+        {"type": "video", "seed": 0, "video": base64.b64encode(video).decode("utf-8")}
+    ).replace("/", "\\/").encode("utf-8")
+
+
+async def _iter_chunks(document: bytes, chunk_size: int):
+    for start in range(0, len(document), chunk_size):
+        yield document[start : start + chunk_size]
+
+
+class TestStreamingDecode:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100000])
+    def test_field_is_extracted_and_decoded_from_any_chunks(self, chunk_size):
+        document = _create_document()
+        extractor = JsonStringFieldExtractor("video")
+        decoder = Base64StreamDecoder()
+
+        decoded = b""
+        for start in range(0, len(document), chunk_size):
+            decoded += decoder.decode(
+                extractor.feed(document[start : start + chunk_size])
+            )
+        decoded += decoder.flush()
+
+        assert extractor.done
+        assert decoded == _PAYLOAD
+
+    @pytest.mark.unit
+    def test_unpadded_base64(self):
+        decoder = Base64StreamDecoder()
+        encoded = base64.b64encode(b"video!").rstrip(b"=")
+
+        decoded = decoder.decode(encoded[:3]) + decoder.decode(encoded[3:])
+        assert decoded + decoder.flush() == b"video!"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_video_is_streamed_to_file(self):
+        with WorkingFolderContext():
+            with open(tests_medias.get_cat_video_path(), "rb") as video_file:
+                video = video_file.read()
+
+            nb_bytes = await stream_base64_field_to_file(
+                _iter_chunks(_create_document(video), 4096), "video", "video.mp4"
+            )
+
+            assert nb_bytes == len(video)
+            with open("video.mp4", "rb") as video_file:
+                assert video_file.read() == video
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_missing_field(self):
+        with WorkingFolderContext():
+            with pytest.raises(ValueError, match="out of credits"):
+                await stream_base64_field_to_file(
+                    _iter_chunks(b'{"error": "out of credits"}', 8),
+                    "video",
+                    "video.mp4",
+                )
+            assert not os.path.exists("video.mp4")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_http_response_is_streamed(self):
+        async def generate_video(request):
+            return web.Response(
+                body=_create_document(), content_type="application/json"
+            )
+
+        app = web.Application()
+        app.router.add_post("/", generate_video)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            port = site._server.sockets[0].getsockname()[1]
+            with WorkingFolderContext():
+                async with ClientSession() as session:
+                    async with session.post(f"http://127.0.0.1:{port}/") as response:
+                        await stream_base64_field_to_file(
+                            response.content.iter_chunked(100), "video", "video.mp4"
+                        )
+                with open("video.mp4", "rb") as video_file:
+                    assert video_file.read() == _PAYLOAD
+        finally:
+            await runner.cleanup()
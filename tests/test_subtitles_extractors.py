@@ -19,12 +19,44 @@ import pysrt
 import pytest
 from loguru import logger
 
+import tests.testing_medias as tests_medias
+import vikit.common.config as config
 import tests.testing_tools as tools  # used to get a library of test prompts
 from vikit.common.context_managers import WorkingFolderContext
 from vikit.gateways import vikit_gateway
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
 from vikit.prompt.recorded_prompt_subtitles_extractor import (
     RecordedPromptSubtitlesExtractor,
+    get_slice_boundaries,
 )
+from vikit.prompt.subtitle_accumulator import SubtitleAccumulator
+from vikit.prompt.subtitle_extractor import SubtitleExtractor
+from vikit.wrappers.ffmpeg_wrapper import detect_silences_async
+
+SAMPLE_TRANSCRIPTION = """1
+00:00:00,000 --> 00:00:02,500
+A group of ancient moss-covered stones
+
+2
+00:00:03,000 --> 00:00:04,200
+come to life in an abandoned forest.
+"""
+
+
+def _create_subtitles(timings: list) -> pysrt.SubRipFile:
+    # Subtitles numbered from 1, with their (start, end) in milliseconds
+    return pysrt.SubRipFile(
+        [
+            pysrt.SubRipItem(
+                index=index,
+                start=pysrt.SubRipTime(milliseconds=start),
+                end=pysrt.SubRipTime(milliseconds=end),
+                text=str(index),
+            )
+            for index, (start, end) in enumerate(timings, start=1)
+        ]
+    )
+
 
 SAMPLE_PROMPT_TEXT = """A group of ancient, moss-covered stones come to life in an abandoned forest, revealing intricate carvings
 and symbols. This is additional text to make sure we generate several subtitles. """
@@ -57,3 +89,162 @@ class TestSubtitlesExtrators:
                 sub = pysrt.SubRipItem(sub)
                 assert sub.text is not None
                 logger.debug(f"Subtitle: {sub.text}")
+
+    @pytest.mark.unit
+    def test_slices_are_cut_on_silences(self):
+        slices = get_slice_boundaries(
+            25,
+            max_slice_duration=10,
+            silences=[(2, 3), (7, 9), (13, 14), (24, 25)],
+            search_window=5,
+        )
+
+        assert slices == [(0.0, 8.0), (8.0, 13.5), (13.5, 23.5), (23.5, 25)]
+
+    @pytest.mark.unit
+    def test_slices_without_silences(self):
+        assert get_slice_boundaries(25, max_slice_duration=10) == [
+            (0.0, 10.0),
+            (10.0, 20.0),
+            (20.0, 25),
+        ]
+        assert get_slice_boundaries(8, max_slice_duration=10) == [(0.0, 8)]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_silences_are_detected(self):
+        silences = await detect_silences_async(
+            tests_medias.get_test_prompt_recording_trainboy(), min_silence_duration=0.3
+        )
+
+        assert len(silences) > 0
+        for silence_start, silence_end in silences:
+            assert 0 <= silence_start < silence_end <= 13.1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slices_are_transcribed_in_parallel(self, monkeypatch):
+        monkeypatch.setenv("STEPS", "5")
+        with WorkingFolderContext():
+            sub_extractor = RecordedPromptSubtitlesExtractor()
+            subs = await sub_extractor.extract_subtitles_async(
+                recorded_prompt_file_path=tests_medias.get_test_prompt_recording_trainboy(),
+                ml_models_gateway=FakeMLModelsGateway(),
+                parallel=True,
+            )
+
+        # The fake gateway returns the same 4 subtitles for each of the slices
+        first_text = subs[0].text
+        slice_starts = [sub.start.ordinal for sub in subs if sub.text == first_text]
+        assert len(subs) == 4 * len(slice_starts)
+        assert len(slice_starts) >= 3
+        assert [sub.index for sub in subs] == list(range(1, len(subs) + 1))
+        assert slice_starts[0] == 0
+        # the slices are cut on the audio frames, a few milliseconds after the cut times
+        assert all(
+            0 < next_start - start <= 5100
+            for start, next_start in zip(slice_starts, slice_starts[1:])
+        )
+
+    @pytest.mark.unit
+    def test_transcriptions_are_accumulated_in_memory(self):
+        accumulator = SubtitleAccumulator()
+
+        accumulator.append(SAMPLE_TRANSCRIPTION)
+        accumulator.append(SAMPLE_TRANSCRIPTION)
+        accumulator.append(SAMPLE_TRANSCRIPTION, offset=10.25)
+
+        subs = accumulator.subtitles
+        assert len(accumulator) == 6
+        assert [sub.index for sub in subs] == [1, 2, 3, 4, 5, 6]
+        # chained slices start at the end of the previous ones, in whole seconds
+        assert [sub.start.ordinal for sub in subs] == [
+            0,
+            3000,
+            4000,
+            7000,
+            10250,
+            13250,
+        ]
+
+        with WorkingFolderContext():
+            accumulator.save("subtitles.srt")
+            saved_subs = pysrt.open("subtitles.srt")
+        assert [sub.text for sub in saved_subs] == [sub.text for sub in subs]
+        assert saved_subs[-1].end == subs[-1].end
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slices_are_transcribed_in_order(self, monkeypatch):
+        monkeypatch.setenv("STEPS", "5")
+        with WorkingFolderContext():
+            sub_extractor = RecordedPromptSubtitlesExtractor()
+            subs = await sub_extractor.extract_subtitles_async(
+                recorded_prompt_file_path=tests_medias.get_test_prompt_recording_trainboy(),
+                ml_models_gateway=FakeMLModelsGateway(),
+                parallel=False,
+            )
+            saved_subs = pysrt.open(
+                config.get_subtitles_default_file_name(
+                    sub_extractor.prompt_factory_uuid
+                )
+            )
+
+        # 3 slices of the 13s recording, each starting where the previous one ended
+        assert len(subs) == 12
+        assert [sub.start.ordinal for sub in subs[::4]] == [0, 13000, 26000]
+        assert [sub.index for sub in saved_subs] == list(range(1, 13))
+
+    @pytest.mark.unit
+    def test_short_subtitles_are_merged_to_the_millisecond(self):
+        subs = _create_subtitles(
+            [(0, 3000), (3500, 6900), (6999, 9000), (9500, 14000), (14100, 16000)]
+        )
+
+        merged_subs = SubtitleExtractor().merge_short_subtitles(subs, min_duration=7)
+
+        assert merged_subs is subs
+        # 6999ms is less than 7s, a whole seconds resolution would have cut there
+        assert [sub.text for sub in merged_subs] == ["1 2 3", "4 5"]
+        assert [(sub.start.ordinal, sub.end.ordinal) for sub in merged_subs] == [
+            (0, 9000),
+            (9500, 16000),
+        ]
+
+    @pytest.mark.unit
+    def test_scenes_end_on_pauses(self):
+        timings = [(start, start + 1800) for start in range(0, 40000, 2000)]
+        pauses = [(9.85, 10.1), (21.9, 22.3)]
+
+        merged_subs = SubtitleExtractor().merge_short_subtitles(
+            _create_subtitles(timings), min_duration=7, pauses=pauses
+        )
+
+        # the scenes last at least 7s, end on a pause or after 14s without any pause
+        assert [sub.start.ordinal for sub in merged_subs] == [0, 10000, 22000, 36000]
+
+    @pytest.mark.unit
+    def test_merge_is_linear(self):
+        subs = _create_subtitles(
+            [(start, start + 500) for start in range(0, 10**7, 1000)]
+        )
+
+        merged_subs = SubtitleExtractor().merge_short_subtitles(subs, min_duration=7)
+
+        assert len(merged_subs) == 10**7 // 7000 + 1
+        assert merged_subs[0].text == "1 2 3 4 5 6 7"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pauses_are_kept_for_the_merge(self):
+        with WorkingFolderContext():
+            sub_extractor = RecordedPromptSubtitlesExtractor()
+            subs = await sub_extractor.extract_subtitles_async(
+                recorded_prompt_file_path=tests_medias.get_test_prompt_recording_trainboy(),
+                ml_models_gateway=FakeMLModelsGateway(),
+                parallel=False,
+            )
+
+        assert len(sub_extractor.pauses) > 0
+        merged_subs = sub_extractor.merge_short_subtitles(subs, min_duration=4)
+        assert [sub.start.ordinal for sub in merged_subs] == [0, 4400, 11240]
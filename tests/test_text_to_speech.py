@@ -0,0 +1,157 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import io
+import os
+import wave
+
+import numpy as np
+import pytest
+from aiohttp import web
+
+import vikit.gateways.vikit_gateway as vikit_gateway
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.common.http_session import HttpSessionPool
+from vikit.prompt.prompt_cleaning import split_text_into_sentence_batches
+from vikit.wrappers.ffmpeg_wrapper import (
+    concatenate_audio_files,
+    convert_stream_as_mp3_file,
+    get_media_duration,
+)
+
+SAMPLE_SCRIPT = (
+    "A group of ancient stones come to life. They reveal intricate carvings! "
+    "Are these symbols a message? A young boy travels in a train."
+)
+
+
+def _create_wav(duration: float = 1, sample_rate: int = 22050) -> bytes:
+    time = np.arange(int(duration * sample_rate)) / sample_rate
+    samples = (0.3 * np.sin(2 * np.pi * 220 * time) * 32767).astype(np.int16)
+    wav = io.BytesIO()
+    with wave.open(wav, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return wav.getvalue()
+
+
+async def _iter_chunks(data: bytes, chunk_size: int):
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
+
+
+class TestTextToSpeech:
+
+    @pytest.mark.unit
+    def test_text_is_split_into_sentence_batches(self):
+        assert split_text_into_sentence_batches(SAMPLE_SCRIPT, 80) == [
+            "A group of ancient stones come to life. They reveal intricate carvings!",
+            "Are these symbols a message? A young boy travels in a train.",
+        ]
+        assert split_text_into_sentence_batches(SAMPLE_SCRIPT, 10) == [
+            "A group of ancient stones come to life.",
+            "They reveal intricate carvings!",
+            "Are these symbols a message?",
+            "A young boy travels in a train.",
+        ]
+        assert split_text_into_sentence_batches("A short prompt", 1000) == [
+            "A short prompt"
+        ]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_audio_stream_is_encoded_and_concatenated(self):
+        with WorkingFolderContext():
+            await convert_stream_as_mp3_file(
+                _iter_chunks(_create_wav(duration=1), 1000), "first.mp3"
+            )
+            await convert_stream_as_mp3_file(
+                _iter_chunks(_create_wav(duration=2), 1000), "second.mp3"
+            )
+            await concatenate_audio_files(["first.mp3", "second.mp3"], "speech.mp3")
+
+            assert get_media_duration("first.mp3") == pytest.approx(1, abs=0.1)
+            assert get_media_duration("speech.mp3") == pytest.approx(3, abs=0.3)
+            assert sorted(os.listdir()) == ["first.mp3", "second.mp3", "speech.mp3"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_stream_is_not_encoded(self):
+        async def broken_download():
+            yield _create_wav()[:1000]
+            raise ConnectionError("The download was interrupted")
+
+        with WorkingFolderContext():
+            with pytest.raises(ConnectionError):
+                await convert_stream_as_mp3_file(broken_download(), "speech.mp3")
+            assert not os.path.exists("speech.mp3")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_long_script_is_synthesized_in_concurrent_batches(
+        self, monkeypatch
+    ):
+        synthesized_texts = []
+
+        async def generate_speech(request):
+            payload = await request.json()
+            synthesized_texts.append(payload[0]["input"]["text"])
+            return web.Response(text=f"{base_url}/speech.wav")
+
+        async def download_speech(request):
+            return web.Response(body=_create_wav(duration=1))
+
+        app = web.Application()
+        app.router.add_post("/", generate_speech)
+        app.router.add_get("/speech.wav", download_speech)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        monkeypatch.setattr(vikit_gateway, "vikit_backend_url", base_url + "/")
+        monkeypatch.setenv("TTS_BATCH_MAX_CHARACTERS", "40")
+        try:
+            with WorkingFolderContext():
+                async with vikit_gateway.VikitGateway(
+                    vikit_api_key="test", http_session_pool=HttpSessionPool()
+                ) as gateway:
+                    audio_file = await gateway.generate_mp3_from_text_async(
+                        prompt_text=SAMPLE_SCRIPT, target_file="prompt.mp3"
+                    )
+
+                assert audio_file == "prompt.mp3"
+                assert get_media_duration("prompt.mp3") == pytest.approx(4, abs=0.5)
+                # neither the downloaded audio nor the batches are left behind
+                assert os.listdir() == ["prompt.mp3"]
+
+                async with vikit_gateway.VikitGateway(
+                    vikit_api_key="test", http_session_pool=HttpSessionPool()
+                ) as gateway:
+                    # a single batch gives the same result
+                    assert (
+                        await gateway.generate_mp3_from_text_async(
+                            prompt_text="A short prompt", target_file="short.mp3"
+                        )
+                        == "short.mp3"
+                    )
+        finally:
+            await runner.cleanup()
+
+        assert sorted(synthesized_texts) == sorted(
+            split_text_into_sentence_batches(SAMPLE_SCRIPT, 40) + ["A short prompt"]
+        )
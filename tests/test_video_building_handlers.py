@@ -13,6 +13,7 @@
 # limitations under the License.
 # ==============================================================================
 
+import asyncio
 import warnings
 
 import pytest
@@ -20,15 +21,22 @@ from loguru import logger
 
 from tests.testing_medias import get_test_prompt_recording_trainboy
 from vikit.common.context_managers import WorkingFolderContext
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
 from vikit.local_engine import LocalEngine
+from vikit.music_building_context import MusicBuildingContext
 from vikit.prompt.recorded_prompt import RecordedPrompt
+from vikit.video.building.handlers.fused_post_build_handler import (
+    FusedPostBuildHandler,
+)
 from vikit.video.building.handlers.use_prompt_audio_track_and_audio_merging_handler import (
     UsePromptAudioTrackAndAudioMergingHandler,
 )
 from vikit.video.building.handlers.videogen_handler import VideoGenHandler
+from vikit.video.building.video_building_pipeline import VideoBuildingPipeline
 from vikit.video.raw_text_based_video import RawTextBasedVideo
 from vikit.video.video_build_settings import VideoBuildSettings
 
+from vikit.prompt.prompt import Prompt
 from vikit.prompt.prompt_factory import PromptFactory
 
 warnings.simplefilter("ignore", category=ResourceWarning)
@@ -36,8 +44,44 @@ warnings.simplefilter("ignore", category=UserWarning)
 logger.add("log_test_video_building_handlers.txt", rotation="10 MB")
 
 
+class _CountingGateway(FakeMLModelsGateway):
+    def __init__(self):
+        super().__init__(sleep_time=0.05)
+        self.nb_generations = 0
+
+    async def generate_video_async(self, *args, **kwargs):
+        self.nb_generations += 1
+        return await super().generate_video_async(*args, **kwargs)
+
+
 class TestVideoBuildingHandlers:
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_distinct_samples_of_a_prompt_are_generated(self, monkeypatch):
+        monkeypatch.delenv("GENERATED_MEDIA_CACHE_DIR", raising=False)
+        gateway = _CountingGateway()
+        prompt = Prompt()
+        prompt.text = "A cat in a forest"
+        videos = []
+        for sample_index in (0, 0, 1):
+            video = RawTextBasedVideo(raw_text_prompt=prompt.text)
+            video.build_settings = VideoBuildSettings(
+                sample_index=sample_index, ml_models_gateway=gateway
+            )
+            videos.append(video)
+
+        with WorkingFolderContext():
+            await asyncio.gather(
+                *(
+                    VideoGenHandler(video_gen_prompt=prompt).execute_async(video)
+                    for video in videos
+                )
+            )
+
+        # The two first videos share a generation, the other sample gets its own
+        assert gateway.nb_generations == 2
+
     @pytest.mark.local_integration
     @pytest.mark.asyncio
     async def test_VideoBuildingHandlerGenerateFomApi(self):
@@ -73,3 +117,41 @@ class TestVideoBuildingHandlers:
             assert (
                 video__merged_with_prompt_original_audio is not None
             ), "Video built should not be None"
+
+    @pytest.mark.unit
+    def test_post_build_handlers_are_fused(self):
+        prompt = RecordedPrompt()
+        prompt.text = "test"
+        prompt.audio_recording = get_test_prompt_recording_trainboy()
+        vid = RawTextBasedVideo(raw_text_prompt="test")
+
+        for fused_post_build, expected_handler_types in [
+            (
+                False,
+                [
+                    "VideoReencodingHandler",
+                    "DefaultBGMusicAndAudioMergingHandler",
+                    "ReadAloudPromptAudioMergingHandler",
+                ],
+            ),
+            (True, ["FusedPostBuildHandler"]),
+        ]:
+            build_settings = VideoBuildSettings(
+                prompt=prompt,
+                include_read_aloud_prompt=True,
+                music_building_context=MusicBuildingContext(
+                    apply_background_music=True
+                ),
+                fused_post_build=fused_post_build,
+            )
+            vid.build_settings = build_settings
+            handlers = VideoBuildingPipeline().get_handlers(
+                vid, build_settings=build_settings
+            )
+
+            assert [
+                type(handler).__name__ for handler in handlers
+            ] == expected_handler_types
+            if fused_post_build:
+                assert isinstance(handlers[0], FusedPostBuildHandler)
+                assert len(handlers[0].handlers) == 3
@@ -0,0 +1,470 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Offline benchmark of the local build path.
+
+The videos are built with the FakeMLModelsGateway, so no API is called, with an injected
+latency simulating the remote models. Typical usage, to compare two versions:
+
+    python -m vikit.benchmark --label before --latency 0.5 --results benchmark_results.json
+    (change the code)
+    python -m vikit.benchmark --label after --latency 0.5 --results benchmark_results.json --compare-to before
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from loguru import logger
+
+from vikit.common.context_managers import WorkingFolderContext
+from vikit.common.instrumentation import get_tracer
+from vikit.gateways.fake_ML_models_gateway import FakeMLModelsGateway
+from vikit.local_engine import LocalEngine
+from vikit.video.composite_video import CompositeVideo
+from vikit.video.prompt_based_video import PromptBasedVideo
+from vikit.video.raw_text_based_video import RawTextBasedVideo
+from vikit.video.seine_transition import SeineTransition
+from vikit.video.video_build_settings import VideoBuildSettings
+from vikit.wrappers.ffmpeg_executor import get_ffmpeg_executor
+from vikit.wrappers.ffmpeg_wrapper import clear_media_probe_cache
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# The media tools counted as ffmpeg jobs
+FFMPEG_PROGRAMS = ("ffmpeg", "ffprobe")
+
+# Metrics compared between runs, lower is better for all of them
+COMPARED_METRICS = [
+    "latency",
+    "cpu_time",
+    "ffmpeg_jobs",
+    "bytes_written",
+    "peak_rss",
+]
+
+
+async def create_raw_text_videos(nb_videos: int):
+    """
+    A composite of raw text based videos
+    """
+    composite = CompositeVideo()
+    for i in range(nb_videos):
+        composite.append_video(
+            RawTextBasedVideo(f"A cat walking in a forest, scene {i}")
+        )
+    return composite
+
+
+async def create_nested_composites(nb_videos: int):
+    """
+    A composite of composites, each one holding raw text based videos
+    """
+    root = CompositeVideo()
+    for i in range(max(1, nb_videos // 2)):
+        child = CompositeVideo()
+        child.append_video(RawTextBasedVideo(f"A cat walking in a forest, scene {i}"))
+        child.append_video(RawTextBasedVideo(f"A cat sleeping in a forest, scene {i}"))
+        root.append_video(child)
+    return root
+
+
+async def create_prompt_based_video(nb_videos: int):
+    """
+    A prompt based video, built from the subtitles of a recorded prompt
+    """
+    # The recorded prompt comes with the test medias, only found in a source checkout
+    from tests.testing_tools import (
+        create_fake_prompt_for_local_tests_moss_stones_train_boy,
+    )
+
+    return PromptBasedVideo(
+        prompt=create_fake_prompt_for_local_tests_moss_stones_train_boy()
+    )
+
+
+async def create_transitions(nb_videos: int):
+    """
+    Raw text based videos with a transition between each of them
+    """
+    composite = CompositeVideo()
+    videos = [
+        RawTextBasedVideo(f"A cat walking in a forest, scene {i}")
+        for i in range(max(2, nb_videos))
+    ]
+    composite.append_video(videos[0])
+    for source_video, target_video in zip(videos, videos[1:]):
+        composite.append_video(SeineTransition(source_video, target_video))
+        composite.append_video(target_video)
+    return composite
+
+
+SCENARIOS = {
+    "raw_text_videos": create_raw_text_videos,
+    "nested_composites": create_nested_composites,
+    "prompt_based_video": create_prompt_based_video,
+    "transitions": create_transitions,
+}
+
+
+def _get_peak_rss():
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit,
+    )
+
+
+def _get_cpu_time():
+    if resource is None:
+        return time.process_time()
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        self_usage.ru_utime
+        + self_usage.ru_stime
+        + children_usage.ru_utime
+        + children_usage.ru_stime
+    )
+
+
+@contextmanager
+def _count_ffmpeg_processes():
+    """
+    Count the ffmpeg and ffprobe processes started in the block, whether they are run by
+    the ffmpeg executor or not (media probes, ffmpeg-python calls...): all of them,
+    asyncio subprocesses included, are started through subprocess.Popen
+
+    Yields:
+        list: The number of processes started so far, as its single item
+    """
+    counter = [0]
+    lock = threading.Lock()
+    popen = subprocess.Popen
+
+    class CountingPopen(popen):
+        def __init__(self, args, *popen_args, **popen_kwargs):
+            program = args.split()[0] if isinstance(args, str) else args[0]
+            program_name, _ = os.path.splitext(os.path.basename(os.fsdecode(program)))
+            if program_name in FFMPEG_PROGRAMS:
+                with lock:
+                    counter[0] += 1
+            super().__init__(args, *popen_args, **popen_kwargs)
+
+    subprocess.Popen = CountingPopen
+    try:
+        yield counter
+    finally:
+        subprocess.Popen = popen
+
+
+def _get_folder_size(path: str) -> int:
+    total_size = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            if not os.path.islink(file_path):
+                total_size += os.path.getsize(file_path)
+    return total_size
+
+
+async def run_scenario_async(
+    scenario: str,
+    latency: float = 0,
+    nb_videos: int = 3,
+    keep_outputs: bool = False,
+    **build_settings,
+) -> dict:
+    """
+    Build the video of a scenario and measure the build
+
+    Note the peak RSS is a high water mark of the whole process (peak_ffmpeg_rss being the one of
+    the largest subprocess), so run a single scenario per process to compare it between versions.
+    The ffmpeg jobs are all the ffmpeg and ffprobe processes run by the build, while
+    ffmpeg_wait_time only covers the ones run by the ffmpeg executor.
+
+    Args:
+        scenario (str): The name of the scenario, one of SCENARIOS
+        latency (float): The latency injected in each call to the fake ML models gateway, in seconds
+        nb_videos (int): The number of videos of the scenario
+        keep_outputs (bool): Whether to keep the files generated by the build
+        build_settings: Additional VideoBuildSettings arguments, like fused_post_build
+
+    Returns:
+        dict: The measures of the build
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(
+            f"Unknown scenario {scenario}, expected one of {list(SCENARIOS)}"
+        )
+
+    tracer = get_tracer()
+    tracer_was_enabled = tracer.enabled
+    tracer.reset()
+    tracer.enable()
+    ffmpeg_executor = get_ffmpeg_executor()
+    ffmpeg_executor.reset_metrics()
+    clear_media_probe_cache()
+
+    gateway = FakeMLModelsGateway(sleep_time=latency)
+    try:
+        working_folder = WorkingFolderContext(mark=f"benchmark-{scenario}")
+        working_folder_path = os.path.abspath(working_folder.path)
+        with working_folder, _count_ffmpeg_processes() as nb_ffmpeg_jobs:
+            video = await SCENARIOS[scenario](nb_videos)
+
+            start_cpu_time = _get_cpu_time()
+            start_time = time.perf_counter()
+            await LocalEngine(
+                build_settings=VideoBuildSettings(
+                    test_mode=True, ml_models_gateway=gateway, **build_settings
+                )
+            ).generate_async(video)
+            latency_measured = time.perf_counter() - start_time
+            cpu_time = _get_cpu_time() - start_cpu_time
+            ffmpeg_jobs = nb_ffmpeg_jobs[0]
+            duration = video.get_duration()
+    finally:
+        if not tracer_was_enabled:
+            tracer.disable()
+
+    peak_rss, peak_ffmpeg_rss = _get_peak_rss()
+    spans = tracer.get_summary()
+    result = {
+        "scenario": scenario,
+        "latency": latency_measured,
+        "cpu_time": cpu_time,
+        "video_duration": duration,
+        "ffmpeg_jobs": ffmpeg_jobs,
+        "ffmpeg_wait_time": ffmpeg_executor.get_metrics()["total_wait_time"],
+        "bytes_written": _get_folder_size(working_folder_path),
+        "peak_rss": peak_rss,
+        "peak_ffmpeg_rss": peak_ffmpeg_rss,
+        "stages": {
+            name: {"count": stage["count"], "wall_time": stage["wall_time"]}
+            for name, stage in spans.items()
+        },
+    }
+    tracer.reset()
+
+    if not keep_outputs:
+        shutil.rmtree(working_folder_path, ignore_errors=True)
+
+    logger.info(
+        f"Benchmark scenario {scenario} built in {latency_measured:.2f}s, "
+        f"{result['ffmpeg_jobs']} ffmpeg jobs, {result['bytes_written']} bytes written"
+    )
+    return result
+
+
+async def run_benchmark_async(
+    scenarios: list[str] = None,
+    label: str = None,
+    latency: float = 0,
+    nb_videos: int = 3,
+    keep_outputs: bool = False,
+    **build_settings,
+) -> dict:
+    """
+    Run benchmark scenarios one after the other
+
+    Args:
+        scenarios (list): The names of the scenarios to run, all of them by default
+        label (str): The label of the run, typically a version or a commit, to compare runs
+        latency (float): The latency injected in each call to the fake ML models gateway, in seconds
+        nb_videos (int): The number of videos of each scenario
+        keep_outputs (bool): Whether to keep the files generated by the builds
+        build_settings: Additional VideoBuildSettings arguments, like fused_post_build
+
+    Returns:
+        dict: The run, with its settings, environment and the measures of each scenario
+    """
+    results = []
+    for scenario in scenarios or list(SCENARIOS):
+        results.append(
+            await run_scenario_async(
+                scenario,
+                latency=latency,
+                nb_videos=nb_videos,
+                keep_outputs=keep_outputs,
+                **build_settings,
+            )
+        )
+
+    return {
+        "label": label or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "date": datetime.datetime.now().isoformat(),
+        "settings": dict(build_settings, latency=latency, nb_videos=nb_videos),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def load_benchmark_runs(results_file: str) -> list[dict]:
+    """
+    Load the benchmark runs stored in a results file, an empty list if there is none
+    """
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file, "r") as f:
+        return json.load(f)
+
+
+def save_benchmark_run(run: dict, results_file: str) -> str:
+    """
+    Append a benchmark run to a results file, so runs of different versions can be compared
+
+    Returns:
+        str: The path of the results file
+    """
+    runs = load_benchmark_runs(results_file)
+    runs.append(run)
+    with open(results_file, "w") as f:
+        json.dump(runs, f, indent=2)
+    return results_file
+
+
+def compare_benchmark_runs(baseline: dict, run: dict) -> dict:
+    """
+    Compare the measures of a run to the ones of a baseline run, for the scenarios they share
+
+    Args:
+        baseline (dict): The baseline run
+        run (dict): The run to compare
+
+    Returns:
+        dict: For each scenario and metric, the baseline value, the new value and their ratio
+    """
+    baseline_results = {result["scenario"]: result for result in baseline["results"]}
+    comparison = {}
+    for result in run["results"]:
+        baseline_result = baseline_results.get(result["scenario"])
+        if baseline_result is None:
+            continue
+        comparison[result["scenario"]] = {
+            metric: {
+                "baseline": baseline_result[metric],
+                "value": result[metric],
+                "ratio": (
+                    result[metric] / baseline_result[metric]
+                    if baseline_result[metric] and result[metric] is not None
+                    else None
+                ),
+            }
+            for metric in COMPARED_METRICS
+        }
+    return comparison
+
+
+def format_comparison(comparison: dict) -> str:
+    """
+    Format a comparison of benchmark runs as a text table
+    """
+    lines = [
+        f"{'scenario':<22}{'metric':<16}{'baseline':>16}{'value':>16}{'ratio':>10}"
+    ]
+    for scenario, metrics in comparison.items():
+        for metric, values in metrics.items():
+            baseline_value, value, ratio = (
+                f"{values[name]:.2f}" if values[name] is not None else "-"
+                for name in ("baseline", "value", "ratio")
+            )
+            lines.append(
+                f"{scenario:<22}{metric:<16}{baseline_value:>16}{value:>16}{ratio:>10}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark of the local build path"
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Scenario to run, may be repeated, all of them by default",
+    )
+    parser.add_argument("--label", help="Label of the run, e.g. a version")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="Latency injected in each ML model call, in seconds",
+    )
+    parser.add_argument(
+        "--nb-videos", type=int, default=3, help="Number of videos per scenario"
+    )
+    parser.add_argument("--fused-post-build", action="store_true")
+    parser.add_argument("--flatten-composites", action="store_true")
+    parser.add_argument(
+        "--results",
+        default="benchmark_results.json",
+        help="File the runs are appended to",
+    )
+    parser.add_argument(
+        "--compare-to", help="Label of a stored run to compare this run to"
+    )
+    parser.add_argument("--keep-outputs", action="store_true")
+    args = parser.parse_args(argv)
+
+    results_file = os.path.abspath(args.results)
+    run = asyncio.run(
+        run_benchmark_async(
+            scenarios=args.scenario,
+            label=args.label,
+            latency=args.latency,
+            nb_videos=args.nb_videos,
+            keep_outputs=args.keep_outputs,
+            fused_post_build=args.fused_post_build,
+            flatten_composites=args.flatten_composites,
+        )
+    )
+    save_benchmark_run(run, results_file)
+    print(json.dumps(run["results"], indent=2))
+
+    if args.compare_to:
+        baselines = [
+            stored_run
+            for stored_run in load_benchmark_runs(results_file)
+            if stored_run["label"] == args.compare_to
+        ]
+        if not baselines:
+            raise ValueError(f"No benchmark run labelled {args.compare_to}")
+        print(format_comparison(compare_benchmark_runs(baselines[-1], run)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+
+import numpy as np
+from loguru import logger
+
+import vikit.common.config as config
+from vikit.wrappers.ffmpeg_executor import get_ffmpeg_executor
+
+ANALYSIS_SAMPLE_RATE = 8000  # plenty to follow the energy of speech
+FRAME_DURATION = 0.02  # in seconds, the resolution of the energy envelope
+
+
+async def load_pcm_async(
+    audiofile_path: str, sample_rate: int = ANALYSIS_SAMPLE_RATE
+) -> np.ndarray:
+    """
+    Decode an audio file to mono PCM samples using ffmpeg
+
+    Args:
+        audiofile_path (str): The path to the audio file
+        sample_rate (int): The sample rate of the decoded samples
+
+    Returns:
+        np.ndarray: The int16 samples
+    """
+    _, stdout, _ = await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-i",
+            audiofile_path,
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-f",
+            "s16le",
+            "-",
+        ]
+    )
+    return np.frombuffer(stdout, dtype=np.int16)
+
+
+def get_rms_envelope(
+    samples: np.ndarray, sample_rate: int, frame_duration: float = FRAME_DURATION
+) -> np.ndarray:
+    """
+    Compute the RMS energy of consecutive frames of the samples
+
+    Args:
+        samples (np.ndarray): The int16 or float samples
+        sample_rate (int): The sample rate of the samples
+        frame_duration (float): The duration of a frame, in seconds
+
+    Returns:
+        np.ndarray: The RMS energy of each frame, relative to full scale
+    """
+    frame_length = max(1, int(round(sample_rate * frame_duration)))
+    nb_frames = -(-len(samples) // frame_length)  # the last frame is zero padded
+    frames = np.zeros(nb_frames * frame_length, dtype=np.float32)
+    frames[: len(samples)] = samples
+    if np.issubdtype(samples.dtype, np.integer):
+        frames /= np.iinfo(samples.dtype).max
+    frames = frames.reshape(nb_frames, frame_length)
+    return np.sqrt(np.mean(np.square(frames), axis=1))
+
+
+def detect_silences(
+    envelope: np.ndarray,
+    frame_duration: float = FRAME_DURATION,
+    threshold: float = -35,
+    min_silence_duration: float = 0.3,
+) -> list[tuple]:
+    """
+    Detect the silences of an energy envelope
+
+    Args:
+        envelope (np.ndarray): The RMS energy of each frame, relative to full scale
+        frame_duration (float): The duration of a frame, in seconds
+        threshold (float): The energy under which a frame is silent, in dBFS
+        min_silence_duration (float): The minimum duration of a silence, in seconds
+
+    Returns:
+        list: The (start, end) of the silences in seconds, in order
+    """
+    is_silent = envelope < 10 ** (threshold / 20)
+    # The silences start where the frames become silent and end where they stop being
+    edges = np.diff(np.concatenate(([0], is_silent.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    long_enough = (ends - starts) * frame_duration >= min_silence_duration
+    return [
+        (round(float(start * frame_duration), 3), round(float(end * frame_duration), 3))
+        for start, end in zip(starts[long_enough], ends[long_enough])
+    ]
+
+
+async def detect_pauses_async(
+    audiofile_path: str, threshold: float = None, min_silence_duration: float = None
+) -> list[tuple]:
+    """
+    Detect the natural pauses of a recording from the energy of its decoded samples
+
+    Args:
+        audiofile_path (str): The path to the audio file
+        threshold (float): The energy under which the sound is a pause, in dBFS,
+        defaults to the SUBTITLES_SILENCE_THRESHOLD configuration
+        min_silence_duration (float): The minimum duration of a pause, in seconds,
+        defaults to the SUBTITLES_MIN_SILENCE_DURATION configuration
+
+    Returns:
+        list: The (start, end) of the pauses in seconds, in order
+    """
+    samples = await load_pcm_async(audiofile_path)
+    pauses = await asyncio.to_thread(
+        lambda: detect_silences(
+            get_rms_envelope(samples, ANALYSIS_SAMPLE_RATE),
+            threshold=(
+                threshold
+                if threshold is not None
+                else config.get_subtitles_silence_threshold()
+            ),
+            min_silence_duration=(
+                min_silence_duration
+                if min_silence_duration is not None
+                else config.get_subtitles_min_silence_duration()
+            ),
+        )
+    )
+    logger.debug(f"Detected {len(pauses)} pauses in {audiofile_path}")
+    return pauses
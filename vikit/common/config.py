@@ -40,6 +40,271 @@ def get_media_polling_interval() -> int:
     return int(media_polling_interval)
 
 
+def get_max_concurrent_llm_calls() -> int:
+    """
+    The maximum number of LLM calls in flight at the same time when a batch of prompts is processed
+    """
+    max_concurrent_llm_calls = os.getenv("MAX_CONCURRENT_LLM_CALLS", 8)
+    if max_concurrent_llm_calls is None:
+        raise Exception("MAX_CONCURRENT_LLM_CALLS is not set")
+    return int(max_concurrent_llm_calls)
+
+
+def get_job_polling_initial_interval() -> float:
+    """
+    The delay before the first status check of a generation job, in seconds
+    """
+    job_polling_initial_interval = os.getenv("JOB_POLLING_INITIAL_INTERVAL", 1)
+    if job_polling_initial_interval is None:
+        raise Exception("JOB_POLLING_INITIAL_INTERVAL is not set")
+    return float(job_polling_initial_interval)
+
+
+def get_job_polling_max_interval() -> float:
+    """
+    The maximum delay between two status checks of a generation job, in seconds,
+    the delay growing exponentially up to it
+    """
+    job_polling_max_interval = os.getenv("JOB_POLLING_MAX_INTERVAL", 30)
+    if job_polling_max_interval is None:
+        raise Exception("JOB_POLLING_MAX_INTERVAL is not set")
+    return float(job_polling_max_interval)
+
+
+def get_job_polling_max_failures() -> int:
+    """
+    The number of consecutive failed status checks after which a generation job is
+    considered failed, the checks being retried with the polling backoff until then
+    """
+    job_polling_max_failures = os.getenv("JOB_POLLING_MAX_FAILURES", 5)
+    if job_polling_max_failures is None:
+        raise Exception("JOB_POLLING_MAX_FAILURES is not set")
+    return int(job_polling_max_failures)
+
+
+def get_max_concurrent_video_builds() -> int:
+    """
+    The maximum number of videos of a video tree being built at the same time,
+    0 means no limit
+    """
+    max_concurrent_video_builds = os.getenv("MAX_CONCURRENT_VIDEO_BUILDS", 8)
+    if max_concurrent_video_builds is None:
+        raise Exception("MAX_CONCURRENT_VIDEO_BUILDS is not set")
+    return int(max_concurrent_video_builds)
+
+
+def get_ffmpeg_max_concurrent_jobs() -> int:
+    """
+    The maximum number of ffmpeg processes running at the same time,
+    0 means it is inferred from the number of CPUs
+    """
+    ffmpeg_max_concurrent_jobs = os.getenv("FFMPEG_MAX_CONCURRENT_JOBS", 0)
+    if ffmpeg_max_concurrent_jobs is None:
+        raise Exception("FFMPEG_MAX_CONCURRENT_JOBS is not set")
+    return int(ffmpeg_max_concurrent_jobs)
+
+
+def get_ffmpeg_threads_per_job() -> int:
+    """
+    The number of threads each ffmpeg process may use, 0 means the CPUs are
+    shared evenly between the concurrent ffmpeg processes
+    """
+    ffmpeg_threads_per_job = os.getenv("FFMPEG_THREADS_PER_JOB", 0)
+    if ffmpeg_threads_per_job is None:
+        raise Exception("FFMPEG_THREADS_PER_JOB is not set")
+    return int(ffmpeg_threads_per_job)
+
+
+def get_instrumentation_enabled() -> bool:
+    """
+    Whether to collect timing spans of the builds, see vikit.common.instrumentation
+    """
+    instrumentation_enabled = os.getenv("INSTRUMENTATION_ENABLED", "false")
+    if instrumentation_enabled is None:
+        raise Exception("INSTRUMENTATION_ENABLED is not set")
+    return str(instrumentation_enabled).lower() in ("1", "true", "yes")
+
+
+def get_image_preparation_executor() -> str:
+    """
+    The pool running the image preparation of the gateways, "thread" or "process"
+    """
+    image_preparation_executor = os.getenv("IMAGE_PREPARATION_EXECUTOR", "thread")
+    if image_preparation_executor is None:
+        raise Exception("IMAGE_PREPARATION_EXECUTOR is not set")
+    return str(image_preparation_executor).lower()
+
+
+def get_image_preparation_max_workers() -> int:
+    """
+    The number of workers preparing images, 0 to size the pool on the number of CPUs
+    """
+    image_preparation_max_workers = os.getenv("IMAGE_PREPARATION_MAX_WORKERS", 0)
+    if image_preparation_max_workers is None:
+        raise Exception("IMAGE_PREPARATION_MAX_WORKERS is not set")
+    return int(image_preparation_max_workers)
+
+
+def get_generated_media_cache_dir() -> str:
+    """
+    The folder where media generated by ML models are cached, so the same generation
+    request is not paid twice. The cache is disabled when not set
+    """
+    return os.getenv("GENERATED_MEDIA_CACHE_DIR", None)
+
+
+def get_generated_media_cache_max_size_mb() -> int:
+    """
+    The maximum size of the generated media cache, in megabytes, before the least
+    recently used media get evicted
+    """
+    generated_media_cache_max_size_mb = os.getenv(
+        "GENERATED_MEDIA_CACHE_MAX_SIZE_MB", 2048
+    )
+    if generated_media_cache_max_size_mb is None:
+        raise Exception("GENERATED_MEDIA_CACHE_MAX_SIZE_MB is not set")
+    return int(generated_media_cache_max_size_mb)
+
+
+def get_llm_cache_enabled() -> bool:
+    """
+    Whether the answers of the LLM calls (keywords, enhanced prompts) are cached
+    """
+    llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true")
+    if llm_cache_enabled is None:
+        raise Exception("LLM_CACHE_ENABLED is not set")
+    return str(llm_cache_enabled).lower() in ("1", "true", "yes")
+
+
+def get_llm_cache_path() -> str:
+    """
+    The SQLite database persisting the LLM cache between builds, the cache is kept
+    in memory when not set
+    """
+    return os.getenv("LLM_CACHE_PATH", None)
+
+
+def get_llm_cache_ttl() -> float:
+    """
+    The time to live of the LLM cache entries, in seconds
+    """
+    llm_cache_ttl = os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)
+    if llm_cache_ttl is None:
+        raise Exception("LLM_CACHE_TTL is not set")
+    return float(llm_cache_ttl)
+
+
+def get_llm_cache_max_entries() -> int:
+    """
+    The maximum number of entries of the LLM cache, before the least recently used
+    ones get evicted
+    """
+    llm_cache_max_entries = os.getenv("LLM_CACHE_MAX_ENTRIES", 10000)
+    if llm_cache_max_entries is None:
+        raise Exception("LLM_CACHE_MAX_ENTRIES is not set")
+    return int(llm_cache_max_entries)
+
+
+def get_rate_limit_requests_per_second(provider: str = None) -> float:
+    """
+    The sustained rate of requests sent to a model provider, 0 for no limit, the default:
+    set it to the quota of your account with the provider.
+    May be set per provider, e.g. HAIPER_RATE_LIMIT_REQUESTS_PER_SECOND
+    """
+    rate_limit_requests_per_second = _get_provider_setting(
+        "RATE_LIMIT_REQUESTS_PER_SECOND", provider, 0
+    )
+    if rate_limit_requests_per_second is None:
+        raise Exception("RATE_LIMIT_REQUESTS_PER_SECOND is not set")
+    return float(rate_limit_requests_per_second)
+
+
+def get_rate_limit_burst(provider: str = None) -> int:
+    """
+    The number of requests that may be sent at once to a model provider above the sustained rate,
+    only used along with a rate limit, 0 for no burst.
+    May be set per provider, e.g. HAIPER_RATE_LIMIT_BURST
+    """
+    rate_limit_burst = _get_provider_setting("RATE_LIMIT_BURST", provider, 0)
+    if rate_limit_burst is None:
+        raise Exception("RATE_LIMIT_BURST is not set")
+    return int(rate_limit_burst)
+
+
+def get_rate_limit_max_in_flight(provider: str = None) -> int:
+    """
+    The maximum number of requests in flight to a model provider, 0 for no limit, the default.
+    May be set per provider, e.g. HAIPER_RATE_LIMIT_MAX_IN_FLIGHT
+    """
+    rate_limit_max_in_flight = _get_provider_setting(
+        "RATE_LIMIT_MAX_IN_FLIGHT", provider, 0
+    )
+    if rate_limit_max_in_flight is None:
+        raise Exception("RATE_LIMIT_MAX_IN_FLIGHT is not set")
+    return int(rate_limit_max_in_flight)
+
+
+def get_provider_routing_enabled() -> bool:
+    """
+    Whether slow video generation requests are hedged with, and failing providers failed
+    over to, their fallback provider, see vikit.gateways.provider_router
+    """
+    provider_routing_enabled = os.getenv("PROVIDER_ROUTING_ENABLED", "false")
+    if provider_routing_enabled is None:
+        raise Exception("PROVIDER_ROUTING_ENABLED is not set")
+    return str(provider_routing_enabled).lower() in ("1", "true", "yes")
+
+
+def get_fallback_model_provider(provider: str = None) -> str:
+    """
+    The model provider a request is hedged with or failed over to, none by default.
+    May be set per provider, e.g. HAIPER_FALLBACK_MODEL_PROVIDER
+    """
+    return _get_provider_setting("FALLBACK_MODEL_PROVIDER", provider, None)
+
+
+def get_provider_hedge_quantile() -> float:
+    """
+    The quantile of the recent latencies of a provider after which a request is hedged
+    """
+    provider_hedge_quantile = os.getenv("PROVIDER_HEDGE_QUANTILE", 0.95)
+    if provider_hedge_quantile is None:
+        raise Exception("PROVIDER_HEDGE_QUANTILE is not set")
+    return float(provider_hedge_quantile)
+
+
+def get_provider_hedge_default_delay() -> float:
+    """
+    The delay after which a request is hedged, in seconds, until the latencies of
+    the provider are known
+    """
+    provider_hedge_default_delay = os.getenv("PROVIDER_HEDGE_DEFAULT_DELAY", 120)
+    if provider_hedge_default_delay is None:
+        raise Exception("PROVIDER_HEDGE_DEFAULT_DELAY is not set")
+    return float(provider_hedge_default_delay)
+
+
+def get_provider_max_consecutive_failures() -> int:
+    """
+    The number of errors in a row after which a provider is failed over to its fallback
+    """
+    provider_max_consecutive_failures = os.getenv(
+        "PROVIDER_MAX_CONSECUTIVE_FAILURES", 3
+    )
+    if provider_max_consecutive_failures is None:
+        raise Exception("PROVIDER_MAX_CONSECUTIVE_FAILURES is not set")
+    return int(provider_max_consecutive_failures)
+
+
+def _get_provider_setting(name: str, provider: str = None, default=None):
+    # The setting of a given provider overrides the one shared by all the providers
+    if provider:
+        provider_setting = os.getenv(f"{provider.upper()}_{name}", None)
+        if provider_setting is not None:
+            return provider_setting
+    return os.getenv(name, default)
+
+
 def get_default_background_music() -> str:
     default_background_music = os.getenv("DEFAULT_BACKGROUND_MUSIC", None)
     if default_background_music is None:
@@ -76,6 +341,27 @@ def get_nb_retries_http_calls() -> int:
     return int(nb_retries_http_calls)
 
 
+def get_http_max_connections() -> int:
+    """
+    The maximum number of simultaneous HTTP connections of a shared HTTP session
+    """
+    http_max_connections = os.getenv("HTTP_MAX_CONNECTIONS", 100)
+    if http_max_connections is None:
+        raise Exception("HTTP_MAX_CONNECTIONS is not set")
+    return int(http_max_connections)
+
+
+def get_http_max_connections_per_host() -> int:
+    """
+    The maximum number of simultaneous HTTP connections to a same host, typically
+    the Vikit backend, of a shared HTTP session
+    """
+    http_max_connections_per_host = os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 20)
+    if http_max_connections_per_host is None:
+        raise Exception("HTTP_MAX_CONNECTIONS_PER_HOST is not set")
+    return int(http_max_connections_per_host)
+
+
 def get_prompt_mp3_file_name(uuid = creation_uuid) -> str:
     """
     The name of the mp3 file either converted from user  or
@@ -107,6 +393,78 @@ def get_video_length_per_subtitle() -> int:
     return int(video_length_per_subtitle)
 
 
+def get_subtitles_parallel_transcription() -> bool:
+    """
+    Whether the slices of a recording are cut on silences and transcribed concurrently,
+    instead of one after another
+    """
+    parallel_transcription = os.getenv("SUBTITLES_PARALLEL_TRANSCRIPTION", "false")
+    if parallel_transcription is None:
+        raise Exception("SUBTITLES_PARALLEL_TRANSCRIPTION is not set")
+    return str(parallel_transcription).lower() in ("1", "true", "yes")
+
+
+def get_max_concurrent_transcriptions() -> int:
+    """
+    The maximum number of slices of a recording transcribed at the same time
+    """
+    max_concurrent_transcriptions = os.getenv("MAX_CONCURRENT_TRANSCRIPTIONS", 4)
+    if max_concurrent_transcriptions is None:
+        raise Exception("MAX_CONCURRENT_TRANSCRIPTIONS is not set")
+    return int(max_concurrent_transcriptions)
+
+
+def get_subtitles_silence_search_window() -> float:
+    """
+    How far before the end of a slice a silence is looked for to cut the slice, in seconds
+    """
+    silence_search_window = os.getenv("SUBTITLES_SILENCE_SEARCH_WINDOW", 30)
+    if silence_search_window is None:
+        raise Exception("SUBTITLES_SILENCE_SEARCH_WINDOW is not set")
+    return float(silence_search_window)
+
+
+def get_subtitles_silence_threshold() -> float:
+    """
+    The energy under which the sound of a recording is considered as a pause, in dBFS
+    """
+    silence_threshold = os.getenv("SUBTITLES_SILENCE_THRESHOLD", -35)
+    if silence_threshold is None:
+        raise Exception("SUBTITLES_SILENCE_THRESHOLD is not set")
+    return float(silence_threshold)
+
+
+def get_subtitles_min_silence_duration() -> float:
+    """
+    The minimum duration of a pause of a recording, in seconds
+    """
+    min_silence_duration = os.getenv("SUBTITLES_MIN_SILENCE_DURATION", 0.3)
+    if min_silence_duration is None:
+        raise Exception("SUBTITLES_MIN_SILENCE_DURATION is not set")
+    return float(min_silence_duration)
+
+
+def get_tts_batch_max_characters() -> int:
+    """
+    The maximum number of characters synthesized in one text to speech call, longer
+    texts being split into batches of sentences synthesized concurrently
+    """
+    tts_batch_max_characters = os.getenv("TTS_BATCH_MAX_CHARACTERS", 1000)
+    if tts_batch_max_characters is None:
+        raise Exception("TTS_BATCH_MAX_CHARACTERS is not set")
+    return int(tts_batch_max_characters)
+
+
+def get_tts_max_concurrent_batches() -> int:
+    """
+    The maximum number of text to speech batches synthesized at the same time
+    """
+    tts_max_concurrent_batches = os.getenv("TTS_MAX_CONCURRENT_BATCHES", 4)
+    if tts_max_concurrent_batches is None:
+        raise Exception("TTS_MAX_CONCURRENT_BATCHES is not set")
+    return int(tts_max_concurrent_batches)
+
+
 def get_nb_subs_per_video() -> int:
     """
     The number of subtitles to generate per video
@@ -23,42 +23,60 @@ from loguru import logger
 
 def log_function_params(func):
     """
-    Decorator to log the parameters of a function
+    Decorator to log the parameters, result and execution time of a function,
+    works on both regular and coroutine functions
     """
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        """
-        Wrapper function to log the parameters of a function
-
-        """
-        start_time = time.time()
+    def log_call(args, kwargs):
         param_values = (
             ", ".join(repr(arg) for arg in args)
             + ", "
             + ", ".join(f"{key}={value}" for key, value in kwargs.items())
         )[:50]
 
-        # Get the name of the test from the call stack
-        stack = inspect.stack()
-        test_name = None
-        for frame in stack:
-            if frame.function.startswith("test_"):
-                test_name = frame.function
-                break
+        # pytest exposes the running test through the environment, which is much cheaper
+        # than walking the call stack
+        test_name = os.environ.get("PYTEST_CURRENT_TEST")
 
         logger.debug(
             f"Called function {func.__name__} with parameters : {param_values} in module {func.__module__} from test {test_name}, current folder is {os.getcwd()}"
         )
-        result = func(*args, **kwargs)
+        return test_name
+
+    def log_result(result, start_time, test_name):
         logger.debug(
             f"Returned from {func.__name__} : {result} in module {func.__module__} from test {test_name}"
         )
-        end_time = time.time()
         logger.debug(
-            f"Execution time for {func.__name__} : {end_time - start_time} on in module {func.__module__} from test {test_name}"
+            f"Execution time for {func.__name__} : {time.perf_counter() - start_time} on in module {func.__module__} from test {test_name}"
         )
 
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            """
+            Wrapper function to log the parameters of a coroutine function
+
+            """
+            start_time = time.perf_counter()
+            test_name = log_call(args, kwargs)
+            result = await func(*args, **kwargs)
+            log_result(result, start_time, test_name)
+            return result
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        """
+        Wrapper function to log the parameters of a function
+
+        """
+        start_time = time.perf_counter()
+        test_name = log_call(args, kwargs)
+        result = func(*args, **kwargs)
+        log_result(result, start_time, test_name)
         return result
 
     return wrapper
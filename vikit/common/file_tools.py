@@ -14,6 +14,7 @@
 # ==============================================================================
 
 import os
+import random
 import re
 import shutil
 import sys
@@ -29,8 +30,11 @@ from loguru import logger
 from tenacity import retry, stop_after_attempt
 
 from vikit.common.config import get_nb_retries_http_calls
+from vikit.common.http_session import get_shared_http_session_pool
 
 TIMEOUT = 10  # seconds before stopping the request to check an URL exists
+MEDIA_CHECK_INITIAL_INTERVAL = 0.5  # seconds between the first checks of a media being uploaded
+MEDIA_CHECK_MAX_INTERVAL = 5  # seconds between two checks of a media being uploaded, at most
 
 
 def get_canonical_name(file_path: str):
@@ -129,6 +133,87 @@ def file_url_exists(url):
     return False
 
 
+def _local_url_exists(url: str) -> bool:
+    return os.path.exists(url) or file_url_exists(url)
+
+
+async def web_url_exists_async(url: str, timeout: float = TIMEOUT) -> bool:
+    """
+    Check if a URL exists on the web with a HEAD request, through the shared HTTP session
+    so the check reuses keep-alive connections and does not block the event loop
+    """
+    try:
+        async with get_shared_http_session_pool().borrow_session() as session:
+            async with session.head(
+                url,
+                allow_redirects=True,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                if response.status not in (403, 405):
+                    return response.status < 400
+            # Some storages do not allow HEAD requests, we ask for the first byte instead
+            async with session.get(
+                url,
+                headers={"Range": "bytes=0-0"},
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                return response.status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return False
+
+
+async def url_exists_async(url: str, timeout: float = TIMEOUT) -> bool:
+    """
+    Check if a URL exists somewhere on the internet or locally, without blocking the event loop:
+    web URLs are checked with an HTTP HEAD request, local paths in a thread
+
+    Args:
+        url (str): The URL to check
+        timeout (float): The maximum time to wait for a web server answer, in seconds
+
+    Returns:
+        bool: True if the URL exists, False otherwise
+    """
+    assert url, "url cannot be None"
+
+    if url.startswith(("http://", "https://")):
+        return await web_url_exists_async(url, timeout=timeout)
+    return await asyncio.to_thread(_local_url_exists, url)
+
+
+async def wait_for_url_async(
+    url: str,
+    timeout: float,
+    initial_interval: float = MEDIA_CHECK_INITIAL_INTERVAL,
+    max_interval: float = MEDIA_CHECK_MAX_INTERVAL,
+) -> bool:
+    """
+    Wait for a URL to become available, e.g. a generated media still being uploaded, checking it
+    with an exponential backoff and some jitter
+
+    Args:
+        url (str): The URL to wait for
+        timeout (float): The maximum time to wait for, in seconds
+        initial_interval (float): The delay before the second check, in seconds
+        max_interval (float): The maximum delay between two checks, in seconds
+
+    Returns:
+        bool: True if the URL became available, False if it still is not after the timeout
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interval = initial_interval
+    while True:
+        remaining_time = deadline - loop.time()
+        if await url_exists_async(url, timeout=max(1, min(TIMEOUT, remaining_time))):
+            return True
+        remaining_time = deadline - loop.time()
+        if remaining_time <= 0:
+            return False
+        await asyncio.sleep(min(remaining_time, interval * random.uniform(0.5, 1.5)))
+        interval = min(interval * 2, max_interval)
+
+
 def url_exists(url: str):
     """
     Check if a URL exists somewhere on the internet or locally. To be superseded by a more
@@ -240,7 +325,7 @@ async def download_or_copy_file(url, local_path):
         local_path = local_path[-255:]
     if not error:
         if path_desc["type"] == "http" or path_desc["type"] == "https":
-            async with aiohttp.ClientSession() as session:
+            async with get_shared_http_session_pool().borrow_session() as session:
                 logger.debug(f"Downloading file from {url} to {local_path}")
                 async with session.get(url) as response:
                     if response.status == 200:
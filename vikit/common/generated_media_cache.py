@@ -0,0 +1,268 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+from loguru import logger
+
+import vikit.common.config as config
+from vikit.common.file_tools import download_or_copy_file
+
+MEDIA_EXTENSION = ".mp4"
+METADATA_EXTENSION = ".json"
+GENERATION_CACHE_KEY = "generation_cache_key"  # video metadata recording the key of its last generation
+
+
+class GeneratedMediaCache:
+    """
+    A persistent, content addressed cache for media generated by ML models, so we
+    don't pay twice for the exact same generation request.
+
+    - the key is a hash of the normalized generation request (prompt, provider, settings...)
+    - each entry is stored as a local media file plus a json metadata sidecar
+    - once the cache grows over its maximum size, the least recently used entries are evicted
+
+    The builds work on their own link (or copy) of the cached media, checked out to a target
+    path, so evicting an entry never removes a file a running build is using
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = None):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir (str): The folder where the cached media are stored
+            max_size_bytes (int): The maximum size of the cache, None means no limit
+        """
+        if not cache_dir:
+            raise ValueError("The cache folder should be provided")
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """
+        Compute the key of a generation request
+
+        Text values are normalized (trimmed, whitespaces collapsed) so that cosmetic
+        differences in a prompt do not prevent a cache hit
+
+        Args:
+            request: The parameters of the generation request
+
+        Returns:
+            str: The hexadecimal key of the request
+        """
+        normalized_request = {
+            name: (" ".join(value.split()) if isinstance(value, str) else value)
+            for name, value in request.items()
+        }
+        serialized_request = json.dumps(
+            normalized_request, sort_keys=True, default=str
+        ).encode("utf-8")
+        return hashlib.sha256(serialized_request).hexdigest()
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """
+        Compute the content hash of a local file, to be used as part of a request key
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def get(self, key: str, target_path: str = None):
+        """
+        Get the cached media for a key, if any
+
+        Args:
+            key (str): The key of the generation request
+            target_path (str): Where to check the cached media out, see checkout
+
+        Returns:
+            str: The path to the cached media, or to its checked out copy when target_path
+            is given, None if the key is not cached
+        """
+        media_path, metadata_path = self._get_entry_paths(key)
+        if not (os.path.exists(media_path) and os.path.exists(metadata_path)):
+            return None
+
+        # Touching the sidecar keeps track of the last access for LRU eviction
+        os.utime(metadata_path)
+        logger.debug(f"Generated media cache hit for key {key}: {media_path}")
+        if target_path:
+            try:
+                return self.checkout(media_path, target_path)
+            except FileNotFoundError:
+                return None  # evicted in the meantime
+        return media_path
+
+    async def put(
+        self,
+        key: str,
+        media_url: str,
+        metadata: dict = None,
+        target_path: str = None,
+    ) -> str:
+        """
+        Store a generated media in the cache, downloading it if needed
+
+        Args:
+            key (str): The key of the generation request
+            media_url (str): The media to cache, could be a local path or a remote URL
+            metadata (dict): The metadata to store in the sidecar, typically the generation request
+            target_path (str): Where to check the cached media out, see checkout
+
+        Returns:
+            str: The path to the cached media, or to its checked out copy when target_path
+            is given
+        """
+        media_path, metadata_path = self._get_entry_paths(key)
+        if os.path.exists(media_path) and os.path.exists(metadata_path):
+            # Typically cached by another build sharing the same generation
+            os.utime(metadata_path)
+            logger.debug(f"Generated media already cached for key {key}")
+        else:
+            os.makedirs(os.path.dirname(media_path), exist_ok=True)
+            # Concurrent puts of the same key each write their own files, then atomically
+            # move them in place, so an entry is never made of interleaved writes
+            temp_suffix = f".{uuid.uuid4().hex}.part"
+            temp_media_path = media_path + temp_suffix
+            temp_metadata_path = metadata_path + temp_suffix
+            try:
+                await download_or_copy_file(url=media_url, local_path=temp_media_path)
+                with open(temp_metadata_path, "w") as f:
+                    json.dump(
+                        {
+                            "key": key,
+                            "source_url": media_url,
+                            "size": os.path.getsize(temp_media_path),
+                            "created_at": time.time(),
+                            "request": metadata if metadata else {},
+                        },
+                        f,
+                        default=str,
+                    )
+                os.replace(temp_media_path, media_path)
+                os.replace(temp_metadata_path, metadata_path)
+            finally:
+                for temp_path in (temp_media_path, temp_metadata_path):
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+            logger.debug(f"Generated media cached for key {key}: {media_path}")
+
+        if target_path:
+            # Checked out before eviction, so the build keeps its media whatever happens
+            media_path = self.checkout(media_path, target_path)
+        self.evict()
+        return media_path
+
+    @staticmethod
+    def checkout(media_path: str, target_path: str) -> str:
+        """
+        Give a build its own file of a cached media, a hard link when the file system
+        allows it, a copy otherwise. The file outlives the eviction of the cache entry
+
+        Args:
+            media_path (str): The path to the cached media
+            target_path (str): The path of the file of the build
+
+        Returns:
+            str: The target path
+        """
+        if os.path.abspath(target_path) == os.path.abspath(media_path):
+            return target_path
+        if os.path.lexists(target_path):
+            os.remove(target_path)
+        try:
+            os.link(media_path, target_path)
+        except OSError as e:
+            if isinstance(e, FileNotFoundError):
+                raise
+            shutil.copyfile(media_path, target_path)
+        return target_path
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its maximum size
+        """
+        if not self.max_size_bytes:
+            return
+
+        entries = []
+        total_size = 0
+        for folder, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if not file_name.endswith(METADATA_EXTENSION):
+                    continue
+                metadata_path = os.path.join(folder, file_name)
+                media_path = metadata_path[: -len(METADATA_EXTENSION)] + MEDIA_EXTENSION
+                if not os.path.exists(media_path):
+                    continue
+                size = os.path.getsize(media_path)
+                total_size += size
+                entries.append((os.path.getmtime(metadata_path), size, media_path))
+
+        entries.sort()
+        for _, size, media_path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            logger.debug(f"Evicting {media_path} from the generated media cache")
+            self._remove_entry(media_path)
+            total_size -= size
+
+    def _remove_entry(self, media_path: str):
+        metadata_path = media_path[: -len(MEDIA_EXTENSION)] + METADATA_EXTENSION
+        for path in (metadata_path, media_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _get_entry_paths(self, key: str):
+        # Sharding on the first characters of the key prevents huge flat folders
+        entry_path = os.path.join(self.cache_dir, key[:2], key)
+        return entry_path + MEDIA_EXTENSION, entry_path + METADATA_EXTENSION
+
+
+_generated_media_caches: dict[str, GeneratedMediaCache] = {}
+
+
+def get_generated_media_cache():
+    """
+    Get the process wide generated media cache, as configured
+
+    Returns:
+        GeneratedMediaCache: The cache, None if the cache is disabled
+    """
+    cache_dir = config.get_generated_media_cache_dir()
+    if not cache_dir:
+        return None
+    if cache_dir not in _generated_media_caches:
+        _generated_media_caches[cache_dir] = GeneratedMediaCache(
+            cache_dir=cache_dir,
+            max_size_bytes=config.get_generated_media_cache_max_size_mb()
+            * 1024
+            * 1024,
+        )
+    return _generated_media_caches[cache_dir]
@@ -15,9 +15,16 @@
 
 from abc import ABC, abstractmethod
 
+from vikit.common.instrumentation import CATEGORY_HANDLER, trace_async_methods
+
 
 class Handler(ABC):
 
+    def __init_subclass__(cls, **kwargs):
+        # Every handler execution is timed when instrumentation is enabled
+        super().__init_subclass__(**kwargs)
+        trace_async_methods(cls, CATEGORY_HANDLER, method_names=["execute_async"])
+
     @abstractmethod
     async def execute_async(self, object_to_transform, **kwargs):
         """
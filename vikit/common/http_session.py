@@ -0,0 +1,163 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import contextlib
+import weakref
+
+import aiohttp
+from loguru import logger
+
+import vikit.common.config as config
+
+DNS_CACHE_TTL = 300  # seconds during which resolved host names are kept
+KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept open for reuse
+
+_pools = weakref.WeakSet()  # every pool, so their sessions can be closed together
+_active_scopes = weakref.WeakKeyDictionary()  # number of open scopes per event loop
+
+
+class HttpSessionPool:
+    """
+    Lifecycle managed, shared aiohttp sessions with a tuned connector, so HTTP calls reuse
+    keep-alive connections instead of paying a TCP and TLS handshake each time, and the number
+    of concurrent connections to a given host is capped.
+
+    aiohttp sessions are bound to an event loop, so we keep one session per running loop.
+    They are closed when the outermost http_sessions_scope of their loop exits, the sessions
+    left behind by loops closed without doing so are dropped so the loops can be freed.
+    """
+
+    def __init__(
+        self,
+        timeout: aiohttp.ClientTimeout = None,
+        limit: int = None,
+        limit_per_host: int = None,
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            timeout (aiohttp.ClientTimeout): The default timeout of the requests
+            limit (int): The maximum number of simultaneous connections
+            limit_per_host (int): The maximum number of simultaneous connections to a same host
+        """
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._sessions = {}
+        _pools.add(self)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session of the running event loop, creating it if needed
+
+        Returns:
+            aiohttp.ClientSession: The shared session
+        """
+        loop = asyncio.get_running_loop()
+        for closed_loop in [other for other in self._sessions if other.is_closed()]:
+            # The sessions hold their loop, they would otherwise never be freed
+            del self._sessions[closed_loop]
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            logger.trace("Creating a new shared HTTP session")
+            connector = aiohttp.TCPConnector(
+                limit=(
+                    self.limit
+                    if self.limit is not None
+                    else config.get_http_max_connections()
+                ),
+                limit_per_host=(
+                    self.limit_per_host
+                    if self.limit_per_host is not None
+                    else config.get_http_max_connections_per_host()
+                ),
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout if self.timeout else aiohttp.ClientTimeout(total=300),
+            )
+            self._sessions[loop] = session
+        return session
+
+    def borrow_session(self) -> "BorrowedSession":
+        """
+        Get the shared session as an async context manager that does not close it on exit,
+        so it can replace a short lived aiohttp.ClientSession() block
+        """
+        return BorrowedSession(self)
+
+    async def close(self):
+        """
+        Close the shared session of the running event loop, if any. A new one will be created
+        on the next request
+        """
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+class BorrowedSession:
+    """
+    Async context manager giving access to a shared session without closing it on exit
+    """
+
+    def __init__(self, pool: HttpSessionPool):
+        self._pool = pool
+
+    async def __aenter__(self) -> aiohttp.ClientSession:
+        return self._pool.get_session()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+async def close_http_sessions():
+    """
+    Close the sessions of every pool opened from the running event loop
+    """
+    for pool in list(_pools):
+        await pool.close()
+
+
+@contextlib.asynccontextmanager
+async def http_sessions_scope():
+    """
+    Keep the shared sessions of the running event loop open while the scope lasts, they are
+    closed when its outermost scope exits. Used around builds, so an asyncio.run does not leave
+    sessions and sockets open behind it
+    """
+    loop = asyncio.get_running_loop()
+    _active_scopes[loop] = _active_scopes.get(loop, 0) + 1
+    try:
+        yield
+    finally:
+        _active_scopes[loop] -= 1
+        if not _active_scopes[loop]:
+            del _active_scopes[loop]
+            await close_http_sessions()
+
+
+_shared_http_session_pool = HttpSessionPool()
+
+
+def get_shared_http_session_pool() -> HttpSessionPool:
+    """
+    Get the process wide HTTP session pool, used for generic downloads and third party APIs
+    """
+    return _shared_http_session_pool
@@ -0,0 +1,185 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import base64
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import vikit.common.config as config
+
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+
+
+def encode_image(
+    image_bytes: bytes, target_size: tuple, image_format: str = "png"
+) -> str:
+    """
+    Resize an image and encode it as a base64 data URI
+
+    Args:
+        image_bytes (bytes): The raw bytes of the image
+        target_size (tuple): The (width, height) of the image
+        image_format (str): The format of the encoded image
+
+    Returns:
+        str: The base64 data URI of the image
+    """
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("The image could not be decoded")
+    resized_image = cv2.resize(
+        image, tuple(target_size), interpolation=cv2.INTER_AREA
+    )
+    _, buffer = cv2.imencode(f".{image_format}", resized_image)
+    return f"data:image/{image_format};base64," + base64.b64encode(buffer).decode(
+        "utf-8"
+    )
+
+
+def resize_base64_image(
+    image_base64: str, target_size: tuple, image_format: str = "png"
+) -> str:
+    """
+    Resize a base64 image, as returned by an image generation model, and encode it
+    as a base64 data URI
+    """
+    return encode_image(base64.b64decode(image_base64), target_size, image_format)
+
+
+def prepare_transition_images(source_image_path: str, target_image_path: str):
+    """
+    Resize the target image of a transition to the size of the source image if needed,
+    and encode both images in base64
+
+    Returns:
+        tuple: The base64 source and target images
+    """
+    source_image = cv2.imread(source_image_path)
+    target_image = cv2.imread(target_image_path)
+    if source_image.shape[:2] != target_image.shape[:2]:
+        target_size = (source_image.shape[1], source_image.shape[0])
+        cv2.imwrite(
+            target_image_path,
+            cv2.resize(target_image, target_size, interpolation=cv2.INTER_AREA),
+        )
+
+    encoded_images = []
+    for image_path in (source_image_path, target_image_path):
+        with open(image_path, "rb") as image_file:
+            encoded_images.append(base64.b64encode(image_file.read()).decode("ascii"))
+    return tuple(encoded_images)
+
+
+class ImagePreparationService:
+    """
+    Run the CPU bound image work of the gateways (decoding, resizing, encoding) in a pool,
+    so the event loop keeps serving the other clips in the meantime.
+
+    Threads suit most builds as OpenCV releases the GIL, processes may be used when the
+    base64 encoding of large images becomes the bottleneck
+    """
+
+    def __init__(self, executor_type: str = None, max_workers: int = None):
+        """
+        Initialize the service, the pool is created on first use
+
+        Args:
+            executor_type (str): "thread" or "process", defaults to the IMAGE_PREPARATION_EXECUTOR configuration
+            max_workers (int): The size of the pool, defaults to the IMAGE_PREPARATION_MAX_WORKERS configuration
+        """
+        self.executor_type = (
+            executor_type
+            if executor_type is not None
+            else config.get_image_preparation_executor()
+        )
+        if self.executor_type not in (THREAD_EXECUTOR, PROCESS_EXECUTOR):
+            raise ValueError(f"Unknown image preparation executor: {executor_type}")
+        self.max_workers = (
+            max_workers
+            if max_workers is not None
+            else config.get_image_preparation_max_workers()
+        )
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor
+                if self.executor_type == PROCESS_EXECUTOR
+                else ThreadPoolExecutor
+            )
+            # 0 lets the pool size itself on the number of CPUs
+            self._executor = executor_class(max_workers=self.max_workers or None)
+        return self._executor
+
+    async def run(self, func, *args):
+        """
+        Run a function in the pool, the function and its arguments should be picklable
+        when running in processes
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), functools.partial(func, *args)
+        )
+
+    async def encode_image_async(
+        self, image_bytes: bytes, target_size: tuple, image_format: str = "png"
+    ) -> str:
+        """
+        Resize an image and encode it as a base64 data URI, see encode_image
+        """
+        return await self.run(encode_image, image_bytes, target_size, image_format)
+
+    async def resize_base64_image_async(
+        self, image_base64: str, target_size: tuple, image_format: str = "png"
+    ) -> str:
+        """
+        Resize a base64 image and encode it as a base64 data URI, see resize_base64_image
+        """
+        return await self.run(
+            resize_base64_image, image_base64, target_size, image_format
+        )
+
+    async def prepare_transition_images_async(
+        self, source_image_path: str, target_image_path: str
+    ):
+        """
+        Get the base64 source and target images of a transition, see prepare_transition_images
+        """
+        return await self.run(
+            prepare_transition_images, source_image_path, target_image_path
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_image_preparation_service = None
+
+
+def get_image_preparation_service() -> ImagePreparationService:
+    """
+    Get the process wide image preparation service, as configured
+    """
+    global _image_preparation_service
+    if _image_preparation_service is None:
+        _image_preparation_service = ImagePreparationService()
+    return _image_preparation_service
@@ -0,0 +1,372 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import vikit.common.config as config
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Span categories
+CATEGORY_VIDEO = "video"
+CATEGORY_HANDLER = "handler"
+CATEGORY_GATEWAY = "gateway"
+CATEGORY_FFMPEG = "ffmpeg"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _get_cpu_time():
+    # The CPU time of this process plus the one of its terminated subprocesses, like ffmpeg
+    if resource is None:
+        return time.process_time()
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children_usage.ru_utime + children_usage.ru_stime
+
+
+def get_file_size(path) -> int:
+    """
+    Get the size of a local file, None if the path is not an existing local file
+    """
+    if not isinstance(path, str):
+        return None
+    try:
+        return os.path.getsize(path)
+    except (OSError, ValueError):
+        return None
+
+
+class Span:
+    """
+    A timed operation of a build, like building a video, running a handler,
+    calling a gateway or running ffmpeg
+    """
+
+    def __init__(
+        self,
+        span_id: int,
+        name: str,
+        category: str,
+        parent_id: int = None,
+        lane: int = 0,
+        **attributes,
+    ):
+        self.id = span_id
+        self.name = name
+        self.category = category
+        self.parent_id = parent_id
+        self.lane = lane  # spans of concurrent tasks are kept on separate lanes
+        self.attributes = attributes
+        self.error = None
+        self.start_time = time.time()
+        self._start_counter = time.perf_counter()
+        self._start_cpu_time = _get_cpu_time()
+        self.wall_time = None
+        self.cpu_time = None
+
+    def set_attribute(self, name: str, value):
+        """
+        Record an attribute of the span, like the bytes written by the operation
+        """
+        self.attributes[name] = value
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self._start_counter
+        self.cpu_time = _get_cpu_time() - self._start_cpu_time
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "category": self.category,
+            "start_time": self.start_time,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoSpan:
+    """
+    Stand-in used when instrumentation is disabled, so instrumented code does not need to check
+    """
+
+    def set_attribute(self, name: str, value):
+        pass
+
+
+_no_span = _NoSpan()
+
+
+class Tracer:
+    """
+    Collect spans around the main steps of the builds, to find out where the build time goes.
+
+    The collected spans can be exported as json, or as a Chrome trace that can be opened in
+    chrome://tracing or https://ui.perfetto.dev to get a flame graph of the builds.
+
+    Note the CPU time of a span is the one of the whole process (and of its terminated
+    subprocesses) during the span, so it includes concurrent operations.
+    """
+
+    def __init__(self, enabled: bool = None):
+        """
+        Initialize the tracer
+
+        Args:
+            enabled (bool): Whether to collect spans, defaults to the INSTRUMENTATION_ENABLED configuration
+        """
+        self.enabled = (
+            enabled if enabled is not None else config.get_instrumentation_enabled()
+        )
+        self._spans = []
+        self._span_ids = itertools.count(1)
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forget the collected spans
+        """
+        with self._lock:
+            self._spans = []
+            self._lanes = {}
+
+    def get_spans(self) -> list[Span]:
+        """
+        Get the finished spans, in the order they finished
+        """
+        with self._lock:
+            return list(self._spans)
+
+    @contextmanager
+    def span(self, name: str, category: str, **attributes):
+        """
+        Time the enclosed operation as a span, nested in the current span if any.
+        Works the same in sync and async code.
+
+        Args:
+            name (str): The name of the operation
+            category (str): The category of the operation, like video, handler, gateway or ffmpeg
+            attributes: Attributes of the operation, like a video id
+
+        Yields:
+            Span: The span, so attributes known during the operation can be added
+        """
+        if not self.enabled:
+            yield _no_span
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            span_id=next(self._span_ids),
+            name=name,
+            category=category,
+            parent_id=parent.id if parent else None,
+            lane=self._get_lane(),
+            **attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            with self._lock:
+                self._spans.append(span)
+
+    def _get_lane(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task else threading.get_ident()
+        with self._lock:
+            return self._lanes.setdefault(key, len(self._lanes) + 1)
+
+    def get_summary(self) -> dict:
+        """
+        Get the number of spans and their total wall and CPU times, by category and name
+
+        Returns:
+            dict: The summary, keyed on "category:name"
+        """
+        summary = {}
+        for span in self.get_spans():
+            entry = summary.setdefault(
+                f"{span.category}:{span.name}",
+                {"count": 0, "wall_time": 0.0, "cpu_time": 0.0, "errors": 0},
+            )
+            entry["count"] += 1
+            entry["wall_time"] += span.wall_time
+            entry["cpu_time"] += span.cpu_time
+            entry["errors"] += 1 if span.error else 0
+        return summary
+
+    def export_json(self, file_path: str):
+        """
+        Export the collected spans as a json file
+
+        Args:
+            file_path (str): The path of the json file
+
+        Returns:
+            str: The path of the json file
+        """
+        with open(file_path, "w") as f:
+            json.dump([span.to_dict() for span in self.get_spans()], f, default=str)
+        return file_path
+
+    def export_chrome_trace(self, file_path: str):
+        """
+        Export the collected spans in the Chrome trace event format
+
+        Args:
+            file_path (str): The path of the trace file
+
+        Returns:
+            str: The path of the trace file
+        """
+        trace_events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start_time * 1_000_000,
+                "dur": span.wall_time * 1_000_000,
+                "pid": os.getpid(),
+                "tid": span.lane,
+                "args": dict(
+                    span.attributes,
+                    cpu_time=span.cpu_time,
+                    **({"error": span.error} if span.error else {}),
+                ),
+            }
+            for span in self.get_spans()
+        ]
+        with open(file_path, "w") as f:
+            json.dump(
+                {"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, default=str
+            )
+        return file_path
+
+
+def traced(category: str, name: str = None, get_attributes=None):
+    """
+    Decorator timing each call of an async function as a span
+
+    Args:
+        category (str): The category of the spans
+        name (str): The name of the spans, defaults to the qualified name of the function
+        get_attributes: Optional function receiving the call arguments and returning the span attributes
+    """
+
+    def decorator(func):
+        span_name = name if name else func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return await func(*args, **kwargs)
+
+            attributes = get_attributes(*args, **kwargs) if get_attributes else {}
+            with tracer.span(span_name, category, **attributes) as span:
+                result = await func(*args, **kwargs)
+                bytes_out = get_file_size(result)
+                if bytes_out is not None:
+                    span.set_attribute("bytes_out", bytes_out)
+                return result
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    return decorator
+
+
+def trace_async_methods(cls, category: str, method_names=None):
+    """
+    Time the public async methods defined by a class, typically from the __init_subclass__
+    hook of a base class so every implementation gets instrumented
+
+    Args:
+        cls: The class to instrument
+        category (str): The category of the spans
+        method_names (list): The names of the methods to instrument, defaults to all the public coroutine functions
+    """
+    for method_name, method in list(vars(cls).items()):
+        if method_names is not None and method_name not in method_names:
+            continue
+        if method_name.startswith("_") or not asyncio.iscoroutinefunction(method):
+            continue
+        if getattr(method, "__traced__", False):
+            continue
+        setattr(
+            cls,
+            method_name,
+            traced(
+                category=category,
+                name=f"{cls.__name__}.{method_name}",
+                get_attributes=_get_call_attributes,
+            )(method),
+        )
+
+
+def _get_call_attributes(instance, *args, **kwargs):
+    # Record which video an instrumented call is working on, when there is one
+    for value in itertools.chain(args, kwargs.values()):
+        video_id = getattr(value, "id", None)
+        if video_id is not None and hasattr(value, "short_type_name"):
+            return {
+                "video_id": video_id,
+                "video_type": value.short_type_name,
+                "bytes_in": get_file_size(getattr(value, "media_url", None)),
+            }
+    return {}
+
+
+_tracer = None
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process wide tracer, as configured
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
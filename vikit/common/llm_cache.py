@@ -0,0 +1,266 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from loguru import logger
+
+import vikit.common.config as config
+from vikit.common.generated_media_cache import GeneratedMediaCache
+
+
+class LLMCache(ABC):
+    """
+    Cache of LLM answers (keywords, enhanced prompts...), keyed on the operation, the model
+    and the text input, so the same script does not pay the LLM latency on every build.
+
+    Entries expire after a time to live, and the least recently used entries are evicted
+    once the cache holds more than its maximum number of entries.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        """
+        Initialize the cache
+
+        Args:
+            ttl (float): The time to live of the entries in seconds, None means no expiration
+            max_entries (int): The maximum number of entries, None means no limit
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """
+        Compute the key of a LLM request, see GeneratedMediaCache.make_key
+        """
+        return GeneratedMediaCache.make_key(**request)
+
+    @abstractmethod
+    def get(self, key: str):
+        """
+        Get a cached answer, None if there is none or if it expired
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value):
+        """
+        Cache an answer, it should be json serializable
+        """
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+
+class InMemoryLLMCache(LLMCache):
+    """
+    LLM cache living as long as the process
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self._entries = OrderedDict()  # key -> (created_at, value)
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, value = entry
+        if self._is_expired(created_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteLLMCache(LLMCache):
+    """
+    LLM cache persisted in a SQLite database, so it is shared between builds and processes
+    """
+
+    def __init__(self, db_path: str, ttl: float = None, max_entries: int = None):
+        """
+        Initialize the cache
+
+        Args:
+            db_path (str): The path of the SQLite database, created if needed
+            ttl (float): The time to live of the entries in seconds, None means no expiration
+            max_entries (int): The maximum number of entries, None means no limit
+        """
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.db_path = os.path.abspath(os.path.expanduser(db_path))
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT, created_at REAL, accessed_at REAL)"
+            )
+
+    def get(self, key: str):
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._is_expired(created_at):
+                self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._connection.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(value)
+
+    def set(self, key: str, value):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM llm_cache WHERE key NOT IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM llm_cache"
+            ).fetchone()[0]
+
+
+def cached_llm_call(model: str = None):
+    """
+    Decorator memoizing the answers of a gateway method calling a LLM, as long as the
+    answer only depends on the text input and the model
+
+    Args:
+        model (str): The model called by the method, part of the cache key so a new
+        model version does not reuse the answers of the previous one
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache = get_llm_cache()
+            if cache is None:
+                return await func(self, *args, **kwargs)
+
+            # Positional and keyword calls with the same values are the same question
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            key = LLMCache.make_key(
+                operation=func.__name__,
+                gateway=type(self).__name__,
+                model=model,
+                arguments=dict(list(arguments.arguments.items())[1:]),
+            )
+            cached_answer = cache.get(key)
+            if cached_answer is not None:
+                logger.debug(f"Reusing cached LLM answer for {func.__name__}")
+                # json turns tuples into lists, we give back what the method returns
+                return (
+                    tuple(cached_answer)
+                    if isinstance(cached_answer, list)
+                    else cached_answer
+                )
+
+            answer = await func(self, *args, **kwargs)
+            cache.set(key, answer)
+            return answer
+
+        return wrapper
+
+    return decorator
+
+
+_llm_cache = None
+_llm_cache_configured = False
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Get the process wide LLM cache, as configured: persisted in SQLite if LLM_CACHE_PATH is set,
+    in memory otherwise
+
+    Returns:
+        LLMCache: The cache, None if the cache is disabled
+    """
+    global _llm_cache, _llm_cache_configured
+    if not _llm_cache_configured:
+        if config.get_llm_cache_enabled():
+            if config.get_llm_cache_path():
+                _llm_cache = SQLiteLLMCache(
+                    db_path=config.get_llm_cache_path(),
+                    ttl=config.get_llm_cache_ttl(),
+                    max_entries=config.get_llm_cache_max_entries(),
+                )
+            else:
+                _llm_cache = InMemoryLLMCache(
+                    ttl=config.get_llm_cache_ttl(),
+                    max_entries=config.get_llm_cache_max_entries(),
+                )
+        _llm_cache_configured = True
+    return _llm_cache
+
+
+def set_llm_cache(cache: LLMCache):
+    """
+    Plug a custom LLM cache, or disable the cache with None
+    """
+    global _llm_cache, _llm_cache_configured
+    _llm_cache = cache
+    _llm_cache_configured = True
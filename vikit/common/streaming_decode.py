@@ -0,0 +1,205 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import base64
+import binascii
+import os
+
+import aiofiles
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_SEARCHING_KEY = "searching_key"
+_AFTER_KEY = "after_key"
+_BEFORE_VALUE = "before_value"
+_IN_VALUE = "in_value"
+_DONE = "done"
+
+_JSON_WHITESPACES = b" \t\r\n"
+_BASE64_ESCAPES = {ord("/"): b"/", ord("\\"): b"\\", ord("n"): b"", ord("r"): b""}
+
+
+class JsonStringFieldExtractor:
+    """
+    Extract the value of a string field from a JSON document received in chunks, without
+    holding the document in memory.
+
+    Only meant for top level fields holding large ASCII payloads such as base64 medias:
+    the first occurrence of the key is used, and the only escapes supported are the ones
+    a JSON encoder may produce in base64 (escaped slashes and line breaks)
+    """
+
+    def __init__(self, field_name: str, max_head_size: int = 1024):
+        """
+        Args:
+            field_name (str): The name of the field to extract
+            max_head_size (int): The size of the beginning of the document kept to report errors
+        """
+        self.field_name = field_name
+        self.head = b""
+        self._max_head_size = max_head_size
+        self._key = b'"' + field_name.encode("utf-8") + b'"'
+        self._state = _SEARCHING_KEY
+        # The bytes possibly part of a key or an escape split between two chunks
+        self._pending = b""
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: bytes) -> bytes:
+        """
+        Feed the next chunk of the document
+
+        Args:
+            chunk (bytes): The chunk
+
+        Returns:
+            bytes: The part of the field value found in the chunk
+        """
+        if len(self.head) < self._max_head_size:
+            self.head += chunk[: self._max_head_size - len(self.head)]
+
+        data = self._pending + chunk
+        self._pending = b""
+        value = bytearray()
+        position = 0
+        while position < len(data) and self._state != _DONE:
+            if self._state == _SEARCHING_KEY:
+                index = data.find(self._key, position)
+                if index == -1:
+                    # Keep the end of the data in case the key spans two chunks
+                    pending_start = max(position, len(data) - len(self._key) + 1)
+                    self._pending = data[pending_start:]
+                    return bytes(value)
+                position = index + len(self._key)
+                self._state = _AFTER_KEY
+            elif self._state == _IN_VALUE:
+                position = self._read_value(data, position, value)
+            elif data[position] in _JSON_WHITESPACES:
+                position += 1
+            elif self._state == _AFTER_KEY:
+                if data[position] == ord(":"):
+                    self._state = _BEFORE_VALUE
+                    position += 1
+                else:
+                    self._state = _SEARCHING_KEY  # the key was a string value
+            else:
+                if data[position] != ord('"'):
+                    raise ValueError(f"The field {self.field_name} is not a string")
+                self._state = _IN_VALUE
+                position += 1
+        return bytes(value)
+
+    def _read_value(self, data: bytes, position: int, value: bytearray) -> int:
+        # Copy the value up to its end or the next escape
+        quote_index = data.find(b'"', position)
+        escape_index = data.find(
+            b"\\", position, quote_index if quote_index != -1 else len(data)
+        )
+        if escape_index != -1:
+            value += data[position:escape_index]
+            if escape_index + 1 == len(data):
+                self._pending = data[escape_index:]
+                return len(data)
+            escaped = data[escape_index + 1]
+            if escaped not in _BASE64_ESCAPES:
+                raise ValueError(
+                    f"Unsupported escape in the field {self.field_name}: \\{chr(escaped)}"
+                )
+            value += _BASE64_ESCAPES[escaped]
+            return escape_index + 2
+        if quote_index == -1:
+            value += data[position:]
+            return len(data)
+        value += data[position:quote_index]
+        self._state = _DONE
+        return quote_index + 1
+
+
+class Base64StreamDecoder:
+    """
+    Decode base64 data received in chunks of any size
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def decode(self, chunk: bytes) -> bytes:
+        """
+        Decode the next chunk, the characters not completing a 4 characters group are kept
+        for the next chunk
+
+        Returns:
+            bytes: The decoded bytes
+        """
+        data = self._pending + b"".join(chunk.split())
+        end = len(data) - len(data) % 4
+        self._pending = data[end:]
+        return base64.b64decode(data[:end], validate=True)
+
+    def flush(self) -> bytes:
+        """
+        Decode the remaining characters, padding them if needed
+
+        Returns:
+            bytes: The decoded bytes
+        """
+        data = self._pending
+        self._pending = b""
+        if not data:
+            return b""
+        if len(data) % 4 == 1:
+            raise binascii.Error("Truncated base64 data")
+        return base64.b64decode(data + b"=" * (-len(data) % 4), validate=True)
+
+
+async def stream_base64_field_to_file(chunks, field_name: str, target_file: str) -> int:
+    """
+    Decode a base64 field of a JSON document received in chunks, typically an HTTP response
+    body, and write it to a file as it arrives, so memory use is bounded by the chunk size
+
+    Args:
+        chunks: Async iterable over the chunks of the document, e.g. response.content.iter_chunked(STREAM_CHUNK_SIZE)
+        field_name (str): The name of the field holding the base64 payload
+        target_file (str): The file to write the decoded payload to
+
+    Returns:
+        int: The number of bytes written
+    """
+    extractor = JsonStringFieldExtractor(field_name)
+    decoder = Base64StreamDecoder()
+    nb_bytes_written = 0
+    try:
+        async with aiofiles.open(target_file, "wb") as file:
+            async for chunk in chunks:
+                decoded_bytes = decoder.decode(extractor.feed(chunk))
+                if decoded_bytes:
+                    await file.write(decoded_bytes)
+                    nb_bytes_written += len(decoded_bytes)
+                if extractor.done:
+                    break
+            if not extractor.done:
+                raise ValueError(
+                    f"The response has no complete {field_name} field: {extractor.head[:200]}"
+                )
+            decoded_bytes = decoder.flush()
+            await file.write(decoded_bytes)
+    except Exception:
+        # Do not leave a truncated media behind
+        if os.path.exists(target_file):
+            os.remove(target_file)
+        raise
+    return nb_bytes_written + len(decoded_bytes)
@@ -13,8 +13,14 @@
 # limitations under the License.
 # ==============================================================================
 
+import asyncio
 from abc import ABC, abstractmethod
 
+import vikit.common.config as config
+from vikit.common.instrumentation import CATEGORY_GATEWAY, trace_async_methods
+from vikit.gateways.job_poller import VideoJob, get_job_poller
+from vikit.gateways.single_flight import single_flight
+
 
 class MLModelsGateway(ABC):
     """
@@ -25,6 +31,11 @@ class MLModelsGateway(ABC):
     dependencies on the actual API implementation and speed up tests
     """
 
+    def __init_subclass__(cls, **kwargs):
+        # Every gateway call is timed when instrumentation is enabled
+        super().__init_subclass__(**kwargs)
+        trace_async_methods(cls, CATEGORY_GATEWAY)
+
     def __init__(self):
         pass
 
@@ -68,6 +79,54 @@ class MLModelsGateway(ABC):
     async def get_enhanced_prompt_async(self, subtitleText):
         pass
 
+    async def get_keywords_from_prompts_async(
+        self, subtitle_texts: list[str], max_concurrency: int = None
+    ) -> list[tuple]:
+        """
+        Generate keywords for a batch of subtitle texts
+
+        By default the texts are processed by concurrent calls to get_keywords_from_prompt_async,
+        gateways able to process a batch in a single request may override it
+
+        Args:
+            subtitle_texts: The subtitle texts
+            max_concurrency: The maximum number of calls in flight, defaults to the MAX_CONCURRENT_LLM_CALLS configuration
+
+        Returns:
+            list: The keywords and title of each text, in the order of the texts
+        """
+        return await _gather_bounded(
+            [
+                lambda text=text: self.get_keywords_from_prompt_async(text)
+                for text in subtitle_texts
+            ],
+            max_concurrency,
+        )
+
+    async def get_enhanced_prompts_async(
+        self, subtitle_texts: list[str], max_concurrency: int = None
+    ) -> list[tuple]:
+        """
+        Enhance a batch of subtitle texts
+
+        By default the texts are processed by concurrent calls to get_enhanced_prompt_async,
+        gateways able to process a batch in a single request may override it
+
+        Args:
+            subtitle_texts: The subtitle texts
+            max_concurrency: The maximum number of calls in flight, defaults to the MAX_CONCURRENT_LLM_CALLS configuration
+
+        Returns:
+            list: The enhanced prompt and title of each text, in the order of the texts
+        """
+        return await _gather_bounded(
+            [
+                lambda text=text: self.get_enhanced_prompt_async(text)
+                for text in subtitle_texts
+            ],
+            max_concurrency,
+        )
+
     @abstractmethod
     async def get_subtitles_async(self, audiofile_path: str):
         pass
@@ -75,3 +134,106 @@ class MLModelsGateway(ABC):
     @abstractmethod
     def generate_video_async(self, prompt_text: str, model_provider: str, prompt_image:str, aspect_ratio:str):
         pass
+
+    async def submit_video_job(
+        self,
+        prompt_text: str,
+        model_provider: str,
+        prompt_image: str = "",
+        aspect_ratio=(16, 9),
+    ) -> VideoJob:
+        """
+        Submit a video generation job without waiting for the video
+
+        Gateways whose provider exposes a job API submit the job remotely and implement
+        poll_video_job, by default the generation runs as a background task
+
+        Args:
+            prompt_text: The prompt to generate the video from
+            model_provider: The model provider to use
+            prompt_image: The image to generate the video from, if any
+            aspect_ratio: The aspect ratio of the video
+
+        Returns:
+            VideoJob: The handle on the job, to be awaited with await_video_job
+        """
+        return VideoJob(
+            provider=model_provider,
+            task=asyncio.ensure_future(
+                self.generate_video_async(
+                    prompt_text=prompt_text,
+                    model_provider=model_provider,
+                    prompt_image=prompt_image,
+                    aspect_ratio=aspect_ratio,
+                )
+            ),
+        )
+
+    async def poll_video_job(self, job: VideoJob) -> bool:
+        """
+        Refresh the status of a submitted job from the provider
+
+        Args:
+            job (VideoJob): The job to refresh
+
+        Returns:
+            bool: Whether the job is finished
+        """
+        return job.done
+
+    async def await_video_job(self, job: VideoJob, timeout: float = None):
+        """
+        Wait for a submitted job, polled along with the other pending jobs by a shared polling loop
+
+        Args:
+            job (VideoJob): The job to wait for
+            timeout (float): The maximum time to wait for, in seconds, no limit by default
+
+        Returns:
+            The link to the generated video
+        """
+        return await get_job_poller().wait(job, self.poll_video_job, timeout=timeout)
+
+    @single_flight()
+    async def generate_video_from_job_async(
+        self,
+        prompt_text: str,
+        model_provider: str,
+        prompt_image: str = "",
+        aspect_ratio=(16, 9),
+    ):
+        """
+        Submit a video generation job and wait for it
+
+        Identical requests in flight at the same time share one job, so the backend is only
+        paid once
+
+        Args:
+            prompt_text: The prompt to generate the video from
+            model_provider: The model provider to use
+            prompt_image: The image to generate the video from, if any
+            aspect_ratio: The aspect ratio of the video
+
+        Returns:
+            The link to the generated video
+        """
+        video_job = await self.submit_video_job(
+            prompt_text=prompt_text,
+            model_provider=model_provider,
+            prompt_image=prompt_image,
+            aspect_ratio=aspect_ratio,
+        )
+        return await self.await_video_job(video_job)
+
+
+async def _gather_bounded(calls: list, max_concurrency: int = None) -> list:
+    # Run the calls concurrently, with at most max_concurrency of them in flight
+    semaphore = asyncio.Semaphore(
+        max_concurrency if max_concurrency else config.get_max_concurrent_llm_calls()
+    )
+
+    async def call_when_allowed(call):
+        async with semaphore:
+            return await call()
+
+    return await asyncio.gather(*(call_when_allowed(call) for call in calls))
@@ -14,10 +14,10 @@
 # ==============================================================================
 
 import aiofiles
-import aiohttp
 from loguru import logger
 
 from vikit.common.config import get_elevenLabs_url
+from vikit.common.http_session import get_shared_http_session_pool
 from vikit.common.secrets import get_eleven_labs_api_key
 
 
@@ -35,7 +35,7 @@ async def generate_mp3_from_text_async(text, target_file):
         "model_id": "eleven_multilingual_v2",
         "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
     }
-    async with aiohttp.ClientSession() as session:
+    async with get_shared_http_session_pool().borrow_session() as session:
         async with session.post(
             get_elevenLabs_url(), json=payload, headers=headers
         ) as response:
@@ -45,23 +45,34 @@ class FakeMLModelsGateway(MLModelsGateway):
     dependencies on the actual API implementation and speed up tests
     """
 
-    def __init__(self):
+    def __init__(self, sleep_time: float = 0):
+        """
+        Initialize the fake gateway
+
+        Args:
+            sleep_time (float): The latency injected in every call, in seconds, unless a call sets its own sleep_time
+        """
         super().__init__()
+        self.sleep_time = sleep_time
 
     def sleep(self, sleep_time=1):
         sleep(sleep_time)  # Simulate a long process with time.sleep
 
-    async def generate_mp3_from_text_async(self, prompt_text, target_file: str = None):
+    async def generate_mp3_from_text_async(
+        self, prompt_text, target_file: str = None, sleep_time: int = 0
+    ):
+        await asyncio.sleep(sleep_time or self.sleep_time)
         logger.debug(f"Creating aa prompt from text: {prompt_text}")
 
         shutil.copy(
             src=tests_medias.get_test_prompt_recording_trainboy(), dst=target_file
         )
+        return target_file
 
     async def generate_background_music_async(
         self, duration: float = 3, prompt: str = None, sleep_time: int = 0
     ) -> str:
-        await asyncio.sleep(sleep_time)
+        await asyncio.sleep(sleep_time or self.sleep_time)
 
         if duration is None:
             raise ValueError("Duration must be a float, got None")
@@ -73,7 +84,7 @@ class FakeMLModelsGateway(MLModelsGateway):
     async def generate_seine_transition_async(
         self, source_image_path, target_image_path, sleep_time: int = 0
     ):
-        await asyncio.sleep(sleep_time)  # Simulate a long process with time.sleep
+        await asyncio.sleep(sleep_time or self.sleep_time)  # Simulate a long process with time.sleep
         return tests_medias.get_test_seine_transition_video_path()  # Important:
 
     # the returned name should contains "transition" in the file name so we send the same video at the interpolate call
@@ -85,17 +96,17 @@ class FakeMLModelsGateway(MLModelsGateway):
     async def compose_music_from_text_async(
         self, prompt_text: str, duration: int, sleep_time: int = 0
     ):
-        await asyncio.sleep(sleep_time)
+        await asyncio.sleep(sleep_time or self.sleep_time)
         return tests_medias.get_sample_generated_music_path()
 
     async def get_music_generation_keywords_async(
         self, text, sleep_time: int = 0
     ) -> str:
-        await asyncio.sleep(sleep_time)  # Simulate a long process with time.sleep
+        await asyncio.sleep(sleep_time or self.sleep_time)  # Simulate a long process with time.sleep
         return "KEYWORDS FROM MUSIC GENERATION"
 
     async def interpolate_async(self, link_to_video: str, sleep_time: int = 0):
-        await asyncio.sleep(sleep_time)  # Simulate a long process with time.sleep
+        await asyncio.sleep(sleep_time or self.sleep_time)  # Simulate a long process with time.sleep
         local_file_path = Path(tests_medias.get_interpolate_video())
         local_file_url = urljoin("file:", pathname2url(str(local_file_path)))
         return local_file_url
@@ -103,20 +114,20 @@ class FakeMLModelsGateway(MLModelsGateway):
     async def get_keywords_from_prompt(
         self, subtitleText, excluded_words: str = None, sleep_time: int = 0
     ):
-        await asyncio.sleep(sleep_time)  # Simulate a long process with time.sleep
+        await asyncio.sleep(sleep_time or self.sleep_time)  # Simulate a long process with time.sleep
         return "KEYWORDS FROM PROMPT", "keywords_from_prompt_file"
 
     async def get_keywords_from_prompt_async(
         self, subtitleText, excluded_words: str = None, sleep_time: int = 0
     ):
 
-        await asyncio.sleep(sleep_time)  # Simulate a long process with time.sleep
+        await asyncio.sleep(sleep_time or self.sleep_time)  # Simulate a long process with time.sleep
         return "KEYWORDS FROM PROMPT", "test title"
 
     async def get_enhanced_prompt_async(
         self, subtitleText, excluded_words: str = None, sleep_time: int = 0
     ):
-        await asyncio.sleep(sleep_time)  # Simulate a long process with time.sleep
+        await asyncio.sleep(sleep_time or self.sleep_time)  # Simulate a long process with time.sleep
         return "ENHANCED FROM PROMPT", "test title"
 
     async def get_subtitles_async(self, audiofile_path, sleep_time: int = 0):
@@ -127,7 +138,7 @@ class FakeMLModelsGateway(MLModelsGateway):
         )
 
     async def get_subtitles(self, audiofile_path, sleep_time: int = 0):
-        await asyncio.sleep(sleep_time)
+        await asyncio.sleep(sleep_time or self.sleep_time)
         subs = None
         with open(os.path.join(_sample_media_dir, "subtitles.srt"), "r") as f:
             subs = f.read()
@@ -141,7 +152,7 @@ class FakeMLModelsGateway(MLModelsGateway):
         prompt_image: str = "",
         aspect_ratio=(16, 9),
     ):
-        await asyncio.sleep(sleep_time)
+        await asyncio.sleep(sleep_time or self.sleep_time)
 
         if model_provider == "vikit":
             test_file = tests_medias.get_cat_video_path()
@@ -177,7 +188,7 @@ class FakeMLModelsGateway(MLModelsGateway):
     async def extract_audio_slice_async(
         self, i, end, audiofile_path, target_file_name: str = None, sleep_time: int = 0
     ):
-        await asyncio.sleep(sleep_time)
+        await asyncio.sleep(sleep_time or self.sleep_time)
 
     def extract_audio_slice(self, i, end, audiofile_path, target_file_name: str = None):
         return tests_medias.get_test_prompt_recording_trainboy()
@@ -0,0 +1,288 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+import uuid
+
+from loguru import logger
+
+import vikit.common.config as config
+
+JOB_PENDING = "pending"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class VideoJob:
+    """
+    Handle on a long running generation job submitted to a ML models gateway.
+
+    Remote jobs are refreshed by polling the gateway, while jobs run by the gateway itself
+    as a background task complete on their own.
+    """
+
+    def __init__(self, job_id: str = None, provider: str = None, task=None):
+        """
+        Initialize the job
+
+        Args:
+            job_id (str): The identifier of the job on the provider side, a random one by default
+            provider (str): The provider running the job
+            task: The background task running the job, for jobs that are not polled
+        """
+        self.job_id = job_id if job_id else str(uuid.uuid4())
+        self.provider = provider
+        self.status = JOB_PENDING
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.nb_polls = 0
+        self.nb_failed_polls = 0  # consecutive ones
+        self._task = task
+        if task is not None:
+            task.add_done_callback(self._on_task_done)
+
+    @property
+    def done(self) -> bool:
+        return self.status != JOB_PENDING
+
+    @property
+    def is_polled(self) -> bool:
+        """
+        Whether the job status has to be polled from the provider
+        """
+        return self._task is None
+
+    def succeed(self, result):
+        self.status = JOB_SUCCEEDED
+        self.result = result
+
+    def fail(self, error):
+        self.status = JOB_FAILED
+        self.error = error
+
+    def get_result(self):
+        """
+        Get the result of a finished job, raising its error if it failed
+        """
+        if self.status == JOB_PENDING:
+            raise ValueError(f"Job {self.job_id} is not finished yet")
+        if self.status == JOB_FAILED:
+            if isinstance(self.error, BaseException):
+                raise self.error
+            raise Exception(f"Job {self.job_id} failed: {self.error}")
+        return self.result
+
+    async def wait_for_task(self):
+        await asyncio.wait([self._task])
+
+    def cancel_task(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _on_task_done(self, task):
+        if task.cancelled():
+            self.fail(asyncio.CancelledError())
+        elif task.exception() is not None:
+            self.fail(task.exception())
+        else:
+            self.succeed(task.result())
+
+
+class JobPoller:
+    """
+    Single polling loop shared by all the jobs awaited from the running event loop.
+
+    The loop only starts the due polls, each poll runs as a task of its own and schedules the
+    next one, so a slow poll does not hold back the polls of the other jobs.
+
+    Each job is polled with an exponential backoff, randomized by a jitter so that jobs
+    submitted at the same time do not hit the provider at the same time. A failing poll,
+    typically a network error, is retried with the same backoff and only fails the job
+    after too many consecutive failures: the provider reports the jobs that actually failed.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = None,
+        max_interval: float = None,
+        backoff_factor: float = 2.0,
+        jitter: float = 0.5,
+        max_failures: int = None,
+    ):
+        """
+        Initialize the poller
+
+        Args:
+            initial_interval (float): The delay before the first poll of a job, in seconds
+            max_interval (float): The maximum delay between two polls of a job, in seconds
+            backoff_factor (float): The factor applied to the delay after each poll
+            jitter (float): The relative randomization of the delays, between 0 and 1
+            max_failures (int): The number of consecutive failed polls failing a job
+        """
+        self.initial_interval = (
+            initial_interval
+            if initial_interval is not None
+            else config.get_job_polling_initial_interval()
+        )
+        self.max_interval = (
+            max_interval
+            if max_interval is not None
+            else config.get_job_polling_max_interval()
+        )
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_failures = (
+            max_failures
+            if max_failures is not None
+            else config.get_job_polling_max_failures()
+        )
+        self._jobs = []  # heap of (next poll time, sequence, interval, job, poll_job, future)
+        self._sequence = itertools.count()
+        self._polls = {}  # poll task in flight, by future of its job
+        self._loop_task = None
+        self._wakeup = None
+
+    @property
+    def nb_pending_jobs(self) -> int:
+        futures = {entry[-1] for entry in self._jobs} | set(self._polls)
+        return sum(1 for future in futures if not future.done())
+
+    async def wait(self, job: VideoJob, poll_job, timeout: float = None):
+        """
+        Wait for a job to finish
+
+        Args:
+            job (VideoJob): The job to wait for
+            poll_job: Coroutine function refreshing the status of the job, returning whether it is finished
+            timeout (float): The maximum time to wait for, in seconds, no limit by default
+
+        Returns:
+            The result of the job
+        """
+        if not job.done:
+            if job.is_polled:
+                future = asyncio.get_running_loop().create_future()
+                self._schedule(job, poll_job, future, self.initial_interval)
+                try:
+                    await asyncio.wait_for(future, timeout)
+                finally:
+                    if not future.done() or future.cancelled():  # gave up
+                        self._unschedule(future)
+            else:
+                try:
+                    await asyncio.wait_for(job.wait_for_task(), timeout)
+                except asyncio.CancelledError:
+                    # Nobody is waiting for the generation anymore
+                    job.cancel_task()
+                    raise
+        return job.get_result()
+
+    def _schedule(self, job, poll_job, future, interval: float):
+        loop = asyncio.get_running_loop()
+        if self._loop_task is None or self._loop_task.done():
+            # The jobs of a previous event loop cannot be awaited anymore
+            self._jobs = [entry for entry in self._jobs if entry[-1].get_loop() is loop]
+            self._wakeup = asyncio.Event()
+            self._loop_task = loop.create_task(self._run())
+        delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        heapq.heappush(
+            self._jobs,
+            (loop.time() + delay, next(self._sequence), interval, job, poll_job, future),
+        )
+        self._wakeup.set()
+
+    def _unschedule(self, future):
+        """
+        Forget the polls of a job whose waiter gave up
+        """
+        self._jobs = [entry for entry in self._jobs if entry[-1] is not future]
+        heapq.heapify(self._jobs)
+        poll = self._polls.pop(future, None)
+        if poll is not None:
+            poll.cancel()
+        self._wakeup.set()  # the loop stops when no job is left
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._jobs:
+            delay = self._jobs[0][0] - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            while self._jobs and self._jobs[0][0] <= loop.time():
+                entry = heapq.heappop(self._jobs)
+                future = entry[-1]
+                if not future.done():  # the waiter may have given up
+                    poll = loop.create_task(self._poll(*entry[2:]))
+                    self._polls[future] = poll
+                    poll.add_done_callback(
+                        lambda poll, future=future: self._forget_poll(future, poll)
+                    )
+
+    def _forget_poll(self, future, poll):
+        if self._polls.get(future) is poll:
+            del self._polls[future]
+
+    async def _poll(self, interval: float, job: VideoJob, poll_job, future):
+        job.nb_polls += 1
+        try:
+            finished = await poll_job(job)
+            job.nb_failed_polls = 0
+        except Exception as e:
+            job.nb_failed_polls += 1
+            if job.nb_failed_polls < self.max_failures:
+                logger.warning(
+                    f"Polling job {job.job_id} failed ({job.nb_failed_polls}/{self.max_failures}), retrying: {e}"
+                )
+                finished = False
+            else:
+                logger.error(f"Polling job {job.job_id} failed: {e}")
+                job.fail(e)
+                finished = True
+
+        if future.done():
+            return
+        if finished:
+            future.set_result(None)
+        else:
+            self._schedule(
+                job,
+                poll_job,
+                future,
+                min(interval * self.backoff_factor, self.max_interval),
+            )
+
+
+_job_poller = None
+
+
+def get_job_poller() -> JobPoller:
+    """
+    Get the process wide job poller, as configured
+    """
+    global _job_poller
+    if _job_poller is None:
+        _job_poller = JobPoller()
+    return _job_poller
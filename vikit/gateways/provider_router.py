@@ -0,0 +1,249 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import math
+import time
+from collections import deque
+
+from loguru import logger
+
+import vikit.common.config as config
+
+
+class ProviderStats:
+    """
+    Latency and error statistics of the recent requests sent to a model provider
+    """
+
+    def __init__(self, window: int = 100):
+        """
+        Args:
+            window (int): The number of recent latencies kept
+        """
+        self.latencies = deque(maxlen=window)
+        self.nb_successes = 0
+        self.nb_failures = 0
+        self.consecutive_failures = 0
+        self.last_failure_at = None
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.nb_successes += 1
+        self.consecutive_failures = 0
+
+    def record_censored(self, latency: float):
+        """
+        Record the latency of a request cancelled before its end, e.g. a hedged one that lost
+        the race: its actual latency is at least the given one
+        """
+        self.latencies.append(latency)
+
+    def record_failure(self):
+        self.nb_failures += 1
+        self.consecutive_failures += 1
+        self.last_failure_at = time.monotonic()
+
+    def get_quantile(self, quantile: float) -> float:
+        """
+        Get a quantile of the recent latencies, None if there are none
+        """
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        rank = min(math.ceil(quantile * len(latencies)), len(latencies))
+        return latencies[max(rank, 1) - 1]
+
+
+class ProviderRouter:
+    """
+    Route the video generation requests between model providers, to cut the tail latency
+    and survive a provider outage:
+
+    - when a request to a provider takes longer than the usual latency of that provider
+      (a high quantile of its recent latencies), the same request is sent to its fallback
+      provider and the first video generated wins
+    - after repeated errors, a provider is skipped in favour of its fallback for a while
+
+    The latency statistics are collected whether the routing is enabled or not
+    """
+
+    def __init__(
+        self,
+        enabled: bool = None,
+        fallbacks: dict = None,
+        hedge_quantile: float = None,
+        default_hedge_delay: float = None,
+        min_samples: int = 5,
+        max_consecutive_failures: int = None,
+        failover_cooldown: float = 60,
+    ):
+        """
+        Initialize the router, the settings default to the configuration
+
+        Args:
+            enabled (bool): Whether requests are hedged and failed over, or just measured
+            fallbacks (dict): The fallback provider of each provider, by default
+            the <PROVIDER>_FALLBACK_MODEL_PROVIDER configurations
+            hedge_quantile (float): The latency quantile after which a request is hedged
+            default_hedge_delay (float): The delay after which a request is hedged, in seconds,
+            while there are fewer than min_samples latencies for the provider
+            min_samples (int): The number of latencies needed to compute the hedge delay
+            max_consecutive_failures (int): The number of errors in a row after which a provider is skipped
+            failover_cooldown (float): The time a failing provider is skipped for, in seconds
+        """
+        self.enabled = (
+            enabled if enabled is not None else config.get_provider_routing_enabled()
+        )
+        self.fallbacks = fallbacks
+        self.hedge_quantile = (
+            hedge_quantile
+            if hedge_quantile is not None
+            else config.get_provider_hedge_quantile()
+        )
+        self.default_hedge_delay = (
+            default_hedge_delay
+            if default_hedge_delay is not None
+            else config.get_provider_hedge_default_delay()
+        )
+        self.min_samples = min_samples
+        self.max_consecutive_failures = (
+            max_consecutive_failures
+            if max_consecutive_failures is not None
+            else config.get_provider_max_consecutive_failures()
+        )
+        self.failover_cooldown = failover_cooldown
+        self._stats = {}
+
+    def get_stats(self, provider: str) -> ProviderStats:
+        if provider not in self._stats:
+            self._stats[provider] = ProviderStats()
+        return self._stats[provider]
+
+    def get_fallback(self, provider: str) -> str:
+        if self.fallbacks is not None:
+            fallback = self.fallbacks.get(provider)
+        else:
+            fallback = config.get_fallback_model_provider(provider)
+        return fallback if fallback != provider else None
+
+    def get_hedge_delay(self, provider: str) -> float:
+        """
+        Get the time to wait for a provider before hedging the request
+        """
+        stats = self.get_stats(provider)
+        if len(stats.latencies) < self.min_samples:
+            return self.default_hedge_delay
+        return stats.get_quantile(self.hedge_quantile)
+
+    def is_available(self, provider: str) -> bool:
+        """
+        Whether a provider is worth trying, it is skipped for a while after repeated errors
+        """
+        stats = self.get_stats(provider)
+        if stats.consecutive_failures < self.max_consecutive_failures:
+            return True
+        return time.monotonic() - stats.last_failure_at > self.failover_cooldown
+
+    async def route(self, provider: str, generate):
+        """
+        Generate a video from a provider, hedged or failed over to its fallback provider
+
+        Args:
+            provider (str): The requested model provider
+            generate: Coroutine function generating the video from a given provider
+
+        Returns:
+            The result of the first successful generation
+        """
+        if not self.enabled:
+            return await self._measure(provider, generate)
+
+        fallback = self.get_fallback(provider)
+        if fallback and not self.is_available(provider):
+            logger.warning(
+                f"Model provider {provider} failed {self.get_stats(provider).consecutive_failures} times in a row, using {fallback} instead"
+            )
+            provider, fallback = fallback, None
+        if not fallback:
+            return await self._measure(provider, generate)
+
+        primary = asyncio.ensure_future(self._measure(provider, generate))
+        try:
+            done, _ = await asyncio.wait(
+                [primary], timeout=self.get_hedge_delay(provider)
+            )
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done and primary.exception() is None:
+            return primary.result()
+        if done:
+            logger.warning(
+                f"Model provider {provider} failed, falling back to {fallback}: {primary.exception()}"
+            )
+        else:
+            logger.info(
+                f"Model provider {provider} is slower than usual, hedging the request with {fallback}"
+            )
+        secondary = asyncio.ensure_future(self._measure(fallback, generate))
+        return await self._first_success([primary, secondary])
+
+    async def _first_success(self, tasks: list):
+        pending = set(tasks)
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _measure(self, provider: str, generate):
+        stats = self.get_stats(provider)
+        start_time = time.monotonic()
+        try:
+            result = await generate(provider)
+        except asyncio.CancelledError:
+            # Dropping the slow requests would make the provider look faster than it is
+            stats.record_censored(
+                max(time.monotonic() - start_time, self.get_hedge_delay(provider))
+            )
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success(time.monotonic() - start_time)
+        return result
+
+
+_provider_router = None
+
+
+def get_provider_router() -> ProviderRouter:
+    """
+    Get the process wide provider router, as configured
+    """
+    global _provider_router
+    if _provider_router is None:
+        _provider_router = ProviderRouter()
+    return _provider_router
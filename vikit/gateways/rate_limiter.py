@@ -0,0 +1,258 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+from loguru import logger
+from tenacity import wait_exponential
+
+import vikit.common.config as config
+
+RATE_LIMITED_STATUSES = (429, 503)
+
+
+class RateLimitedError(Exception):
+    """
+    Raised when a model provider throttles a request
+    """
+
+    def __init__(self, message: str, retry_after: float = None):
+        """
+        Args:
+            message (str): The error message
+            retry_after (float): The delay asked by the provider before retrying, in seconds, if any
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket letting requests through at a sustained rate, with bursts up to its capacity
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize the bucket, full
+
+        Args:
+            rate (float): The number of tokens added per second, 0 for no limit
+            capacity (int): The maximum number of tokens
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0
+
+    async def acquire(self):
+        """
+        Wait for a token and take it
+        """
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            if now >= self._blocked_until and self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep(
+                max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            )
+
+    def block(self, delay: float):
+        """
+        Stop handing tokens for a while, typically when the provider asks to retry later
+
+        Args:
+            delay (float): The delay, in seconds
+        """
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self._tokens = 0
+
+
+class ProviderRateLimiter:
+    """
+    Rate limit and concurrency budget of the requests sent to a model provider
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_second: float = None,
+        burst: int = None,
+        max_in_flight: int = None,
+    ):
+        """
+        Initialize the limiter, the limits default to the configuration of the provider
+
+        Args:
+            provider (str): The model provider
+            requests_per_second (float): The sustained rate of requests, 0 for no limit
+            burst (int): The number of requests that may be sent at once above the sustained rate
+            max_in_flight (int): The maximum number of requests in flight, 0 for no limit
+        """
+        self.provider = provider
+        self.max_in_flight = (
+            max_in_flight
+            if max_in_flight is not None
+            else config.get_rate_limit_max_in_flight(provider)
+        )
+        self._bucket = TokenBucket(
+            rate=(
+                requests_per_second
+                if requests_per_second is not None
+                else config.get_rate_limit_requests_per_second(provider)
+            ),
+            capacity=(
+                burst if burst is not None else config.get_rate_limit_burst(provider)
+            ),
+        )
+        self._semaphore = None
+        self._semaphore_loop = None
+        self.nb_in_flight = 0
+
+    @asynccontextmanager
+    async def limit(self):
+        """
+        Wait until a request may be sent to the provider, and count it as in flight until exiting
+        """
+        semaphore = self._get_semaphore()
+        if semaphore is not None:
+            await semaphore.acquire()
+        try:
+            await self._bucket.acquire()
+            self.nb_in_flight += 1
+            try:
+                yield
+            except RateLimitedError as e:
+                delay = (
+                    e.retry_after if e.retry_after else 1 / max(self._bucket.rate, 1)
+                )
+                logger.warning(
+                    f"Provider {self.provider} throttled a request, slowing down for {delay} seconds"
+                )
+                self._bucket.block(delay)
+                raise
+            finally:
+                self.nb_in_flight -= 1
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if not self.max_in_flight:
+            return None
+        # A semaphore only serves the event loop it was first used from
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+
+_rate_limiters = {}
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """
+    Get the process wide rate limiter of a model provider, as configured
+    """
+    if provider not in _rate_limiters:
+        _rate_limiters[provider] = ProviderRateLimiter(provider)
+    return _rate_limiters[provider]
+
+
+def rate_limited(provider: str):
+    """
+    Decorator sending the calls of a gateway method through the rate limiter of a provider.
+    Put it below the retry decorator so every attempt is limited
+
+    Args:
+        provider (str): The model provider called by the method
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with get_rate_limiter(provider).limit():
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def raise_for_rate_limit(response, provider: str = None):
+    """
+    Raise a RateLimitedError if the response of a provider tells the request was throttled
+
+    Args:
+        response: The aiohttp response
+        provider (str): The model provider, for the error message
+    """
+    if response.status not in RATE_LIMITED_STATUSES:
+        return
+    if response.status == 503 and "Retry-After" not in response.headers:
+        return
+    raise RateLimitedError(
+        f"Provider {provider} throttled the request with status {response.status}",
+        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+    )
+
+
+def parse_retry_after(value: str) -> float:
+    """
+    Parse a Retry-After header, given either as seconds or as an HTTP date
+
+    Returns:
+        float: The delay in seconds, None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class wait_retry_after:
+    """
+    Tenacity wait strategy honouring the delay asked by a throttling provider, and falling
+    back on an exponential backoff otherwise
+    """
+
+    def __init__(self, fallback=None, max_wait: float = 120):
+        self.fallback = fallback if fallback else wait_exponential(min=1, max=10)
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exception, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, self.max_wait)
+        return self.fallback(retry_state)
@@ -13,9 +13,7 @@
 # limitations under the License.
 # ==============================================================================
 
-import asyncio
 import os
-import subprocess
 from urllib.request import urlretrieve
 
 import replicate
@@ -23,12 +21,21 @@ from loguru import logger
 from tenacity import after_log, before_log, retry, stop_after_attempt
 
 from vikit.common.config import get_nb_retries_http_calls
+from vikit.common.llm_cache import cached_llm_call
 from vikit.common.secrets import get_replicate_api_token
 from vikit.gateways.ML_models_gateway import MLModelsGateway
+from vikit.gateways.job_poller import VideoJob
+from vikit.gateways.rate_limiter import rate_limited, wait_retry_after
+from vikit.gateways.single_flight import single_flight
 from vikit.prompt.prompt_cleaning import cleanse_llm_keywords
+from vikit.wrappers.ffmpeg_executor import get_ffmpeg_executor
 
 os.environ["REPLICATE_API_TOKEN"] = get_replicate_api_token()
 
+MISTRAL_MODEL = "mistralai/mistral-7b-instruct-v0.2"
+MIXTRAL_MODEL = "mistralai/mixtral-8x7b-instruct-v0.1"
+VIDEOCRAFTER_MODEL = "cjwbw/videocrafter:02edcff3e9d2d11dcc27e530773d988df25462b1ee93ed0257b6f246de4797c8"
+
 KEYWORDS_FORMAT_PROMPT = """' Just list the keywords in english language, separated by a coma, do not re-output the prompt. 
             The answer should be a list of keywords and exactly match the following format:  'KEYWORD1, KEYWORD2, KEYWORD3, etc' 
             where KEYWORD1 and the other ones are generated by you. 
@@ -77,8 +84,9 @@ class ReplicateGateway(MLModelsGateway):
         # Then we generate the music
         clean_prompt_without_title = outputLLM[:-title_length]
         logger.debug(f"Clean GPT Prompt : {clean_prompt_without_title}")
+        # Every background music is a sample of its own
         output_music_link = await self.compose_music_from_text_async(
-            clean_prompt_without_title, duration=duration
+            clean_prompt_without_title, duration=duration, coalesce=False
         )
 
         logger.debug("Downloading the generated music")
@@ -88,23 +96,18 @@ class ReplicateGateway(MLModelsGateway):
         lowered_music_filename = f"lowered_{prompt_based_music_file_name}"
 
         logger.debug("Lowering the volume of the music")
-        process = await asyncio.create_subprocess_exec(
-            "ffmpeg",
-            "-y",
-            "-i",
-            gen_music_file_path,
-            "-filter_complex",
-            "[a]loudnorm,volume=0.2",
-            lowered_music_filename,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        await get_ffmpeg_executor().run(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                gen_music_file_path,
+                "-filter_complex",
+                "[a]loudnorm,volume=0.2",
+                lowered_music_filename,
+            ]
         )
 
-        stdout, stderr = await process.communicate()
-        if process.returncode != 0:
-            logger.error(f"ffmpeg command failed with: {stderr.decode()}")
-            raise Exception("ffmpeg command failed")
-
         return lowered_music_filename
 
     @retry(
@@ -150,6 +153,7 @@ class ReplicateGateway(MLModelsGateway):
             },
         )
 
+    @single_flight()
     @retry(
         stop=stop_after_attempt(get_nb_retries_http_calls()),
         reraise=True,
@@ -203,6 +207,8 @@ class ReplicateGateway(MLModelsGateway):
 
         return result_music_link
 
+    @cached_llm_call(model=MIXTRAL_MODEL)
+    @single_flight(model=MIXTRAL_MODEL)
     @retry(
         stop=stop_after_attempt(get_nb_retries_http_calls()),
         reraise=True,
@@ -227,7 +233,7 @@ class ReplicateGateway(MLModelsGateway):
             text = "finally there is no prompt so just unleash your own imagination"
 
         llm_keywords = await replicate.async_run(
-            "mistralai/mixtral-8x7b-instruct-v0.1",
+            MIXTRAL_MODEL,
             input={
                 "top_k": 50,
                 "top_p": 0.9,
@@ -279,6 +285,8 @@ class ReplicateGateway(MLModelsGateway):
             },
         )
 
+    @cached_llm_call(model=MISTRAL_MODEL)
+    @single_flight(model=MISTRAL_MODEL)
     @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
     async def get_keywords_from_prompt_async(
         self, subtitleText, excluded_words: str = None
@@ -294,7 +302,7 @@ class ReplicateGateway(MLModelsGateway):
         assert subtitleText is not None
 
         llm_keywords = await replicate.async_run(  # mistralai/mixtral-8x7b-instruct-v0.1:0.1"
-            "mistralai/mistral-7b-instruct-v0.2",
+            MISTRAL_MODEL,
             input={
                 "top_k": 50,
                 "top_p": 0.9,
@@ -326,6 +334,8 @@ class ReplicateGateway(MLModelsGateway):
         # Transform the list of keywords into a single string, we do keep the final title within
         return clean_result, title_from_keywords_as_tokens
 
+    @cached_llm_call(model=MIXTRAL_MODEL)
+    @single_flight(model=MIXTRAL_MODEL)
     @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
     async def get_enhanced_prompt_async(self, subtitleText):
         """
@@ -340,7 +350,7 @@ class ReplicateGateway(MLModelsGateway):
 
         """
         outputLLM = await replicate.async_run(
-            "mistralai/mixtral-8x7b-instruct-v0.1",
+            MIXTRAL_MODEL,
             input={
                 "top_k": 50,
                 "top_p": 0.9,
@@ -395,7 +405,12 @@ class ReplicateGateway(MLModelsGateway):
         )
         return subs
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("replicate")
     async def generate_video_async(self, prompt_text: str, model_provider: str = "videocrafter", prompt_image:str = "", aspect_ratio=(16,9)):
         """
         Generate a video from the given prompt
@@ -408,12 +423,64 @@ class ReplicateGateway(MLModelsGateway):
         """
         logger.debug(f"Generating video from prompt: {prompt_text}")
         output = await replicate.async_run(
-            "cjwbw/videocrafter:02edcff3e9d2d11dcc27e530773d988df25462b1ee93ed0257b6f246de4797c8",
-            input={
-                "prompt": prompt_text,  # + ", 4k",
-                "save_fps": 8,
-                "ddim_steps": 50,
-                "unconditional_guidance_scale": 12,
-            },
+            VIDEOCRAFTER_MODEL,
+            input=self._get_videocrafter_input(prompt_text),
         )
         return output
+
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("replicate")
+    async def submit_video_job(
+        self,
+        prompt_text: str,
+        model_provider: str = "videocrafter",
+        prompt_image: str = "",
+        aspect_ratio=(16, 9),
+    ) -> VideoJob:
+        """
+        Submit a video generation as a Replicate prediction, without waiting for the video
+
+        Args:
+            prompt_text: The prompt to generate the video from
+
+        returns:
+            VideoJob: The handle on the prediction
+        """
+        logger.debug(f"Submitting video generation from prompt: {prompt_text}")
+        prediction = await replicate.predictions.async_create(
+            version=VIDEOCRAFTER_MODEL.split(":")[1],
+            input=self._get_videocrafter_input(prompt_text),
+        )
+        return VideoJob(job_id=prediction.id, provider="replicate")
+
+    async def poll_video_job(self, job: VideoJob) -> bool:
+        """
+        Refresh the status of a video generation prediction, the failed polls being retried
+        by the job poller
+
+        Args:
+            job: The handle on the prediction
+
+        returns:
+            Whether the prediction is finished
+        """
+        if job.done:
+            return True
+        prediction = await replicate.predictions.async_get(job.job_id)
+        if prediction.status == "succeeded":
+            job.succeed(prediction.output)
+        elif prediction.status in ("failed", "canceled"):
+            job.fail(f"Prediction {prediction.status}: {prediction.error}")
+        return job.done
+
+    def _get_videocrafter_input(self, prompt_text: str) -> dict:
+        return {
+            "prompt": prompt_text,  # + ", 4k",
+            "save_fps": 8,
+            "ddim_steps": 50,
+            "unconditional_guidance_scale": 12,
+        }
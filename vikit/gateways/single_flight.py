@@ -0,0 +1,112 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import functools
+import inspect
+
+from loguru import logger
+
+from vikit.common.generated_media_cache import GeneratedMediaCache
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call is in flight, the calls made with the
+    same key wait for its result instead of running again.
+
+    Nothing is kept once the call is finished, see the caches for reusing past results.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> task running the call
+
+    @property
+    def nb_in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, call):
+        """
+        Run a call, or join the identical call already in flight
+
+        Args:
+            key (str): The key identifying the call
+            call: Coroutine function running the call
+
+        Returns:
+            The result of the call
+        """
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(call())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            logger.debug(f"Joining the identical call already in flight: {key}")
+
+        # A caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+_single_flight = SingleFlight()
+
+
+def single_flight(model: str = None):
+    """
+    Decorator coalescing the concurrent calls of a gateway method made with the same arguments,
+    so identical requests in flight at the same time only hit the backend once
+
+    Arguments are part of the key, positional and keyword calls with the same values
+    being the same request. Callers wanting a distinct sample of a request, e.g. a second
+    clip of the same prompt, opt out by passing coalesce=False to the decorated method
+
+    Args:
+        model (str): The model called by the method, part of the key
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, coalesce: bool = True, **kwargs):
+            if not coalesce:
+                return await func(self, *args, **kwargs)
+
+            # Positional and keyword calls with the same values are the same request
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            key = GeneratedMediaCache.make_key(
+                operation=func.__name__,
+                gateway=type(self).__name__,
+                model=model,
+                arguments=dict(list(arguments.arguments.items())[1:]),
+            )
+            return await _single_flight.do(key, lambda: func(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the process wide registry of the calls in flight
+    """
+    return _single_flight
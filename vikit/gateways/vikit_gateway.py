@@ -15,11 +15,8 @@
 
 import asyncio
 import base64
-import io
 import json
 import os
-import subprocess
-import time
 import uuid as uid
 
 import aiohttp
@@ -34,18 +31,41 @@ from tenacity import (
 )
 
 import vikit.gateways.elevenlabs_gateway as elevenlabs_gateway
-from vikit.common.config import get_nb_retries_http_calls
+from vikit.common.config import (
+    get_nb_retries_http_calls,
+    get_tts_batch_max_characters,
+    get_tts_max_concurrent_batches,
+)
 from vikit.common.file_tools import download_or_copy_file
+from vikit.common.http_session import HttpSessionPool
+from vikit.common.image_preparation import get_image_preparation_service
+from vikit.common.llm_cache import cached_llm_call
 from vikit.common.secrets import (
     get_replicate_api_token,
     get_vikit_api_token,
     has_eleven_labs_api_key,
 )
-from vikit.gateways.ML_models_gateway import MLModelsGateway
-from vikit.prompt.prompt_cleaning import cleanse_llm_keywords
-from vikit.wrappers.ffmpeg_wrapper import convert_as_mp3_file
-import cv2
-import numpy as np
+from vikit.common.streaming_decode import (
+    STREAM_CHUNK_SIZE,
+    stream_base64_field_to_file,
+)
+from vikit.gateways.ML_models_gateway import MLModelsGateway, _gather_bounded
+from vikit.gateways.provider_router import get_provider_router
+from vikit.gateways.rate_limiter import (
+    raise_for_rate_limit,
+    rate_limited,
+    wait_retry_after,
+)
+from vikit.gateways.single_flight import single_flight
+from vikit.prompt.prompt_cleaning import (
+    cleanse_llm_keywords,
+    split_text_into_sentence_batches,
+)
+from vikit.wrappers.ffmpeg_executor import get_ffmpeg_executor
+from vikit.wrappers.ffmpeg_wrapper import (
+    concatenate_audio_files,
+    convert_stream_as_mp3_file,
+)
 
 from vikit.common.config import get_vikit_backend_url
 
@@ -56,21 +76,45 @@ http_timeout = aiohttp.ClientTimeout(
     total=1500, connect=500, sock_read=500, sock_connect=500
 )
 
+vikit_backend_http_sessions = HttpSessionPool(timeout=http_timeout)
+
 mistral_version = "mistralai/mistral-7b-v0.1"
 
 
 class VikitGateway(MLModelsGateway):
     """
     A Gateway to interact with the Vikit API
+
+    HTTP calls go through a shared session with keep-alive connections to the Vikit backend.
+    The gateway may be used as an async context manager to release these connections on exit
     """
 
-    def __init__(self, vikit_api_key: str = None):
+    def __init__(
+        self, vikit_api_key: str = None, http_session_pool: HttpSessionPool = None
+    ):
         super().__init__()
         if vikit_api_key != None:
             self.vikit_api_key = vikit_api_key
         else:
             self.vikit_api_key = get_vikit_api_token()
+        self._http_session_pool = (
+            http_session_pool if http_session_pool else vikit_backend_http_sessions
+        )
+
+    async def __aenter__(self):
+        return self
 
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    async def close(self):
+        """
+        Close the HTTP connections to the Vikit backend opened from the running event loop
+        """
+        await self._http_session_pool.close()
+
+    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
     async def generate_mp3_from_text_async_elevenlabs(
         self,
         prompt_text: str,
@@ -93,53 +137,111 @@ class VikitGateway(MLModelsGateway):
             target_file
         ), f"The generated audio file does not exists: {target_file}"
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
     async def generate_mp3_from_text_async(
         self,
         prompt_text: str,
         target_file: str,
-    ):
-        tempUuid = str(uid.uuid4())
+    ) -> str:
+        """
+        Generate an mp3 file from a text prompt, with ElevenLabs when a key is available,
+        with XTTS otherwise.
+
+        Long texts are split into batches of sentences, synthesized concurrently and
+        concatenated into the target file
+
+        Args:
+            - prompt_text: str - the text to generate the mp3 from
+            - target_file: str - the path to the target file
+
+        Returns:
+            - str: the path to the target file
+        """
         if has_eleven_labs_api_key():
             await self.generate_mp3_from_text_async_elevenlabs(
                 prompt_text,
                 target_file,
             )
-        else:
-            async with aiohttp.ClientSession(timeout=http_timeout) as session:
-                payload = (
-                    {
-                        "key": self.vikit_api_key,
-                        "model": "lucataco/xtts-v2:684bc3855b37866c0c65add2ff39c78f3dea3f4ff103a436465326e0f438d55e",
-                        "input": {
-                            "text": prompt_text,
-                            "speaker": "https://replicate.delivery/pbxt/Jt79w0xsT64R1JsiJ0LQRL8UcWspg5J4RFrU6YwEKpOT1ukS/male.wav",
-                            "language": "en",
-                            "cleanup_voice": False,
-                        },
+            return target_file
+
+        batches = split_text_into_sentence_batches(
+            prompt_text, max_characters=get_tts_batch_max_characters()
+        )
+        if len(batches) <= 1:
+            await self._generate_mp3_from_text_batch_async(prompt_text, target_file)
+            return target_file
+
+        target_file_root, _ = os.path.splitext(target_file)
+        batch_files = [
+            f"{target_file_root}_batch_{index}.mp3" for index in range(len(batches))
+        ]
+        logger.debug(f"Synthesizing {len(batches)} batches of sentences concurrently")
+        try:
+            await _gather_bounded(
+                [
+                    lambda batch=batch, batch_file=batch_file: (
+                        self._generate_mp3_from_text_batch_async(batch, batch_file)
+                    )
+                    for batch, batch_file in zip(batches, batch_files)
+                ],
+                max_concurrency=get_tts_max_concurrent_batches(),
+            )
+            await concatenate_audio_files(batch_files, target_file)
+        finally:
+            for batch_file in batch_files:
+                if os.path.exists(batch_file):
+                    os.remove(batch_file)
+        return target_file
+
+    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
+    async def _generate_mp3_from_text_batch_async(
+        self, prompt_text: str, target_file: str
+    ) -> str:
+        """
+        Generate an mp3 file from a text with XTTS, the generated audio being encoded
+        to mp3 while it downloads, without any intermediate file
+
+        Returns:
+            - str: the link to the generated audio
+        """
+        async with self._http_session_pool.borrow_session() as session:
+            payload = (
+                {
+                    "key": self.vikit_api_key,
+                    "model": "lucataco/xtts-v2:684bc3855b37866c0c65add2ff39c78f3dea3f4ff103a436465326e0f438d55e",
+                    "input": {
+                        "text": prompt_text,
+                        "speaker": "https://replicate.delivery/pbxt/Jt79w0xsT64R1JsiJ0LQRL8UcWspg5J4RFrU6YwEKpOT1ukS/male.wav",
+                        "language": "en",
+                        "cleanup_voice": False,
                     },
-                )
+                },
+            )
 
-                async with session.post(vikit_backend_url, json=payload) as response:
+            async with session.post(vikit_backend_url, json=payload) as response:
 
-                    if response.status == 403:
-                        raise PermissionError(
-                            "Access to the Vikit API was forbidden (403). Please check your API credentials."
-                        )
+                if response.status == 403:
+                    raise PermissionError(
+                        "Access to the Vikit API was forbidden (403). Please check your API credentials."
+                    )
 
-                    if response.status != 200:
-                        raise RuntimeError(
-                            f"We failed to connect to Vikit API. Returned Error: {response.status}, {response.reason}"
-                        )
+                if response.status != 200:
+                    raise RuntimeError(
+                        f"We failed to connect to Vikit API. Returned Error: {response.status}, {response.reason}"
+                    )
 
-                    response = await response.text()
-                    if not response.startswith("http"):
-                        raise AttributeError("The result audio link is not a link")
-                    await download_or_copy_file(
-                        url=response, local_path="temp" + tempUuid + ".wav"
+                audio_link = await response.text()
+                if not audio_link.startswith("http"):
+                    raise AttributeError("The result audio link is not a link")
+
+            async with session.get(audio_link) as audio_response:
+                if audio_response.status != 200:
+                    raise FileNotFoundError(
+                        f"The URL did not work with response: {audio_response}"
                     )
-            await convert_as_mp3_file("temp" + tempUuid + ".wav", target_file)
-            return response
+                await convert_stream_as_mp3_file(
+                    audio_response.content.iter_chunked(STREAM_CHUNK_SIZE), target_file
+                )
+        return audio_link
 
     async def generate_background_music_async(
         self, duration: int = 3, prompt: str = None
@@ -166,8 +268,9 @@ class VikitGateway(MLModelsGateway):
         # Then we generate the music
         clean_prompt_without_title = outputLLM[:-title_length]
         logger.debug(f"Clean GPT Prompt : {clean_prompt_without_title}")
+        # Every background music is a sample of its own
         output_music_link = await self.compose_music_from_text_async(
-            clean_prompt_without_title, duration=duration
+            clean_prompt_without_title, duration=duration, coalesce=False
         )
         logger.debug(f"output_music_link: {output_music_link}")
 
@@ -179,24 +282,18 @@ class VikitGateway(MLModelsGateway):
         lowered_music_filename = f"lowered_{prompt_based_music_file_name}"
 
         logger.debug("Lowering the volume of the music")
-        process = await asyncio.create_subprocess_exec(
-            "ffmpeg",
-            "-y",
-            "-i",
-            gen_music_file_path,
-            "-filter_complex",
-            "[a]loudnorm,volume=0.2",
-            lowered_music_filename,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        await get_ffmpeg_executor().run(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                gen_music_file_path,
+                "-filter_complex",
+                "[a]loudnorm,volume=0.2",
+                lowered_music_filename,
+            ]
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
-            logger.error(f"ffmpeg command failed with: {stderr.decode()}")
-            raise Exception("ffmpeg command failed")
-
         return lowered_music_filename
 
     async def generate_seine_transition_async(
@@ -226,27 +323,13 @@ class VikitGateway(MLModelsGateway):
                 f"The target image path does not exist: {target_image_path}"
             )
 
-        # Resize images
-        # Open the images using OpenCV
-        src_img = cv2.imread(source_image_path)
-        trg_img = cv2.imread(target_image_path)
-
-        target_size = (src_img.shape[1], src_img.shape[0])
-
-        # Check if the sizes are different
-        if src_img.shape[:2] != trg_img.shape[:2]:
-            # Resize the images
-            for img_path in [source_image_path, target_image_path]:
-                img = cv2.imread(img_path)
-                resized_img = cv2.resize(img, target_size, interpolation=cv2.INTER_AREA)
-                cv2.imwrite(img_path, resized_img)
-
-        # Encode the resized images to base64
-        with open(source_image_path, "rb") as src_file:
-            source_image_base64 = base64.b64encode(src_file.read()).decode("ascii")
-
-        with open(target_image_path, "rb") as trg_file:
-            target_image_base64 = base64.b64encode(trg_file.read()).decode("ascii")
+        # The images are resized to the same size and encoded outside of the event loop
+        (
+            source_image_base64,
+            target_image_base64,
+        ) = await get_image_preparation_service().prepare_transition_images_async(
+            source_image_path, target_image_path
+        )
 
         try:
             async for attempt in AsyncRetrying(
@@ -254,7 +337,7 @@ class VikitGateway(MLModelsGateway):
                 reraise=True,
             ):
                 with attempt:
-                    async with aiohttp.ClientSession(timeout=http_timeout) as session:
+                    async with self._http_session_pool.borrow_session() as session:
                         payload = (
                             {
                                 "key": self.vikit_api_key,
@@ -273,7 +356,7 @@ class VikitGateway(MLModelsGateway):
                             vikit_backend_url, json=payload
                         ) as response:
                             response = await response.text()
-                    time.sleep(2)
+                    await asyncio.sleep(2)
                     if not response.startswith("http"):
                         raise AttributeError(
                             "The result SEINE transition link is not a link"
@@ -283,6 +366,7 @@ class VikitGateway(MLModelsGateway):
         except Exception as e:
             raise Exception("Retry failed {e}")
 
+    @single_flight()
     @retry(
         stop=stop_after_attempt(get_nb_retries_http_calls()),
         reraise=True,
@@ -308,7 +392,7 @@ class VikitGateway(MLModelsGateway):
         if len(prompt_text) < 1:
             raise AttributeError("The input prompt text is empty")
 
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = {
                 "key": self.vikit_api_key,
                 "model": "meta/musicgen:b05b1dff1d8c6dc63d14b0cdb42135378dcb87f6373b0d3d341ede46e59e2b38",
@@ -347,6 +431,8 @@ class VikitGateway(MLModelsGateway):
 
         return result_music_link
 
+    @cached_llm_call(model=mistral_version)
+    @single_flight(model=mistral_version)
     @retry(
         stop=stop_after_attempt(get_nb_retries_http_calls()),
         reraise=True,
@@ -370,7 +456,7 @@ class VikitGateway(MLModelsGateway):
         if text is None:
             text = "finally there is no prompt so just unleash your own imagination"
 
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = {
                 "key": self.vikit_api_key,
                 "model": mistral_version,
@@ -420,7 +506,7 @@ class VikitGateway(MLModelsGateway):
 
         logger.debug(f"Video to interpolate {video[:50]}")
 
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = (
                 {
                     "key": self.vikit_api_key,
@@ -448,6 +534,8 @@ class VikitGateway(MLModelsGateway):
         logger.debug(f"Interpolated video link: {output}")
         return output
 
+    @cached_llm_call(model=mistral_version)
+    @single_flight(model=mistral_version)
     @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
     async def get_keywords_from_prompt_async(
         self, subtitleText, excluded_words: str = None
@@ -464,7 +552,7 @@ class VikitGateway(MLModelsGateway):
         """
         assert subtitleText is not None
 
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = (
                 {
                     "key": self.vikit_api_key,
@@ -504,6 +592,8 @@ class VikitGateway(MLModelsGateway):
         # Transform the list of keywords into a single string, we do keep the final title within
         return clean_result, title_from_keywords_as_tokens
 
+    @cached_llm_call(model=mistral_version)
+    @single_flight(model=mistral_version)
     @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
     async def get_enhanced_prompt_async(self, subtitleText):
         """
@@ -517,7 +607,7 @@ class VikitGateway(MLModelsGateway):
             A prompt enhanced by an LLM
         """
 
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = {
                 "key": self.vikit_api_key,
                 "model": mistral_version,
@@ -570,7 +660,7 @@ class VikitGateway(MLModelsGateway):
                     base64AudioFile = base64.b64encode(
                         open(audiofile_path, "rb").read()
                     ).decode("ascii")
-                    async with aiohttp.ClientSession(timeout=http_timeout) as session:
+                    async with self._http_session_pool.borrow_session() as session:
                         payload = (
                             {
                                 "key": self.vikit_api_key,
@@ -618,6 +708,9 @@ class VikitGateway(MLModelsGateway):
         """
         Generate a video from the given prompt
 
+        The request may be hedged with, or failed over to, the fallback of the model provider,
+        see vikit.gateways.provider_router
+
         Args:
             prompt: The prompt to generate the video from
             model_provider: The model provider to use
@@ -625,6 +718,20 @@ class VikitGateway(MLModelsGateway):
         returns:
                 The path to the generated video
         """
+        return await get_provider_router().route(
+            model_provider,
+            lambda provider: self._generate_video_from_provider_async(
+                prompt_text, provider, prompt_image, aspect_ratio
+            ),
+        )
+
+    async def _generate_video_from_provider_async(
+        self,
+        prompt_text,
+        model_provider: str,
+        prompt_image: str = "",
+        aspect_ratio=(16, 9),
+    ):
         logger.debug(f"Generating video using model provider: {model_provider}")
 
         if model_provider == "vikit":
@@ -638,9 +745,13 @@ class VikitGateway(MLModelsGateway):
         elif model_provider == "videocrafter":
             return await self.generate_video_VideoCrafter2_async(prompt_text)
         elif model_provider == "dynamicrafter":
-            return await self.generate_video_DynamiCrafter_image_async(prompt_text)
+            return await self.generate_video_DynamiCrafter_image_async(
+                _as_image_prompt(prompt_image, text=prompt_text)
+            )
         elif model_provider == "stabilityai_image":
-            return await self.generate_video_from_image_stabilityai_async(prompt_text)
+            return await self.generate_video_from_image_stabilityai_async(
+                _as_image_prompt(prompt_image, text=prompt_text)
+            )
         elif model_provider == "runway":
             return await self.generate_video_from_image_and_text_runway(
                 prompt_text, prompt_image, aspect_ratio
@@ -648,7 +759,12 @@ class VikitGateway(MLModelsGateway):
         else:
             raise ValueError(f"Unknown model provider: {model_provider}")
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("stabilityai")
     async def generate_video_stabilityai_async(self, prompt: str):
         """
         Generate a video from the given prompt
@@ -661,7 +777,7 @@ class VikitGateway(MLModelsGateway):
         """
         output_vid_file_name = f"outputvid-{uid.uuid4()}.mp4"
         logger.debug(f"Generating image from prompt: {prompt[:50]}")
-        async with aiohttp.ClientSession() as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = (
                 {
                     "key": self.vikit_api_key,
@@ -675,73 +791,54 @@ class VikitGateway(MLModelsGateway):
             )
 
             async with session.post(vikit_backend_url, json=payload) as response:
+                raise_for_rate_limit(response, "stabilityai")
                 output = await response.text()
 
-                logger.debug("Resizing image for video generator")
-                # Convert result to Base64
-                buffer = io.BytesIO()
-                output = json.loads(output)
-                logger.trace(f"Output: {output.keys()}")
-                if "error" in output.keys():
-                    err = output["error"]
-                    logger.debug(f"Error: {err}")
-
-                if "image" not in output:
-                    raise ValueError(
-                        f'Output does not contain image: {output["error"]}'
-                    )
-
-                # Convert result to Base64
-                image_data = base64.b64decode(output["image"])
-
-                # Convert the image data to a NumPy array
-                np_arr = np.frombuffer(image_data, np.uint8)
-
-                # Decode the image using OpenCV
-                image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-                # Resize the image using OpenCV
-                target_size = (1024, 576)
-                resized_image = cv2.resize(
-                    image, target_size, interpolation=cv2.INTER_AREA
-                )
-
-                # Encode the resized image back to base64
-                _, buffer = cv2.imencode(".png", resized_image)
+            logger.debug("Resizing image for video generator")
+            output = json.loads(output)
+            logger.trace(f"Output: {output.keys()}")
+            if "error" in output.keys():
+                err = output["error"]
+                logger.debug(f"Error: {err}")
+
+            if "image" not in output:
+                raise ValueError(f'Output does not contain image: {output["error"]}')
+
+            # The image is resized and encoded outside of the event loop
+            img_b64 = await get_image_preparation_service().resize_base64_image_async(
+                output["image"], target_size=(1024, 576)
+            )
 
-                # Encode the image as base64
-                img_b64 = "data:image/png;base64," + base64.b64encode(buffer).decode(
-                    "utf-8"
+            logger.debug("Generating video from image")
+            # Ask for a video, reusing the same session and its keep-alive connection
+            payload = (
+                {
+                    "key": self.vikit_api_key,
+                    "model": "stability_image2video",
+                    "input": {
+                        "image": img_b64,
+                        "seed": 0,
+                        "cfg_scale": 1.8,
+                        "motion_bucket_id": 127,
+                    },
+                },
+            )
+            async with session.post(vikit_backend_url, json=payload) as response:
+                raise_for_rate_limit(response, "stabilityai")
+                # The video is decoded to its file as it is received, not buffered in memory
+                await stream_base64_field_to_file(
+                    response.content.iter_chunked(STREAM_CHUNK_SIZE),
+                    field_name="video",
+                    target_file=output_vid_file_name,
                 )
-
-                logger.debug("Generating video from image")
-                # Ask for a video
-                async with aiohttp.ClientSession() as session:
-                    payload = (
-                        {
-                            "key": self.vikit_api_key,
-                            "model": "stability_image2video",
-                            "input": {
-                                "image": img_b64,
-                                "seed": 0,
-                                "cfg_scale": 1.8,
-                                "motion_bucket_id": 127,
-                            },
-                        },
-                    )
-                    async with session.post(
-                        vikit_backend_url, json=payload
-                    ) as response:
-                        output = await response.json()
-                        with open(output_vid_file_name, "wb") as video_file:
-                            video_file.write(base64.b64decode(output["video"]))
-                        return output_vid_file_name
+                return output_vid_file_name
 
     @retry(
         stop=stop_after_attempt(get_nb_retries_http_calls()),
         reraise=True,
-        wait=wait_exponential(min=1, max=5),
+        wait=wait_retry_after(wait_exponential(min=1, max=5)),
     )
+    @rate_limited("haiper")
     async def generate_video_haiper_async(self, prompt: str):
         """
         Generate a video from the given prompt
@@ -754,7 +851,7 @@ class VikitGateway(MLModelsGateway):
         """
         try:
             logger.debug(f"Generating video from prompt: {prompt}")
-            async with aiohttp.ClientSession(timeout=http_timeout) as session:
+            async with self._http_session_pool.borrow_session() as session:
                 payload = {
                     "key": self.vikit_api_key,
                     "model": "haiper_text2video",
@@ -766,6 +863,7 @@ class VikitGateway(MLModelsGateway):
                     payload["input"]["negative_prompt"] = prompt.negative_prompt
 
                 async with session.post(vikit_backend_url, json=payload) as response:
+                    raise_for_rate_limit(response, "haiper")
                     output = await response.text()
                     logger.debug(f"{output}")
                     output = json.loads(output)
@@ -778,7 +876,12 @@ class VikitGateway(MLModelsGateway):
             logger.error(f"Error generating video from prompt: {e}")
             raise
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("videocrafter")
     async def generate_video_VideoCrafter2_async(self, prompt: str):
         """
         Generate a video from the given prompt
@@ -790,7 +893,7 @@ class VikitGateway(MLModelsGateway):
                 The link to the generated video
         """
         logger.debug(f"Generating video from prompt: {prompt}")
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = {
                 "key": self.vikit_api_key,
                 "model": "cjwbw/videocrafter:02edcff3e9d2d11dcc27e530773d988df25462b1ee93ed0257b6f246de4797c8",
@@ -802,6 +905,7 @@ class VikitGateway(MLModelsGateway):
                 },
             }
             async with session.post(vikit_backend_url, json=payload) as response:
+                raise_for_rate_limit(response, "videocrafter")
                 output = await response.text()
 
         response_json = json.loads(output)
@@ -813,8 +917,13 @@ class VikitGateway(MLModelsGateway):
             raise AttributeError("The result Videocrafter video link is not a link")
         return output
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
-    async def generate_video_DynamiCrafter_image_async(self, prompt: str):
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("dynamicrafter")
+    async def generate_video_DynamiCrafter_image_async(self, prompt):
         """
         Generate a video from the given prompt
 
@@ -825,7 +934,7 @@ class VikitGateway(MLModelsGateway):
                 The link to the generated video
         """
         logger.debug(f"Generating video from prompt: {prompt.text[:50]}")
-        async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        async with self._http_session_pool.borrow_session() as session:
             payload = {
                 "key": self.vikit_api_key,
                 "model": "camenduru/dynami-crafter-576x1024:e79ff8d01e81cbd90acfa1df4f209f637da2c68307891d77a6e4227f4ec350f1",
@@ -840,19 +949,25 @@ class VikitGateway(MLModelsGateway):
                 },
             }
             async with session.post(vikit_backend_url, json=payload) as response:
+                raise_for_rate_limit(response, "dynamicrafter")
                 output = await response.text()
 
         if not output.startswith("http"):
             raise AttributeError("The result Videocrafter video link is not a link")
         return output
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
-    async def generate_video_from_image_stabilityai_async(self, prompt: str):
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("stabilityai")
+    async def generate_video_from_image_stabilityai_async(self, prompt):
         """
         Generate a video from the given image prompt
 
         Args:
-            prompt: Image prompt to generate the video from in base64 format
+            prompt: Image prompt to generate the video from
 
         returns:
                 The link to the generated video
@@ -861,110 +976,76 @@ class VikitGateway(MLModelsGateway):
         # TO DO: include camera motion parameters
         output_vid_file_name = f"outputvid-{uid.uuid4()}.mp4"
         logger.debug(f"Generating video from image prompt {prompt.text} ")
-        async with aiohttp.ClientSession() as session:
-            logger.debug("Resizing image for video generator")
-
-            # Convert result to Base64
-            image_data = base64.b64decode(prompt.image)
-
-            # Convert the image data to a NumPy array
-            np_arr = np.frombuffer(image_data, np.uint8)
-
-            # Decode the image using OpenCV
-            image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
 
-            # Resize the image using OpenCV
-            target_size = (1024, 576)
-            resized_image = cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
+        # The resized image is encoded once per image, then reused across clips and retries
+        img_b64 = await prompt.get_encoded_image_async(target_size=(1024, 576))
 
-            # Encode the resized image back to base64
-            _, buffer = cv2.imencode(".png", resized_image)
-
-            # Encode the image as base64
-            img_b64 = "data:image/png;base64," + base64.b64encode(buffer).decode(
-                "utf-8"
-            )
-
-            logger.debug("Generating video from image")
-            # Ask for a video
-            async with aiohttp.ClientSession() as session:
-                payload = (
-                    {
-                        "key": self.vikit_api_key,
-                        "model": "stability_image2video",
-                        "input": {
-                            "image": img_b64,
-                            "seed": 0,
-                            "cfg_scale": 1.8,
-                            "motion_bucket_id": 127,
-                        },
+        logger.debug("Generating video from image")
+        # Ask for a video
+        async with self._http_session_pool.borrow_session() as session:
+            payload = (
+                {
+                    "key": self.vikit_api_key,
+                    "model": "stability_image2video",
+                    "input": {
+                        "image": img_b64,
+                        "seed": 0,
+                        "cfg_scale": 1.8,
+                        "motion_bucket_id": 127,
                     },
+                },
+            )
+            async with session.post(vikit_backend_url, json=payload) as response:
+                raise_for_rate_limit(response, "stabilityai")
+                # The video is decoded to its file as it is received, not buffered in memory
+                await stream_base64_field_to_file(
+                    response.content.iter_chunked(STREAM_CHUNK_SIZE),
+                    field_name="video",
+                    target_file=output_vid_file_name,
                 )
-                async with session.post(vikit_backend_url, json=payload) as response:
-                    output = await response.json()
-                    with open(output_vid_file_name, "wb") as video_file:
-                        video_file.write(base64.b64decode(output["video"]))
-                    return output_vid_file_name
+                return output_vid_file_name
 
-    @retry(stop=stop_after_attempt(get_nb_retries_http_calls()), reraise=True)
+    @retry(
+        stop=stop_after_attempt(get_nb_retries_http_calls()),
+        reraise=True,
+        wait=wait_retry_after(),
+    )
+    @rate_limited("runway")
     async def generate_video_from_image_and_text_runway(
-        self, prompt: str = "", image: str = "", aspect_ratio=(16, 9)
+        self, prompt: str = "", image=None, aspect_ratio=(16, 9)
     ):
         """
         Generate a video from the given image prompt
 
         Args:
-            prompt: Image prompt to generate the video from in base64 format
+            prompt: The text prompt
+            image: Image prompt to generate the video from, or the image as a base64 string or a URL
 
         returns:
                 The link to the generated video
         """
         try:
             output_vid_file_name = f"outputvid-{uid.uuid4()}.mp4"
+            image = _as_image_prompt(image, text=prompt)
             logger.debug(
-                f"Generating video from image prompt {image[:50]} and prompt {prompt}"
+                f"Generating video from image prompt {image} and prompt {prompt}"
             )
 
-            image_prompt = image
             if aspect_ratio == (16, 9):
                 target_size = (1280, 768)
             else:
                 target_size = (768, 1280)
 
-            # If base64, we resize it. If URL, we cannot resize without downloading it
-            if not image.startswith("http"):
-                # Base64 image
-                logger.debug("Resizing image for video generator")
-
-                # Convert result to Base64
-                image_data = base64.b64decode(image)
-
-                # Convert the image data to a NumPy array
-                np_arr = np.frombuffer(image_data, np.uint8)
-
-                # Decode the image using OpenCV
-                image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-                # Resize the image using OpenCV
-                resized_image = cv2.resize(
-                    image, target_size, interpolation=cv2.INTER_AREA
-                )
-
-                # Encode the resized image back to base64
-                _, buffer = cv2.imencode(".png", resized_image)
-
-                # Encode the image as base64
-                img_b64 = "data:image/png;base64," + base64.b64encode(buffer).decode(
-                    "utf-8"
-                )
-                image_prompt = img_b64
+            # A URL is given as is, as we cannot resize it without downloading it. Otherwise
+            # the resized image is encoded once per image, then reused across clips and retries
+            image_prompt = await image.get_encoded_image_async(target_size=target_size)
 
             logger.debug(f"Generating video from resized image {image_prompt[:50]}")
 
             ratio = str(aspect_ratio[0]) + ":" + str(aspect_ratio[1])
 
             # Ask for a video
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session_pool.borrow_session() as session:
                 payload = (
                     {
                         "key": self.vikit_api_key,
@@ -979,6 +1060,7 @@ class VikitGateway(MLModelsGateway):
                     },
                 )
                 async with session.post(vikit_backend_url, json=payload) as response:
+                    raise_for_rate_limit(response, "runway")
                     output = await response.text()
                     if not output:
                         raise AttributeError("Backend result is empty")
@@ -992,3 +1074,10 @@ class VikitGateway(MLModelsGateway):
         except Exception as e:
             logger.error(f"Error generating video from prompt: {e}")
             raise
+
+
+def _as_image_prompt(prompt_image, text: str = None):
+    # Imported here as the prompts depend on the gateways through their build settings
+    from vikit.prompt.image_prompt import as_image_prompt
+
+    return as_image_prompt(prompt_image, text=text)
@@ -1,7 +1,12 @@
 import asyncio
 from loguru import logger
 import os
+from vikit.common.config import get_max_concurrent_video_builds
 from vikit.common.file_tools import download_or_copy_file, is_valid_path
+from vikit.common.http_session import http_sessions_scope
+from vikit.common.instrumentation import CATEGORY_VIDEO, get_file_size, get_tracer
+from vikit.video.building.build_order import is_composite_video
+from vikit.video.building.build_scheduler import DependencyGraphScheduler
 from vikit.video.video import Video
 from vikit.video.video_build_settings import VideoBuildSettings
 
@@ -42,6 +47,19 @@ class LocalEngine:
             logger.info(f"Video {video.id} is already built, returning it")
             return video
 
+        # The HTTP sessions are closed once the outermost build is over
+        async with http_sessions_scope():
+            with get_tracer().span(
+                "build",
+                CATEGORY_VIDEO,
+                video_id=video.id,
+                video_type=video.short_type_name,
+            ) as span:
+                built_video = await self._build_async(video)
+                span.set_attribute("bytes_out", get_file_size(video.media_url))
+        return built_video
+
+    async def _build_async(self, video: Video):
         current_dir = os.getcwd()
         logger.trace(
             f"Starting the pre build hook for Video {video.id}, current_dir {current_dir} "
@@ -71,7 +89,18 @@ class LocalEngine:
         built_video = await video.run_build_core_logic_hook(
             build_settings=self.build_settings
         )  # logic from the child classes if any
-        built_video = await self._gather_and_run_handlers(video)
+        if (
+            isinstance(video, is_composite_video)
+            and video.edit_decision_list is not None
+        ):
+            # The composite only emitted an edit decision list, its parent renders the media
+            logger.debug(
+                f"Video {video.id} built as an edit decision list, skipping its handlers"
+            )
+            video.metadata.title = video.get_title()
+            built_video = video
+        else:
+            built_video = await self._gather_and_run_handlers(video)
 
         logger.debug(f"Starting the post build hook for Video {video.id} ")
         await video.run_post_build_actions_hook(build_settings=self.build_settings)
@@ -89,6 +118,31 @@ class LocalEngine:
 
         return built_video
 
+    async def generate_dependency_graph_async(
+        self, videos: list[Video], max_concurrency: int = None
+    ) -> list[Video]:
+        """
+        Build a set of videos following their dependency graph: each video starts building
+        as soon as its own video dependencies are built
+
+        Args:
+            videos (list): The videos to build, typically a lazy dependency chain build order
+            max_concurrency (int): The maximum number of videos built at the same time,
+            defaults to the MAX_CONCURRENT_VIDEO_BUILDS configuration
+
+        Returns:
+            list: The built videos
+        """
+        scheduler = DependencyGraphScheduler(
+            max_concurrency=(
+                max_concurrency
+                if max_concurrency is not None
+                else get_max_concurrent_video_builds()
+            )
+        )
+        async with http_sessions_scope():
+            return await scheduler.run(videos, build_video=self.generate_async)
+
     async def _gather_and_run_handlers(self, video: Video) -> Video:
         """
         Gather the handler chain and run it
@@ -60,3 +60,29 @@ class PromptByKeywordsHandler(Handler):
             f"Finished processing prompt, Enhanced prompt: {enhanced_prompt}, title: {title}"
         )
         return enhanced_prompt, title
+
+    async def execute_batch_async(
+        self,
+        text_prompts: list[str],
+        **kwargs,
+    ):
+        """
+        Process a batch of text prompts at once, see execute_async
+
+        Args:
+            text_prompts (list): The prompts to generate the keywords from
+            build_settings (PromptBuildSettings): The build settings
+
+        Returns:
+            a list of keywords and titles, in the order of the prompts
+        """
+        prompt_build_settings: PromptBuildSettings = kwargs.get("prompt_build_settings")
+        if not prompt_build_settings:
+            raise ValueError("PromptBuildSettings is required to process prompt")
+
+        logger.info(
+            f"about to enhance {len(text_prompts)} prompts by extracting keywords from raw user text"
+        )
+        return await prompt_build_settings.get_ml_models_gateway().get_keywords_from_prompts_async(
+            text_prompts
+        )
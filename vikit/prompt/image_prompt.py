@@ -13,20 +13,66 @@
 # limitations under the License.
 # ==============================================================================
 
+import asyncio
+import base64
+import hashlib
+from collections import OrderedDict
+
+from vikit.common.image_preparation import encode_image, get_image_preparation_service
 from vikit.prompt.prompt import Prompt
 
+MAX_ENCODED_IMAGES = 32
+
+# Provider ready encodings of the images, keyed on (image digest, target size, format),
+# shared by the prompts so the same image is resized and encoded once
+_encoded_images = OrderedDict()
+
 
 class ImagePrompt(Prompt):
     """
     A class to represent an image prompt
+
+    The image is kept as given, a file path, raw bytes, a base64 string or a URL, and
+    is only read and encoded when a provider needs it
     """
 
-    def __init__(self, prompt_image: str = None, text: str = None):
+    def __init__(
+        self, prompt_image: str = None, text: str = None, image_path: str = None
+    ):
+        """
+        Initialize the prompt
+
+        Args:
+            prompt_image: The image, as raw bytes, a base64 string or a URL
+            text (str): The text of the prompt
+            image_path (str): The path of the image file, instead of prompt_image
+        """
         super().__init__()
-        if prompt_image is None:
+        if prompt_image is None and image_path is None:
             raise ValueError("The image prompt is not provided")
-        self.image = prompt_image
         self.text = text
+        self.image = prompt_image
+        self.image_path = image_path
+
+    @property
+    def image(self) -> str:
+        """
+        The image as a base64 string, or its URL
+        """
+        if self._image is None:
+            self._image = base64.b64encode(self.get_image_bytes()).decode("utf-8")
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self.image_path = None
+        self._digest = None
+        self._image_bytes = value if isinstance(value, bytes) else None
+        self._image = None if isinstance(value, bytes) else value
+
+    @property
+    def is_url(self) -> bool:
+        return isinstance(self._image, str) and self._image.startswith("http")
 
     @property
     def duration(self) -> float:
@@ -36,3 +82,93 @@ class ImagePrompt(Prompt):
         This is clearly going to change in the next version
         """
         return 4.04
+
+    def get_image_bytes(self) -> bytes:
+        """
+        Get the raw bytes of the image, read or decoded once
+        """
+        if self._image_bytes is None:
+            if self.image_path is not None:
+                with open(self.image_path, "rb") as image_file:
+                    self._image_bytes = image_file.read()
+            elif self.is_url:
+                raise ValueError(f"The image {self._image} is not available locally")
+            else:
+                self._image_bytes = base64.b64decode(self._image)
+        return self._image_bytes
+
+    def get_digest(self) -> str:
+        """
+        Get the content hash of the image, or its URL
+        """
+        if self._digest is None:
+            self._digest = (
+                self._image
+                if self.is_url
+                else hashlib.sha256(self.get_image_bytes()).hexdigest()
+            )
+        return self._digest
+
+    def get_encoded_image(self, target_size: tuple, image_format: str = "png") -> str:
+        """
+        Get the image resized and encoded as expected by the video generation providers.
+        The encoding is computed once per image and target size, then reused across clips and retries
+
+        Args:
+            target_size (tuple): The (width, height) of the image
+            image_format (str): The format of the encoded image
+
+        Returns:
+            str: The image as a base64 data URI, or its URL as URLs cannot be resized
+        """
+        if self.is_url:
+            return self._image
+
+        key = (self.get_digest(), tuple(target_size), image_format)
+        if key not in _encoded_images:
+            _cache_encoded_image(
+                key, encode_image(self.get_image_bytes(), target_size, image_format)
+            )
+        _encoded_images.move_to_end(key)
+        return _encoded_images[key]
+
+    async def get_encoded_image_async(
+        self, target_size: tuple, image_format: str = "png"
+    ) -> str:
+        """
+        Same as get_encoded_image, the image being read, resized and encoded outside of
+        the event loop by the image preparation service
+        """
+        if self.is_url:
+            return self._image
+
+        if self._digest is None:
+            await asyncio.to_thread(self.get_digest)  # reads and hashes the image
+        key = (self.get_digest(), tuple(target_size), image_format)
+        if key not in _encoded_images:
+            _cache_encoded_image(
+                key,
+                await get_image_preparation_service().encode_image_async(
+                    self.get_image_bytes(), target_size, image_format
+                ),
+            )
+        _encoded_images.move_to_end(key)
+        return _encoded_images[key]
+
+    def __str__(self) -> str:
+        return f"ImagePrompt(image={self.get_digest()}, text={self.text})"
+
+
+def as_image_prompt(prompt_image, text: str = None) -> ImagePrompt:
+    """
+    Get an image prompt from an image given as an ImagePrompt, raw bytes, a base64 string or a URL
+    """
+    if isinstance(prompt_image, ImagePrompt):
+        return prompt_image
+    return ImagePrompt(prompt_image=prompt_image, text=text)
+
+
+def _cache_encoded_image(key: tuple, encoded_image: str):
+    _encoded_images[key] = encoded_image
+    while len(_encoded_images) > MAX_ENCODED_IMAGES:
+        _encoded_images.popitem(last=False)
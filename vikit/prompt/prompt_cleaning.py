@@ -60,3 +60,32 @@ def cleanse_llm_keywords(input):
             # old filter, for the records:   new += "".join([i for i in x if not i.isdigit() and i != "."]) + ", "
 
     return new_keywords
+
+
+def split_text_into_sentence_batches(text: str, max_characters: int) -> list[str]:
+    """
+    Split a text into batches of whole sentences, so each batch can be read aloud
+    on its own
+
+    Args:
+        text: The text to split
+        max_characters: The maximum number of characters of a batch, a longer sentence
+        making a batch on its own
+
+    Returns:
+        The batches of sentences, in order
+    """
+    if text is None:
+        raise AttributeError("The input text is None")
+
+    batches = []
+    batch = ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        if batch and len(batch) + 1 + len(sentence) > max_characters:
+            batches.append(batch)
+            batch = sentence
+        else:
+            batch = f"{batch} {sentence}" if batch else sentence
+    if batch:
+        batches.append(batch)
+    return batches
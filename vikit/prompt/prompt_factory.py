@@ -13,7 +13,6 @@
 # limitations under the License.
 # ==============================================================================
 
-import base64
 import os
 
 from loguru import logger
@@ -34,7 +33,7 @@ from vikit.prompt.recorded_prompt import RecordedPrompt
 from vikit.prompt.recorded_prompt_subtitles_extractor import (
     RecordedPromptSubtitlesExtractor,
 )
-from vikit.wrappers.ffmpeg_wrapper import get_media_duration
+from vikit.wrappers.ffmpeg_wrapper import get_media_duration_async
 
 import uuid
 
@@ -113,7 +112,7 @@ class PromptFactory:
             text=prompt_text,
             subtitles=merged_subs,
             audio_recording=config.get_prompt_mp3_file_name(self.prompt_factory_uuid),
-            duration=get_media_duration(config.get_prompt_mp3_file_name(self.prompt_factory_uuid)),
+            duration=await get_media_duration_async(config.get_prompt_mp3_file_name(self.prompt_factory_uuid)),
         )
         prompt.negative_prompt = negative_prompt
         return prompt
@@ -209,6 +208,32 @@ class PromptFactory:
 
         return text_prompt  # return the last enhanced prompt from handlers chain
 
+    async def get_reengineered_prompt_texts_from_raw_texts(
+        self,
+        prompts: list[str],
+        prompt_build_settings: PromptBuildSettings,
+    ) -> list[str]:
+        """
+        Get reengineered prompts from a batch of raw texts, using build settings
+        to guide how we should build the prompts. Each handler of the chain processes
+        the whole batch at once
+
+        Args:
+            prompts (list): The text prompts
+
+        Returns:
+            list: The reengineered prompts, in the order of the raw texts
+        """
+        handler_chain = self.get_prompt_handler_chain(prompt_build_settings)
+        text_prompts = list(prompts)
+        for handler in handler_chain:
+            enhanced_prompts = await handler.execute_batch_async(
+                text_prompts=text_prompts, prompt_build_settings=prompt_build_settings
+            )
+            text_prompts = [text_prompt for text_prompt, _ in enhanced_prompts]
+
+        return text_prompts
+
     def get_prompt_handler_chain(
         self, prompt_build_settings: PromptBuildSettings
     ) -> list[Handler]:
@@ -251,7 +276,6 @@ class PromptFactory:
         if not os.path.exists(image_path):
             raise ValueError(f"The prompt image file {image_path} does not exist")
 
-        with open(image_path, "rb") as image_file:
-            input_prompt_image = base64.b64encode(image_file.read()).decode("utf-8")
-        img_prompt = ImagePrompt(prompt_image=input_prompt_image, text=text)
+        # The image is only read and encoded when a provider needs it
+        img_prompt = ImagePrompt(image_path=image_path, text=text)
         return img_prompt
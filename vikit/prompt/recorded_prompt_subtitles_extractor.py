@@ -13,17 +13,17 @@
 # limitations under the License.
 # ==============================================================================
 
-import os
-import subprocess
+import asyncio
+import uuid
 
-import pysrt
 from loguru import logger
 
 import vikit.common.config as config
-from vikit.gateways.ML_models_gateway import MLModelsGateway
+from vikit.common.audio_analysis import detect_pauses_async
+from vikit.gateways.ML_models_gateway import MLModelsGateway, _gather_bounded
+from vikit.prompt.subtitle_accumulator import SubtitleAccumulator
 from vikit.prompt.subtitle_extractor import SubtitleExtractor
-from vikit.wrappers.ffmpeg_wrapper import extract_audio_slice, get_media_duration
-import uuid
+from vikit.wrappers.ffmpeg_wrapper import get_media_duration_async, split_audio_async
 
 
 class RecordedPromptSubtitlesExtractor(SubtitleExtractor):
@@ -32,100 +32,171 @@ class RecordedPromptSubtitlesExtractor(SubtitleExtractor):
     merge short subtitles into longer ones, or extract them as text tokens
 
     Here is how we do it:
-    - We extract the audio slice from the audio file and cap the duration of the slice to x seconds
-    so that replicate can process it (today n = 300 seconds, i.e. 5minutes)
-    - We save the generated subtitles to a temporary SRT file
-    - We concatenate the temporary SRT files to a prompt wide srt file
+    - We split the audio file into slices in one pass and cap the duration of the slices
+    to x seconds so that replicate can process them (today n = 300 seconds, i.e. 5minutes)
+    - We shift the generated subtitles after the ones of the previous slices, in memory
+    - We save all the subtitles to a prompt wide srt file
+
+    In parallel mode, the slices are cut on silences up front, transcribed concurrently
+    and each of them is shifted by its start in the recording
 
-    Yes this is kind of hacky, but it works for now.
+    The natural pauses of the recording are kept, so the subtitles are merged into
+    scenes ending on pauses
     """
 
     async def extract_subtitles_async(
-        self, recorded_prompt_file_path, ml_models_gateway: MLModelsGateway = None
+        self,
+        recorded_prompt_file_path,
+        ml_models_gateway: MLModelsGateway = None,
+        parallel: bool = None,
     ):
         """
         Generate subtitles from a recorded audio file
 
-                inputs: NA
+                inputs:
+                    parallel: whether to transcribe the slices concurrently,
+                    defaults to the SUBTITLES_PARALLEL_TRANSCRIPTION configuration
                 returns: Subtitle Rip File object
         """
         # Obtain the duration of the audio file in seconds
         if recorded_prompt_file_path is None:
             raise ValueError("The path to the recorded audio file is not provided")
 
-        subs = None
-        mp3_duration = get_media_duration(recorded_prompt_file_path)
-        cat_command_args = ""
-        video_length_per_subtitle = config.get_video_length_per_subtitle()
-        secondsToAdd = 0
-        for i in range(0, int(mp3_duration), video_length_per_subtitle):
-            # Determine the end time for the current slice
-            end = (
-                mp3_duration
-                if i + video_length_per_subtitle > mp3_duration
-                else i + video_length_per_subtitle
-            )
-            # Generate the audio slice from the audio file
-            generated_slice = await extract_audio_slice(
-                start=i, end=end, audiofile_path=recorded_prompt_file_path
-            )
-            logger.debug(f"Generated slice {generated_slice}")
-            # Obtain  sub part of subtitles using elevenlabs API
-            subs = await ml_models_gateway.get_subtitles_async(
-                audiofile_path=generated_slice
+        if parallel is None:
+            parallel = config.get_subtitles_parallel_transcription()
+        if parallel:
+            return await self._extract_subtitles_in_parallel_async(
+                recorded_prompt_file_path, ml_models_gateway
             )
-            logger.debug(f"Subtitles in subtitle extractor: {subs}")
-
-            subtitle_file_path = "_".join(["subSubtitle", str(i), str(end)]) + ".srt"
-
-            if "output" in subs:
-                if "transcription" in subs["output"]:
-                    transcription = subs["output"]["transcription"]
-                else:
-                    raise ValueError(
-                        "Error: 'transcription' key exists but has no content."
-                    )
-            else:
-                if "transcription" in subs:
-                    transcription = subs["transcription"]
-                else:
-                    raise ValueError(
-                        "Error: 'transcription' key exists but has no content."
-                    )
-            with open(subtitle_file_path, "w") as f:
-                f.write(transcription)
-
-            # We shift subtitles if this is not the first file
-            currentSubtitles = pysrt.open(subtitle_file_path)
-            currentSubtitles.shift(seconds=secondsToAdd)
-            currentSubtitles.save(subtitle_file_path)
-
-            # We save the new time of the last subtitle to add it to the next batch of subtitles
-            last_subtitle = currentSubtitles[-1]
-            secondsToAdd = (
-                last_subtitle.end.hours * 3600
-                + last_subtitle.end.minutes * 60
-                + last_subtitle.end.seconds
-            )
-
-            # Append SRT file path to cat command arguments
-            cat_command_args = " ".join([cat_command_args, subtitle_file_path])
 
-            # Concatenate the temporary SRT files to a prompt wide srt file
-            tempUuid = self.prompt_factory_uuid = str(uuid.uuid4())
-            with open(config.get_subtitles_default_file_name(tempUuid), "w") as f:
-                p = subprocess.Popen(
-                    ["cat"] + cat_command_args.split(), stdout=f, stderr=subprocess.PIPE
+        mp3_duration = await get_media_duration_async(recorded_prompt_file_path)
+        video_length_per_subtitle = config.get_video_length_per_subtitle()
+        # Generate all the audio slices from the audio file in one pass
+        generated_slices = await split_audio_async(
+            recorded_prompt_file_path,
+            cut_times=list(
+                range(
+                    video_length_per_subtitle,
+                    int(mp3_duration),
+                    video_length_per_subtitle,
+                )
+            ),
+        )
+
+        async def transcribe_in_order():
+            accumulator = SubtitleAccumulator()
+            for generated_slice, _, _ in generated_slices:
+                logger.debug(f"Generated slice {generated_slice}")
+                # Obtain  sub part of subtitles using elevenlabs API
+                subs = await ml_models_gateway.get_subtitles_async(
+                    audiofile_path=generated_slice
+                )
+                logger.debug(f"Subtitles in subtitle extractor: {subs}")
+
+                # We shift the subtitles after the last subtitle of the previous slices
+                accumulator.append(_get_transcription(subs))
+            return accumulator
+
+        # The pauses are looked for while the slices are being transcribed
+        accumulator, self.pauses = await asyncio.gather(
+            transcribe_in_order(), detect_pauses_async(recorded_prompt_file_path)
+        )
+        return self._save_subtitles(accumulator)
+
+    def _save_subtitles(self, accumulator: SubtitleAccumulator):
+        # Write the prompt wide srt file once all the slices are transcribed
+        self.prompt_factory_uuid = str(uuid.uuid4())
+        accumulator.save(
+            config.get_subtitles_default_file_name(self.prompt_factory_uuid)
+        )
+        return accumulator.subtitles
+
+    async def _extract_subtitles_in_parallel_async(
+        self, recorded_prompt_file_path, ml_models_gateway: MLModelsGateway
+    ):
+        """
+        Transcribe the slices of the recording concurrently, each slice being cut on a
+        silence so no word is split between two transcriptions
+        """
+        mp3_duration = await get_media_duration_async(recorded_prompt_file_path)
+        self.pauses = await detect_pauses_async(recorded_prompt_file_path)
+        slices = get_slice_boundaries(
+            mp3_duration,
+            max_slice_duration=config.get_video_length_per_subtitle(),
+            silences=self.pauses,
+            search_window=config.get_subtitles_silence_search_window(),
+        )
+        generated_slices = await split_audio_async(
+            recorded_prompt_file_path, cut_times=[end for _, end in slices[:-1]]
+        )
+        logger.debug(f"Transcribing {len(generated_slices)} slices concurrently")
+
+        sliced_subs = await _gather_bounded(
+            [
+                lambda path=path: ml_models_gateway.get_subtitles_async(
+                    audiofile_path=path
                 )
-                stdout, stderr = p.communicate()
-                if p.returncode != 0:
-                    raise subprocess.CalledProcessError(
-                        p.returncode, p.args, output=stdout, stderr=stderr
-                    )
-
-            assert os.path.exists(
-                config.get_subtitles_default_file_name(tempUuid)
-            ), "The generated subtitles file does not exists after having generating subtitles from audio file"
-            subs = pysrt.open(config.get_subtitles_default_file_name(tempUuid))
-
-        return subs
+                for path, _, _ in generated_slices
+            ],
+            max_concurrency=config.get_max_concurrent_transcriptions(),
+        )
+
+        accumulator = SubtitleAccumulator()
+        for (_, start, _), subs in zip(generated_slices, sliced_subs):
+            # The offset of the slice is known, no need to wait for the previous one
+            accumulator.append(_get_transcription(subs), offset=start)
+
+        return self._save_subtitles(accumulator)
+
+
+def get_slice_boundaries(
+    duration: float,
+    max_slice_duration: float,
+    silences: list = None,
+    search_window: float = 30,
+) -> list[tuple]:
+    """
+    Cut a recording into slices no longer than max_slice_duration, each slice ending in
+    the middle of the last silence found within search_window seconds before its maximum end
+
+    Args:
+        duration (float): The duration of the recording, in seconds
+        max_slice_duration (float): The maximum duration of a slice, in seconds
+        silences (list): The (start, end) of the silences of the recording, in seconds
+        search_window (float): How far before the maximum end of a slice to look for a silence
+
+    Returns:
+        list: The (start, end) of the slices, in seconds
+    """
+    if max_slice_duration <= 0:
+        raise ValueError("The maximum duration of a slice should be positive")
+
+    cut_candidates = sorted(
+        (silence_start + silence_end) / 2
+        for silence_start, silence_end in silences or []
+    )
+    slices = []
+    start = 0.0
+    while duration - start > max_slice_duration:
+        end = start + max_slice_duration
+        silence_cuts = [
+            cut
+            for cut in cut_candidates
+            if max(start, end - search_window) < cut <= end
+        ]
+        if silence_cuts:
+            end = silence_cuts[-1]
+        slices.append((start, end))
+        start = end
+    if duration > start:
+        slices.append((start, duration))
+    return slices
+
+
+def _get_transcription(subs: dict) -> str:
+    # The transcription is either at the root or in the output of the model answer
+    if "output" in subs:
+        subs = subs["output"]
+    if "transcription" not in subs:
+        raise ValueError("Error: 'transcription' key exists but has no content.")
+    return subs["transcription"]
@@ -0,0 +1,75 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import pysrt
+from loguru import logger
+
+
+class SubtitleAccumulator:
+    """
+    Accumulate the transcriptions of the slices of a recording in memory.
+
+    Each transcription is parsed once, shifted to its place in the recording and appended,
+    the subtitles being written to an SRT file only when asked
+    """
+
+    def __init__(self):
+        self.subtitles = pysrt.SubRipFile()
+
+    def __len__(self):
+        return len(self.subtitles)
+
+    @property
+    def end_seconds(self) -> int:
+        """
+        The end of the last accumulated subtitle, in whole seconds
+        """
+        if not self.subtitles:
+            return 0
+        last_end = self.subtitles[-1].end
+        return last_end.hours * 3600 + last_end.minutes * 60 + last_end.seconds
+
+    def append(self, transcription: str, offset: float = None) -> pysrt.SubRipFile:
+        """
+        Append the transcription of a slice
+
+        Args:
+            transcription (str): The transcription of the slice, in SRT format
+            offset (float): The start of the slice in the recording, in seconds. Defaults to
+            the end of the last accumulated subtitle when the slices are transcribed in order
+
+        Returns:
+            The subtitles of the slice, shifted and renumbered
+        """
+        slice_subtitles = pysrt.from_string(transcription)
+        if offset is None:
+            offset = self.end_seconds
+        slice_subtitles.shift(milliseconds=round(offset * 1000))
+
+        for subtitle in slice_subtitles:
+            subtitle.index = len(self.subtitles) + 1
+            self.subtitles.append(subtitle)
+        logger.trace(f"Appended {len(slice_subtitles)} subtitles at {offset}s")
+        return slice_subtitles
+
+    def save(self, path: str) -> str:
+        """
+        Write the accumulated subtitles to an SRT file
+
+        Returns:
+            str: The path of the SRT file
+        """
+        self.subtitles.save(path, encoding="utf-8")
+        return path
@@ -17,6 +17,10 @@ from loguru import logger
 
 import vikit.common.config as config
 
+# How far a pause may be from the boundary between two subtitles, as the timings of
+# the transcriptions are approximate
+PAUSE_TOLERANCE_MS = 250
+
 
 class SubtitleExtractor:
     """
@@ -24,9 +28,24 @@ class SubtitleExtractor:
     merge short subtitles into longer ones, or extract them as text tokens
     """
 
-    def merge_short_subtitles(self, subtitles, min_duration=7):
+    # The (start, end) of the natural pauses of the recording, in seconds, when known
+    pauses = None
+
+    def merge_short_subtitles(self, subtitles, min_duration=7, pauses: list = None):
         """
-        Merge subtitles which total duration is less than 7 seconds
+        Merge subtitles which total duration is less than min_duration seconds, in one pass
+
+        When the pauses of the recording are known, a scene lasting min_duration is only
+        closed on a pause between two subtitles, unless it already lasts twice min_duration
+
+        Args:
+            subtitles: The subtitles to merge
+            min_duration: The minimum duration of a scene, in seconds
+            pauses: The (start, end) of the pauses of the recording, in seconds,
+            defaults to the ones found while extracting the subtitles
+
+        returns:
+            The merged subtitles
         """
         if subtitles is None:
             raise ValueError("The subtitles are not provided")
@@ -35,25 +54,41 @@ class SubtitleExtractor:
         assert len(subs) > 0, "No Subtitles to process from the provided recording file"
         logger.debug(f"Subs to merge {len(subs)}")
 
+        pauses = sorted(pauses if pauses is not None else self.pauses or [])
+        min_duration_ms = min_duration * 1000
+        pause_index = 0
+        merged_subs = []
         # We  make sure that all subtitles are minimum of 7 seconds in order to be able to insert two videos inside
-        index = 0
-        while index < len(subs) - 1:
-            secondsForSubtitle = (
-                subs[index].start.hours * 60 + subs[index].start.minutes
-            ) * 60 + subs[index].start.seconds
-            secondsForNextSubtitle = (
-                subs[index + 1].start.hours * 60 + subs[index + 1].start.minutes
-            ) * 60 + subs[index + 1].start.seconds
-            interspace = secondsForNextSubtitle - secondsForSubtitle
-
-            if interspace < min_duration:
-                # We need to merge the subtitles
-                subs[index + 1].text = subs[index].text + " " + subs[index + 1].text
-                subs[index + 1].start = subs[index].start
-                del subs[index]
-            else:
-                index = index + 1
+        for sub in subs:
+            if merged_subs:
+                scene = merged_subs[-1]
+                scene_duration = sub.start.ordinal - scene.start.ordinal
+                can_close_scene = scene_duration >= min_duration_ms
+                if can_close_scene and pauses:
+                    # The pauses are visited once, in order, as the scenes move forward
+                    boundary_start = scene.end.ordinal - PAUSE_TOLERANCE_MS
+                    boundary_end = sub.start.ordinal + PAUSE_TOLERANCE_MS
+                    while (
+                        pause_index < len(pauses)
+                        and pauses[pause_index][1] * 1000 < boundary_start
+                    ):
+                        pause_index += 1
+                    is_on_pause = (
+                        pause_index < len(pauses)
+                        and pauses[pause_index][0] * 1000 <= boundary_end
+                    )
+                    can_close_scene = (
+                        is_on_pause or scene_duration >= 2 * min_duration_ms
+                    )
+
+                if not can_close_scene:
+                    # We need to merge the subtitles
+                    scene.text = scene.text + " " + sub.text
+                    scene.end = max(scene.end, sub.end)
+                    continue
+            merged_subs.append(sub)
 
+        subs[:] = merged_subs
         logger.trace(f"Subs after merge {len(subs)}")
         return subs
 
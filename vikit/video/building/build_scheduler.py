@@ -0,0 +1,184 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from vikit.video.video import Video
+
+
+class DependencyGraphScheduler:
+    """
+    Schedules the build of a set of videos following their dependency graph.
+
+    Each video is pushed to a ready queue as soon as all of its own video_dependencies
+    are built, instead of waiting for a whole "wave" of videos to complete. A pool of
+    workers consumes the ready queue, so the number of videos being built at the same time
+    never exceeds max_concurrency.
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_concurrency (int): The maximum number of videos built at the same time,
+            None or 0 means no limit
+        """
+        if max_concurrency is not None and max_concurrency < 0:
+            raise ValueError(
+                f"max_concurrency should be positive or None, got {max_concurrency}"
+            )
+        self.max_concurrency = max_concurrency
+        self._completion_events: dict[str, asyncio.Event] = {}
+        self._dependents: dict[str, list[Video]] = {}
+        self._pending_dependencies: dict[str, int] = {}
+        self._error = None
+
+    async def wait_for(self, video: Video):
+        """
+        Wait for a given video of the graph to be built
+
+        Args:
+            video (Video): The video to wait for
+        """
+        if video.id not in self._completion_events:
+            raise ValueError(f"Video {video.id} is not part of the scheduled graph")
+        await self._completion_events[video.id].wait()
+
+    async def run(
+        self,
+        videos: list[Video],
+        build_video: Callable[[Video], Awaitable[Video]],
+    ) -> list[Video]:
+        """
+        Build all the videos of the graph, each one starting as soon as its dependencies are built
+
+        Args:
+            videos (list): The videos to build, typically the ones from the lazy dependency chain build order
+            build_video: The coroutine function used to build a single video
+
+        Returns:
+            list: The videos, in the order they were provided
+        """
+        ready_videos = self._build_graph(videos)
+        if not videos:
+            return videos
+        if not ready_videos:
+            raise ValueError(
+                "No video can be built first, there is a dependency cycle in the video tree"
+            )
+
+        ready_queue = asyncio.Queue()
+        for video in ready_videos:
+            ready_queue.put_nowait(video)
+
+        nb_workers = (
+            min(self.max_concurrency, len(videos))
+            if self.max_concurrency
+            else len(videos)
+        )
+        logger.debug(
+            f"Scheduling the build of {len(videos)} videos with {nb_workers} workers"
+        )
+        workers = [
+            asyncio.create_task(self._worker(ready_queue, build_video))
+            for _ in range(nb_workers)
+        ]
+        try:
+            await ready_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if self._error:
+            raise self._error
+
+        not_built = [
+            video.id
+            for video in videos
+            if not self._completion_events[video.id].is_set()
+        ]
+        if not_built:
+            raise ValueError(
+                f"Some dependencies could not be processed, videos not built: {not_built}"
+            )
+
+        return videos
+
+    def _build_graph(self, videos: list[Video]) -> list[Video]:
+        """
+        Compute the dependents and the number of pending dependencies of each video
+
+        Args:
+            videos (list): The videos of the graph
+
+        Returns:
+            list: The videos that have no pending dependency and can be built right away
+        """
+        self._completion_events = {video.id: asyncio.Event() for video in videos}
+        self._dependents = {video.id: [] for video in videos}
+        self._pending_dependencies = {}
+        self._error = None
+
+        ready_videos = []
+        for video in videos:
+            pending = 0
+            for dependency in video.video_dependencies:
+                if dependency.id in self._completion_events:
+                    if not dependency._is_video_built:
+                        self._dependents[dependency.id].append(video)
+                        pending += 1
+                elif not dependency._is_video_built:
+                    raise ValueError(
+                        f"Dependency {dependency.id} of video {video.id} is neither built nor scheduled"
+                    )
+            self._pending_dependencies[video.id] = pending
+            if pending == 0:
+                ready_videos.append(video)
+
+        return ready_videos
+
+    async def _worker(
+        self,
+        ready_queue: asyncio.Queue,
+        build_video: Callable[[Video], Awaitable[Video]],
+    ):
+        """
+        Build the videos from the ready queue and release their dependents once built
+        """
+        while True:
+            video = await ready_queue.get()
+            try:
+                if self._error is None:
+                    await build_video(video)
+                    self._on_video_built(video, ready_queue)
+            except Exception as e:
+                logger.error(f"Failed to build video {video.id}: {e}")
+                if self._error is None:
+                    self._error = e
+            finally:
+                ready_queue.task_done()
+
+    def _on_video_built(self, video: Video, ready_queue: asyncio.Queue):
+        self._completion_events[video.id].set()
+        for dependent in self._dependents[video.id]:
+            self._pending_dependencies[dependent.id] -= 1
+            if self._pending_dependencies[dependent.id] == 0:
+                logger.trace(f"Dependencies of video {dependent.id} are built")
+                ready_queue.put_nowait(dependent)
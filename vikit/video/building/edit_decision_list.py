@@ -0,0 +1,100 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+class EditSegment:
+    """
+    A media played at a given speed in an edit decision list
+    """
+
+    def __init__(self, media_path: str, duration: float, speed_ratio: float = 1.0):
+        """
+        Initialize the segment
+
+        Args:
+            media_path (str): The path to the media
+            duration (float): The duration of the media, before any speed change
+            speed_ratio (float): The ratio to multiply the media speed with
+        """
+        if speed_ratio <= 0:
+            raise ValueError(f"Speed ratio should be greater than 0. Got {speed_ratio}")
+        self.media_path = media_path
+        self.duration = duration
+        self.speed_ratio = speed_ratio
+
+    def get_duration(self):
+        """
+        Get the duration of the segment once its speed is changed
+        """
+        return self.duration / self.speed_ratio
+
+    def __repr__(self):
+        return f"EditSegment({self.media_path}, {self.duration}, x{self.speed_ratio})"
+
+
+class EditDecisionList:
+    """
+    A lightweight description of a composite video: the media composing it, in order,
+    each with its own speed ratio.
+
+    Composites nested in a video tree can emit an edit decision list instead of
+    encoding an intermediate media, so the root composite resolves the whole tree
+    and encodes it once.
+    """
+
+    def __init__(self, segments: list[EditSegment] = None):
+        self.segments = segments if segments else []
+
+    def append_media(self, media_path: str, duration: float, speed_ratio: float = 1.0):
+        """
+        Append a media at the end of the list
+        """
+        self.segments.append(
+            EditSegment(
+                media_path=media_path, duration=duration, speed_ratio=speed_ratio
+            )
+        )
+        return self
+
+    def append_edit_decision_list(self, edit_decision_list: "EditDecisionList"):
+        """
+        Append the segments of another edit decision list at the end of the list
+        """
+        self.segments.extend(edit_decision_list.segments)
+        return self
+
+    def with_speed_ratio(self, speed_ratio: float) -> "EditDecisionList":
+        """
+        Get a copy of the list with all the segments sped up by the given ratio
+        """
+        return EditDecisionList(
+            [
+                EditSegment(
+                    media_path=segment.media_path,
+                    duration=segment.duration,
+                    speed_ratio=segment.speed_ratio * speed_ratio,
+                )
+                for segment in self.segments
+            ]
+        )
+
+    def get_duration(self):
+        """
+        Get the duration of the resulting media
+        """
+        return sum(segment.get_duration() for segment in self.segments)
+
+    def __len__(self):
+        return len(self.segments)
@@ -19,10 +19,11 @@ from loguru import logger
 # from vikit.video.video import Video
 import vikit.common.config as config
 from vikit.common.handler import Handler
+from vikit.video.building.handlers.fused_post_build_handler import FusedStep
 from vikit.wrappers.ffmpeg_wrapper import (
     extract_audio_slice,
     merge_audio,
-    get_media_duration,
+    get_media_duration_async,
 )
 
 
@@ -44,6 +45,28 @@ class DefaultBGMusicAndAudioMergingHandler(Handler):
         Returns:
             The video including bg music
         """
+        step = await self.prepare_fused_step_async(video)
+
+        video.media_url = await merge_audio(
+            media_url=video.media_url,
+            audio_file_path=step.audio_file_path,
+            target_file_name=video.get_file_name_by_state(),
+        )
+        assert video.media_url, "Default Background music was not merged properly"
+
+        return video
+
+    async def prepare_fused_step_async(self, video):
+        """
+        Fit the default background music to the video, and describe its merging so it can be
+        fused with other post build handlers
+
+        Args:
+            video (Video): The video to process
+
+        Returns:
+            FusedStep: The audio merging step
+        """
         logger.info(
             f"about to merge default background music to video: {video.id}, music media source (before transformation):  {config.get_default_background_music()}"
         )
@@ -53,7 +76,7 @@ class DefaultBGMusicAndAudioMergingHandler(Handler):
             self.duration = float(self.duration)
             logger.info(f"Using provided music duration: {self.duration}")
         else:
-            self.duration = get_media_duration(video.media_url)
+            self.duration = await get_media_duration_async(video.media_url)
             logger.info(
                 f"Using video media duration as music duration: {self.duration}"
             )
@@ -62,17 +85,10 @@ class DefaultBGMusicAndAudioMergingHandler(Handler):
         )
         video.metadata.bg_music_applied = True
         video.metadata.is_default_bg_music_applied = True
-
-        video.media_url = await merge_audio(
-            media_url=video.media_url,
-            audio_file_path=audio_file,
-            target_file_name=video.get_file_name_by_state(),
-        )
         assert audio_file, "Default Background music was not fit properly to video"
         video.background_music = audio_file
-        assert video.media_url, "Default Background music was not merged properly"
 
-        return video
+        return FusedStep(audio_file_path=audio_file)
 
     async def _fit_standard_background_music(
         self, video, expected_music_duration: float = None
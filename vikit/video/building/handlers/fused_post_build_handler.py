@@ -0,0 +1,109 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+
+from loguru import logger
+
+from vikit.common.handler import Handler
+from vikit.wrappers.ffmpeg_wrapper import reencode_and_merge_audio
+
+
+class FusedStep:
+    """
+    What a post build handler would do to the media, described rather than applied
+    so several handlers can be rendered by a single ffmpeg command
+    """
+
+    def __init__(
+        self,
+        reencode: bool = False,
+        audio_file_path: str = None,
+        audio_file_relative_volume: float = 1.0,
+    ):
+        self.reencode = reencode
+        self.audio_file_path = audio_file_path
+        self.audio_file_relative_volume = audio_file_relative_volume
+
+
+def is_fusable(handler: Handler):
+    """
+    Check if a handler can take part in a fused post build
+    """
+    return hasattr(handler, "prepare_fused_step_async")
+
+
+class FusedPostBuildHandler(Handler):
+    """
+    Handler running a chain of post build handlers (reencoding, background music, read aloud
+    prompt...) as one ffmpeg filter graph, so the video is encoded once instead of once per handler
+    """
+
+    def __init__(self, handlers: list[Handler]):
+        if not handlers:
+            raise ValueError("At least one handler is required")
+        for handler in handlers:
+            if not is_fusable(handler):
+                raise ValueError(f"Handler {type(handler).__name__} cannot be fused")
+        self.handlers = handlers
+
+    async def execute_async(self, video):
+        """
+        Prepare each of the fused handlers in order, then render them all at once
+
+        Args:
+            video (Video): The video to process
+
+        Returns:
+            The video including all the handlers transformations
+        """
+        logger.info(
+            f"about to run {len(self.handlers)} fused post build handlers on video: {video.id}"
+        )
+        if not video.media_url:
+            raise ValueError(f"Video {video.id} has no media url")
+
+        reencode = False
+        audio_tracks = []
+        for handler in self.handlers:
+            step = await handler.prepare_fused_step_async(video)
+            reencode = reencode or step.reencode
+            if step.audio_file_path:
+                audio_tracks.append(
+                    (step.audio_file_path, step.audio_file_relative_volume)
+                )
+
+        # The file name depends on the metadata set by the handlers, so it is only known now
+        target_file_name = video.get_file_name_by_state(
+            build_settings=video.build_settings
+        )
+        rendered_file_name = target_file_name
+        if os.path.abspath(target_file_name) == os.path.abspath(video.media_url):
+            # ffmpeg cannot read and write the same file
+            rendered_file_name = "fused_" + os.path.basename(target_file_name)
+
+        rendered_file_name = await reencode_and_merge_audio(
+            media_url=video.media_url,
+            audio_tracks=audio_tracks,
+            reencode=reencode,
+            target_file_name=rendered_file_name,
+        )
+        if rendered_file_name != target_file_name:
+            os.replace(rendered_file_name, target_file_name)
+
+        video.media_url = target_file_name
+        logger.trace(f"Fused post build done: {video.id}, {video.media_url}")
+
+        return video
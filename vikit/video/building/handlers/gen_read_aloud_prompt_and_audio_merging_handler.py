@@ -16,6 +16,7 @@
 from loguru import logger
 
 from vikit.common.handler import Handler
+from vikit.video.building.handlers.fused_post_build_handler import FusedStep
 from vikit.wrappers.ffmpeg_wrapper import merge_audio
 
 
@@ -39,14 +40,11 @@ class ReadAloudPromptAudioMergingHandler(Handler):
         Returns:
             The video including generated synthetic voice that reads the prompt
         """
-        logger.info(
-            f"about to merge read aloud prompt audio to video: {video.id}, read aloud media:  {self.recorded_prompt.audio_recording}"
-        )
-        video.metadata.is_prompt_read_aloud = True
+        step = await self.prepare_fused_step_async(video)
 
         video.media_url = await merge_audio(
             media_url=video.media_url,
-            audio_file_path=self.recorded_prompt.audio_recording,
+            audio_file_path=step.audio_file_path,
             target_file_name=video.get_file_name_by_state(
                 build_settings=video.build_settings
             ),
@@ -54,3 +52,20 @@ class ReadAloudPromptAudioMergingHandler(Handler):
         assert video.media_url, "Media URL was not generated properly"
 
         return video
+
+    async def prepare_fused_step_async(self, video):
+        """
+        Describe the read aloud prompt merging so it can be fused with other post build handlers
+
+        Args:
+            video (Video): The video to process
+
+        Returns:
+            FusedStep: The audio merging step
+        """
+        logger.info(
+            f"about to merge read aloud prompt audio to video: {video.id}, read aloud media:  {self.recorded_prompt.audio_recording}"
+        )
+        video.metadata.is_prompt_read_aloud = True
+
+        return FusedStep(audio_file_path=self.recorded_prompt.audio_recording)
@@ -16,7 +16,8 @@
 from loguru import logger
 
 from vikit.common.handler import Handler
-from vikit.wrappers.ffmpeg_wrapper import merge_audio, get_media_duration
+from vikit.video.building.handlers.fused_post_build_handler import FusedStep
+from vikit.wrappers.ffmpeg_wrapper import merge_audio, get_media_duration_async
 
 
 class GenerateMusicAndMergeHandler(Handler):
@@ -38,6 +39,27 @@ class GenerateMusicAndMergeHandler(Handler):
         Returns:
             CompositeVideo: The composite video
         """
+        step = await self.prepare_fused_step_async(video)
+
+        video.media_url = await merge_audio(
+            media_url=video.media_url,
+            audio_file_path=step.audio_file_path,
+            target_file_name=video.get_file_name_by_state(),
+        )
+
+        return video
+
+    async def prepare_fused_step_async(self, video):
+        """
+        Generate the background music, and describe its merging so it can be fused with
+        other post build handlers
+
+        Args:
+            video (Video): The video to process
+
+        Returns:
+            FusedStep: The audio merging step
+        """
         logger.info(f"about to generate music for video: {video.id} ")
         self.bg_music_prompt = (
             self.bg_music_prompt
@@ -48,7 +70,7 @@ class GenerateMusicAndMergeHandler(Handler):
             self.music_duration = float(self.music_duration)
             logger.info(f"Using provided music duration: {self.music_duration}")
         else:
-            self.music_duration = get_media_duration(video.media_url)
+            self.music_duration = await get_media_duration_async(video.media_url)
             logger.info(
                 f"Using video media duration as music duration: {self.music_duration}"
             )
@@ -61,14 +83,8 @@ class GenerateMusicAndMergeHandler(Handler):
 
         video.metadata.is_bg_music_generated = True
         video.metadata.bg_music_applied = True
-
-        video.media_url = await merge_audio(
-            media_url=video.media_url,
-            audio_file_path=video.background_music,
-            target_file_name=video.get_file_name_by_state(),
-        )
         assert (
             video.background_music is not None
         ), "Background music was not generated properly"
 
-        return video
+        return FusedStep(audio_file_path=video.background_music)
@@ -13,9 +13,16 @@
 # limitations under the License.
 # ==============================================================================
 
+import os
+
 from loguru import logger
 
 from vikit.common.file_tools import download_or_copy_file
+from vikit.common.generated_media_cache import (
+    GENERATION_CACHE_KEY,
+    GeneratedMediaCache,
+    get_generated_media_cache,
+)
 from vikit.common.handler import Handler
 
 
@@ -26,6 +33,26 @@ class VideoInterpolationHandler(Handler):
         logger.info(
             f"About to interpolate video: id: {video.id}, media: {video.media_url[:50]}"
         )
+        cache = get_generated_media_cache()
+        if cache:
+            interpolation_request = self._get_interpolation_request(video)
+            cache_key = GeneratedMediaCache.make_key(**interpolation_request)
+            video.metadata[GENERATION_CACHE_KEY] = cache_key
+            # The cached media is checked out under the name of the interpolated video,
+            # not over the video being interpolated
+            was_interpolated = video.metadata.is_interpolated
+            video.metadata.is_interpolated = True
+            cached_media = cache.get(
+                cache_key, target_path=video.get_file_name_by_state(video.build_settings)
+            )
+            if cached_media:
+                logger.info(
+                    f"Reusing cached interpolated video for video {video.id}: {cached_media}"
+                )
+                video.media_url = cached_media
+                return video
+            video.metadata.is_interpolated = was_interpolated
+
         interpolated_video = (
             await video.build_settings.get_ml_models_gateway().interpolate_async(
                 video.media_url
@@ -42,4 +69,37 @@ class VideoInterpolationHandler(Handler):
         video.media_url = interpolated_video_path
         assert video.media_url, "Interpolated video was not downloaded properly"
 
+        if cache:
+            try:
+                # The interpolated video is already local, the build keeps using it
+                await cache.put(
+                    cache_key,
+                    video.media_url,
+                    metadata=interpolation_request,
+                    target_path=video.media_url,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Could not cache the interpolated video for {video.id}: {e}"
+                )
+
         return video
+
+    def _get_interpolation_request(self, video) -> dict:
+        """
+        Get the parameters that fully define the interpolation request, used as a cache key.
+        We chain on the key of the generation that produced the source video when we know it,
+        else on the source video content
+        """
+        source = video.metadata.custom_metadata.get(GENERATION_CACHE_KEY)
+        if not source:
+            source = (
+                GeneratedMediaCache.hash_file(video.media_url)
+                if os.path.isfile(video.media_url)
+                else video.media_url
+            )
+        return {
+            "operation": "interpolate",
+            "gateway": type(video.build_settings.get_ml_models_gateway()).__name__,
+            "source": source,
+        }
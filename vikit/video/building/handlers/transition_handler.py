@@ -13,9 +13,16 @@
 # limitations under the License.
 # ==============================================================================
 
+import asyncio
+
 from loguru import logger
 
-from vikit.common.file_tools import url_exists
+from vikit.common.file_tools import url_exists_async
+from vikit.common.generated_media_cache import (
+    GENERATION_CACHE_KEY,
+    GeneratedMediaCache,
+    get_generated_media_cache,
+)
 from vikit.common.handler import Handler
 from vikit.video.video import Video
 
@@ -44,17 +51,46 @@ class VideoBuildingHandlerTransition(Handler):
         assert (
             video.target_video.media_url
         ), f"target video must be generated, {video.target_video.media_url}, id: {video.target_video.id}"
-        assert url_exists(video.source_video.media_url), "source_video must exist"
-        assert url_exists(video.target_video.media_url), "target_video must exist"
+        source_video_exists, target_video_exists = await asyncio.gather(
+            url_exists_async(video.source_video.media_url),
+            url_exists_async(video.target_video.media_url),
+        )
+        assert source_video_exists, "source_video must exist"
+        assert target_video_exists, "target_video must exist"
 
         logger.debug(
             f"Applying transition from {video.source_video.media_url} to {video.target_video.media_url}"
         )
         ml_gw = video.build_settings.get_ml_models_gateway()
+        source_image_path = await video.source_video.get_last_frame_as_image()
+        target_image_path = await video.target_video.get_first_frame_as_image()
+
+        cache = get_generated_media_cache()
+        if cache:
+            transition_request = {
+                "operation": "generate_seine_transition",
+                "gateway": type(ml_gw).__name__,
+                "source_image": GeneratedMediaCache.hash_file(source_image_path),
+                "target_image": GeneratedMediaCache.hash_file(target_image_path),
+            }
+            cache_key = GeneratedMediaCache.make_key(**transition_request)
+            video.metadata[GENERATION_CACHE_KEY] = cache_key
+            cached_media = cache.get(
+                cache_key, target_path=video.get_file_name_by_state(video.build_settings)
+            )
+            if cached_media:
+                logger.info(
+                    f"Reusing cached transition for video {video.id}: {cached_media}"
+                )
+                video.media_url = cached_media
+                video.metadata.is_video_built = True
+                video.metadata.title = video.get_title()
+                return video
+
         # We generate a transition
         link_to_transition_video = await ml_gw.generate_seine_transition_async(
-            source_image_path=await video.source_video.get_last_frame_as_image(),
-            target_image_path=await video.target_video.get_first_frame_as_image(),
+            source_image_path=source_image_path,
+            target_image_path=target_image_path,
         )
 
         if link_to_transition_video is None:
@@ -63,6 +99,18 @@ class VideoBuildingHandlerTransition(Handler):
         video.metadata.is_video_built = True
         video.metadata.title = video.get_title()
 
+        if cache:
+            try:
+                # The build goes on with the downloaded media, so it is downloaded once
+                video.media_url = await cache.put(
+                    cache_key,
+                    video.media_url,
+                    metadata=transition_request,
+                    target_path=video.get_file_name_by_state(video.build_settings),
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache the transition for {video.id}: {e}")
+
         # target_file_name = video.get_file_name_by_state(
         #     build_settings=video.build_settings
         # )
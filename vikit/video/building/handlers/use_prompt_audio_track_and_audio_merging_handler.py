@@ -16,6 +16,7 @@
 from loguru import logger
 
 from vikit.common.handler import Handler
+from vikit.video.building.handlers.fused_post_build_handler import FusedStep
 from vikit.prompt.recorded_prompt import RecordedPrompt
 from vikit.wrappers.ffmpeg_wrapper import merge_audio
 
@@ -32,6 +33,26 @@ class UsePromptAudioTrackAndAudioMergingHandler(Handler):
         Returns:
             The video including generated music
         """
+        step = await self.prepare_fused_step_async(video)
+
+        video.media_url = await merge_audio(
+            media_url=video.media_url,
+            audio_file_path=step.audio_file_path,
+            target_file_name=video.get_file_name_by_state(),
+        )
+
+        return video
+
+    async def prepare_fused_step_async(self, video: "Video"):
+        """
+        Describe the prompt audio track merging so it can be fused with other post build handlers
+
+        Args:
+            video (Video): The video to process
+
+        Returns:
+            FusedStep: The audio merging step
+        """
         logger.info(
             f"about to use recording audio track for video: {video.id}, video url : {video.media_url}"
         )
@@ -43,10 +64,4 @@ class UsePromptAudioTrackAndAudioMergingHandler(Handler):
         video.metadata.is_subtitle_audio_applied = True
         video.background_music = audio_file_path
 
-        video.media_url = await merge_audio(
-            media_url=video.media_url,
-            audio_file_path=audio_file_path,
-            target_file_name=video.get_file_name_by_state(),
-        )
-
-        return video
+        return FusedStep(audio_file_path=audio_file_path)
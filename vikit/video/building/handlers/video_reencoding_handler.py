@@ -16,6 +16,7 @@
 from loguru import logger
 
 from vikit.common.handler import Handler
+from vikit.video.building.handlers.fused_post_build_handler import FusedStep
 from vikit.wrappers.ffmpeg_wrapper import reencode_video
 
 
@@ -61,3 +62,21 @@ class VideoReencodingHandler(Handler):
             )
 
         return video
+
+    async def prepare_fused_step_async(self, video):
+        """
+        Describe the reencoding so it can be fused with the next post build handlers
+
+        Args:
+            video (Video): The video to process
+
+        Returns:
+            FusedStep: The reencoding step
+        """
+        if not video.media_url:
+            raise ValueError(f"Video {video.id} has no media url")
+        if not video._needs_video_reencoding:
+            return FusedStep()
+
+        video.metadata.is_reencoded = True
+        return FusedStep(reencode=True)
@@ -14,13 +14,15 @@
 # ==============================================================================
 
 from loguru import logger
-import time
 
 from vikit.common.handler import Handler
 from vikit.video.video import Video
 from vikit.common.config import get_media_polling_interval
-from vikit.common.file_tools import (
-    url_exists,
+from vikit.common.file_tools import url_exists_async, wait_for_url_async
+from vikit.common.generated_media_cache import (
+    GENERATION_CACHE_KEY,
+    GeneratedMediaCache,
+    get_generated_media_cache,
 )
 from vikit.prompt.prompt import Prompt
 from vikit.prompt.image_prompt import ImagePrompt
@@ -52,31 +54,78 @@ class VideoGenHandler(Handler):
             f"Target Model provider in the handler: {video.build_settings.target_model_provider}"
         )
         prompt_image = None
-        if isinstance(self.video_gen_prompt, ImagePrompt): 
-            prompt_image = self.video_gen_prompt.image
+        if isinstance(self.video_gen_prompt, ImagePrompt):
+            # The gateways get the prompt itself, so the image is encoded once and reused
+            prompt_image = self.video_gen_prompt
 
-        video.media_url = (
-            await (  # Should give a link on a web storage
-                video.build_settings.get_ml_models_gateway().generate_video_async(
-                    prompt_text=self.video_gen_prompt.text,
-                    model_provider=video.build_settings.target_model_provider,
-                    prompt_image = prompt_image, 
-                    aspect_ratio=video.build_settings.aspect_ratio,
-                )
+        cache = get_generated_media_cache()
+        if cache:
+            generation_request = self._get_generation_request(video, prompt_image)
+            cache_key = GeneratedMediaCache.make_key(**generation_request)
+            video.metadata[GENERATION_CACHE_KEY] = cache_key
+            cached_media = cache.get(
+                cache_key, target_path=video.get_file_name_by_state(video.build_settings)
             )
-        )
+            if cached_media:
+                logger.info(f"Reusing cached video for video {video.id}: {cached_media}")
+                video.media_url = cached_media
+                return video
 
-        if not url_exists(video.media_url):
+        # The generation is submitted as a job and awaited from the shared polling loop, so long
+        # renders do not hold a connection open when the gateway exposes a job API. Videos
+        # generated at the same time from the same request share the job, unless the video
+        # is another sample of its prompt
+        video.media_url = await video.build_settings.get_ml_models_gateway().generate_video_from_job_async(
+            prompt_text=self.video_gen_prompt.text,
+            model_provider=video.build_settings.target_model_provider,
+            prompt_image=prompt_image,
+            aspect_ratio=video.build_settings.aspect_ratio,
+            coalesce=video.build_settings.sample_index == 0,
+        )  # Should give a link on a web storage
+
+        if not await url_exists_async(video.media_url):
             logger.warning(
                 f"Media URL {video.media_url} is not available yet, waiting for it for {get_media_polling_interval()} seconds"
             )
-            time.sleep(get_media_polling_interval())
-            if url_exists(video.media_url):
-                return video.media_url
-            else:
+            if not await wait_for_url_async(
+                video.media_url, timeout=get_media_polling_interval()
+            ):
                 logger.error(
                     f"Media URL {video.media_url} is not available yet, the related video will need to be generated after the overall video generation process"
                 )
 
         logger.debug(f"Video generated from prompt: {video.media_url}")
+        if cache:
+            try:
+                # The build goes on with the downloaded media, so it is downloaded once
+                video.media_url = await cache.put(
+                    cache_key,
+                    video.media_url,
+                    metadata=generation_request,
+                    target_path=video.get_file_name_by_state(video.build_settings),
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache the video generated for {video.id}: {e}")
+
         return video
+
+    def _get_generation_request(
+        self, video: Video, prompt_image: ImagePrompt = None
+    ) -> dict:
+        """
+        Get the parameters that fully define the video generation request, used as a cache key
+        """
+        request = {
+            "operation": "generate_video",
+            "gateway": type(video.build_settings.get_ml_models_gateway()).__name__,
+            "prompt_text": self.video_gen_prompt.text,
+            "negative_prompt": getattr(self.video_gen_prompt, "negative_prompt", None),
+            "prompt_image": prompt_image.get_digest() if prompt_image else None,
+            "model_provider": video.build_settings.target_model_provider,
+            "aspect_ratio": list(video.build_settings.aspect_ratio),
+            "interpolate": video.build_settings.interpolate,
+        }
+        if video.build_settings.sample_index:
+            # Keeps the keys of the first samples the same as before sample indexes
+            request["sample_index"] = video.build_settings.sample_index
+        return request
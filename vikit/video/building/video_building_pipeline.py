@@ -18,6 +18,10 @@ from loguru import logger
 from vikit.video.building.handlers.default_bg_music_and_audio_merging_handler import (
     DefaultBGMusicAndAudioMergingHandler,
 )
+from vikit.video.building.handlers.fused_post_build_handler import (
+    FusedPostBuildHandler,
+    is_fusable,
+)
 from vikit.video.building.handlers.gen_read_aloud_prompt_and_audio_merging_handler import (
     ReadAloudPromptAudioMergingHandler,
 )
@@ -41,6 +45,7 @@ class VideoBuildingPipeline:
         - background music based on the build settings (background music)
         - read aloud prompt based on the build settings (read aloud prompt)
 
+        In fused post build mode, these handlers are rendered together by a single ffmpeg command
         """
         handlers = []
 
@@ -58,6 +63,14 @@ class VideoBuildingPipeline:
         )
         handlers.extend(self.get_read_aloud_prompt_handlers(build_settings))
 
+        if (
+            build_settings.fused_post_build
+            and len(handlers) > 1
+            and all(is_fusable(handler) for handler in handlers)
+        ):
+            logger.debug(f"Fusing {len(handlers)} post build handlers")
+            handlers = [FusedPostBuildHandler(handlers)]
+
         return handlers
 
     def get_background_music_handlers(self, build_settings: VideoBuildSettings, video):
@@ -26,13 +26,16 @@ from vikit.video.building.build_order import (
     get_lazy_dependency_chain_build_order,
     is_composite_video,
 )
+from vikit.video.building.edit_decision_list import EditDecisionList
 from vikit.video.video import DEFAULT_VIDEO_TITLE, Video
 from vikit.video.video_build_settings import VideoBuildSettings
 from vikit.video.video_types import VideoType
+from vikit.wrappers.ffmpeg_executor import PRIORITY_HIGH, PRIORITY_NORMAL
 from vikit.wrappers.ffmpeg_wrapper import (
     concatenate_videos,
-    get_media_duration,
-    get_media_fps,
+    get_media_duration_async,
+    get_media_fps_async,
+    render_edit_decision_list,
 )
 
 
@@ -57,6 +60,9 @@ class CompositeVideo(Video, is_composite_video):
 
         self.is_root_video_composite = True  # true until we have a composite video that will add this composite as a child using append
         self.video_list = []
+        # Set by the root composite when this composite can be flattened into its parent
+        self.build_as_edit_decision_list = False
+        self.edit_decision_list = None
 
     def is_composite_video(self):
         return True
@@ -103,6 +109,9 @@ class CompositeVideo(Video, is_composite_video):
                 test_mode=self.build_settings.test_mode,
                 target_model_provider=self.build_settings.target_model_provider,
                 vikit_api_key=self.build_settings.vikit_api_key,
+                fused_post_build=self.build_settings.fused_post_build,
+                flatten_composites=self.build_settings.flatten_composites,
+                ml_models_gateway=self.build_settings.get_ml_models_gateway(),
             )
 
     def append_video(self, video: Video):
@@ -223,42 +232,93 @@ class CompositeVideo(Video, is_composite_video):
                 video_tree=self.video_list,
                 build_settings=build_settings,
                 already_added=set(),
+                video_build_order=[],
             )
-            no_dependency_videos = [
-                v for v in ordered_video_list if not v.video_dependencies
-            ]
-            video_generator = LocalEngine(self.get_children_build_settings())
-            await asyncio.gather(
-                *(video_generator.generate(v) for v in no_dependency_videos)
-            )
-            with_dependency_videos = [
-                v for v in ordered_video_list if v.video_dependencies
-            ]
-            # Repeat the process until all videos are processed.
-            while with_dependency_videos:
-                tasks = []
-                for video in with_dependency_videos[:]:
-                    dependencies_processed = all(
-                        dep._is_video_built for dep in video.video_dependencies
-                    )
-                    if dependencies_processed:
-                        tasks.append(video_generator.generate(video))
-                        with_dependency_videos.remove(video)
-
-                if tasks:
-                    await asyncio.gather(*tasks)
-                else:
-                    raise Exception("Some dependencies could not be processed.")
+            if build_settings.flatten_composites:
+                self._mark_composites_to_flatten(ordered_video_list)
+            await LocalEngine(
+                self.get_children_build_settings()
+            ).generate_dependency_graph_async(ordered_video_list)
 
         # at this stage we should have all the videos generated. Will be improved in the future
         # in case we are called directly on a child composite without starting by the composite root
-        self.media_url = await self.concatenate()
+        if self.build_as_edit_decision_list and not self.is_root_video_composite:
+            self.edit_decision_list = await self.get_edit_decision_list()
+            logger.debug(
+                f"Composite video {self.id} built as an edit decision list of {len(self.edit_decision_list)} segments"
+            )
+        else:
+            self.media_url = await self.concatenate()
 
         return self
 
+    def _mark_composites_to_flatten(self, ordered_video_list: list[Video]):
+        """
+        Mark the nested composites that can emit an edit decision list instead of media,
+        i.e. the ones that are only needed by their parent composite and that have no
+        post build step of their own (background music, read aloud prompt)
+
+        Args:
+            ordered_video_list: The videos of the tree, in build order
+        """
+        children_build_settings = self.get_children_build_settings()
+        if (
+            children_build_settings.include_read_aloud_prompt
+            or children_build_settings.music_building_context.apply_background_music
+        ):
+            return
+
+        # Videos like transitions need the actual media of the videos they depend on
+        needed_as_media = set()
+        for video in ordered_video_list:
+            if not isinstance(video, CompositeVideo):
+                needed_as_media.update(
+                    dependency.id for dependency in video.video_dependencies
+                )
+
+        for video in ordered_video_list:
+            if (
+                isinstance(video, CompositeVideo)
+                and not video.is_video_built
+                and video.id not in needed_as_media
+            ):
+                video.build_as_edit_decision_list = True
+
+    async def get_edit_decision_list(self) -> EditDecisionList:
+        """
+        Get the edit decision list of this composite: the media of its built children, in order,
+        flattening the edit decision lists of nested composites, with the speed ratio
+        of this composite applied
+
+        The ratio is computed from the duration of the flattened children once their own
+        ratio is applied, as the concatenation of their rendered media would be
+
+        Returns:
+            EditDecisionList: The edit decision list
+        """
+        edit_decision_list = EditDecisionList()
+        for video in self.video_list:
+            if (
+                isinstance(video, CompositeVideo)
+                and video.edit_decision_list is not None
+            ):
+                edit_decision_list.append_edit_decision_list(video.edit_decision_list)
+            else:
+                edit_decision_list.append_media(
+                    media_path=video.media_url,
+                    duration=await get_media_duration_async(video.media_url),
+                )
+
+        ratio = self._get_ratio_to_multiply_animations(
+            build_settings=self.build_settings,
+            duration=edit_decision_list.get_duration(),
+        )
+        return edit_decision_list.with_speed_ratio(ratio)
+
     async def concatenate(self):
         """
-        Concatenate the videos for this composite
+        Concatenate the videos for this composite, rendering the edit decision lists
+        of its flattened children if any
         """
         video_list_file = "_".join(
             [
@@ -267,6 +327,23 @@ class CompositeVideo(Video, is_composite_video):
                 config.get_video_list_file_name(self.composite_video_uuid),
             ]
         )
+        if any(
+            isinstance(video, CompositeVideo) and video.edit_decision_list is not None
+            for video in self.video_list
+        ):
+            # Some children are flattened: resolve the whole tree and encode it once
+            edit_decision_list = await self.get_edit_decision_list()
+            return await render_edit_decision_list(
+                segments=[
+                    (segment.media_path, segment.speed_ratio)
+                    for segment in edit_decision_list.segments
+                ],
+                target_file_name=self.get_file_name_by_state(
+                    build_settings=self.build_settings,
+                ),
+                priority=self._get_ffmpeg_priority(),
+            )
+
         ratio = self._get_ratio_to_multiply_animations(
             build_settings=self.build_settings
         )
@@ -276,10 +353,14 @@ class CompositeVideo(Video, is_composite_video):
         number_files = 0
         max_fps = -1
 
+        # Probe all the children at once rather than one blocking ffprobe after the other
+        videos_fps = await asyncio.gather(
+            *[get_media_fps_async(video.media_url) for video in self.video_list]
+        )
+
         with open(video_list_file, "w") as myfile:
-            for video in self.video_list:
+            for video, video_fps in zip(self.video_list, videos_fps):
                 file_name = video.media_url
-                video_fps = get_media_fps(video.media_url)
                 logger.trace(f"Video fps (composite_video): {video_fps}")
                 sum_files_fps = sum_files_fps + video_fps
                 if max_fps < video_fps:
@@ -299,18 +380,24 @@ class CompositeVideo(Video, is_composite_video):
             ratioToMultiplyAnimations=ratio,
             fps=sum_files_fps / number_files,
             max_fps=max_fps,
+            priority=self._get_ffmpeg_priority(),
         )  # keeping one consistent file name
 
-    def _get_ratio_to_multiply_animations(self, build_settings: VideoBuildSettings):
+    def _get_ffmpeg_priority(self):
+        # The final encode of the root composite goes first, as the whole build is waiting for it
+        return PRIORITY_HIGH if self.is_root_video_composite else PRIORITY_NORMAL
+
+    def _get_ratio_to_multiply_animations(
+        self, build_settings: VideoBuildSettings, duration: float = None
+    ):
         # Now we box the video composing this composite into the expected length, typically the one of a prompt
+        duration = duration if duration is not None else self.get_duration()
         if build_settings.expected_length is None:
             if build_settings.prompt is not None:
                 logger.debug(
-                    f"parameters video_composite.get_duration() build_settings.prompt : {self.get_duration()}, {build_settings.prompt}"
-                )
-                ratioToMultiplyAnimations = (
-                    self.get_duration() / build_settings.prompt.duration
+                    f"parameters video_composite.get_duration() build_settings.prompt : {duration}, {build_settings.prompt}"
                 )
+                ratioToMultiplyAnimations = duration / build_settings.prompt.duration
             else:
                 ratioToMultiplyAnimations = 1
         else:
@@ -318,13 +405,15 @@ class CompositeVideo(Video, is_composite_video):
                 raise ValueError(
                     f"Expected length should be greater than 0. Got {build_settings.expected_length}"
                 )
-            ratioToMultiplyAnimations = (
-                self.get_duration() / build_settings.expected_length
-            )
+            ratioToMultiplyAnimations = duration / build_settings.expected_length
 
         return ratioToMultiplyAnimations
 
     async def run_post_build_actions_hook(self, build_settings: VideoBuildSettings):
+        if self.edit_decision_list is not None:
+            self.metadata.duration = self.edit_decision_list.get_duration()
+            return
+
         if not build_settings.target_file_name:
             if self.is_root_video_composite:
                 name, extension = os.path.splitext(os.path.basename(self.media_url))
@@ -336,7 +425,7 @@ class CompositeVideo(Video, is_composite_video):
                 logger.info(
                     f"Your final video name is : {build_settings.target_file_name}"
                 )
-        self.metadata.duration = get_media_duration(self.media_url)
+        self.metadata.duration = await get_media_duration_async(self.media_url)
 
     def generate_background_music_prompt(self):
         """
@@ -14,7 +14,6 @@
 # ==============================================================================
 
 import os
-import re
 
 import pysrt
 from loguru import logger
@@ -91,12 +90,24 @@ class PromptBasedVideo(CompositeVideo):
             )
             build_settings.prompt = self._prompt
 
-        for sub in self._prompt.subtitles:
+        # The prompts of all the subtitles are enhanced as a single batch, instead of
+        # one subtitle after the other
+        enhanced_prompt_texts = await self._get_enhanced_prompt_texts(
+            [sub.text for sub in self._prompt.subtitles], build_stgs=build_settings
+        )
+
+        for sub, enhanced_prompt_text in zip(
+            self._prompt.subtitles, enhanced_prompt_texts
+        ):
             vid_cp_sub = CompositeVideo()
             (
                 keyword_based_vid,
                 prompt_based_vid,
-            ) = await self._prepare_basic_building_block(sub, build_stgs=build_settings)
+            ) = await self._prepare_basic_building_block(
+                sub,
+                build_stgs=build_settings,
+                enhanced_prompt_text=enhanced_prompt_text,
+            )
 
             vid_cp_sub.append_video(keyword_based_vid).append_video(
                 prompt_based_vid
@@ -106,8 +117,36 @@ class PromptBasedVideo(CompositeVideo):
 
         return self
 
+    async def _get_enhanced_prompt_texts(
+        self, texts: list[str], build_stgs: VideoBuildSettings
+    ) -> list[str]:
+        """
+        Enhance the subtitle texts with the LLM, as a batch
+
+        Params:
+            - texts: the subtitle texts
+            - build_stgs: the VideoBuildSettings
+
+        Returns:
+            - the enhanced prompt texts, in the order of the subtitles
+        """
+        prompt_build_settings = PromptBuildSettings(
+            test_mode=build_stgs.test_mode,
+            ml_models_gateway=build_stgs.get_ml_models_gateway(),
+            generate_from_llm_keyword=False,
+            generate_from_llm_prompt=True,
+        )
+        return await PromptFactory(
+            prompt_build_settings=prompt_build_settings
+        ).get_reengineered_prompt_texts_from_raw_texts(
+            prompts=texts, prompt_build_settings=prompt_build_settings
+        )
+
     async def _prepare_basic_building_block(
-        self, sub: pysrt.SubRipItem, build_stgs: VideoBuildSettings = None
+        self,
+        sub: pysrt.SubRipItem,
+        build_stgs: VideoBuildSettings = None,
+        enhanced_prompt_text: str = None,
     ):
         """
         build the basic building block of the full video/
@@ -120,53 +159,37 @@ class PromptBasedVideo(CompositeVideo):
         Params:
             - sub_text: the subtitle text
             - build_stgs: the VideoBuildSettings
+            - enhanced_prompt_text: the subtitle text already enhanced by the LLM, if any
 
         Returns:
             - keyword_based_vid: the video generated from the keyword
             - prompt_based_vid: the video generated from the prompt
         """
-
-        prompt_fact = PromptFactory(
-            prompt_build_settings=PromptBuildSettings(test_mode=build_stgs.test_mode)
-        )
-        enhanced_prompt_from_keywords = (
-            await prompt_fact.get_reengineered_prompt_text_from_raw_text(
-                prompt=sub.text,
-                prompt_build_settings=PromptBuildSettings(
-                    test_mode=build_stgs.test_mode,
-                    generate_from_llm_keyword=True,
-                    generate_from_llm_prompt=False,
-                ),
+        if enhanced_prompt_text is None:
+            (enhanced_prompt_text,) = await self._get_enhanced_prompt_texts(
+                [sub.text], build_stgs=build_stgs
             )
-        )
 
-        enhanced_prompt_from_prompt_text = (
-            await prompt_fact.get_reengineered_prompt_text_from_raw_text(
-                prompt=sub.text,
-                prompt_build_settings=PromptBuildSettings(
-                    test_mode=build_stgs.test_mode,
-                    generate_from_llm_keyword=False,
-                    generate_from_llm_prompt=True,
-                ),
-            )
-        )
-        
-        prompt_based_vid = await RawTextBasedVideo(enhanced_prompt_from_prompt_text).prepare_build(
+        prompt_based_vid = await RawTextBasedVideo(enhanced_prompt_text).prepare_build(
             build_settings=VideoBuildSettings(
-                prompt=enhanced_prompt_from_prompt_text,
+                prompt=enhanced_prompt_text,
                 test_mode=build_stgs.test_mode,
                 target_model_provider=build_stgs.target_model_provider,
                 interpolate=build_stgs.interpolate,
+                ml_models_gateway=build_stgs.get_ml_models_gateway(),
             )
         )
 
         
-        prompt_based_vid2 = await RawTextBasedVideo(enhanced_prompt_from_prompt_text).prepare_build(
+        # A second sample of the same prompt, not the same clip twice
+        prompt_based_vid2 = await RawTextBasedVideo(enhanced_prompt_text).prepare_build(
             build_settings=VideoBuildSettings(
-                prompt=enhanced_prompt_from_prompt_text,
+                prompt=enhanced_prompt_text,
                 test_mode=build_stgs.test_mode,
                 target_model_provider=build_stgs.target_model_provider,
                 interpolate=build_stgs.interpolate,
+                sample_index=1,
+                ml_models_gateway=build_stgs.get_ml_models_gateway(),
             )
         )
         assert prompt_based_vid is not None, "prompt_based_vid cannot be None"
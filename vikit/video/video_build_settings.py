@@ -14,6 +14,7 @@
 # ==============================================================================
 
 from vikit.common import GeneralBuildSettings
+from vikit.gateways.ML_models_gateway import MLModelsGateway
 from vikit.music_building_context import MusicBuildingContext
 from vikit.prompt.prompt import Prompt
 
@@ -34,6 +35,10 @@ class VideoBuildSettings(GeneralBuildSettings.GeneralBuildSettings):
         output_video_file_name: str = None,
         vikit_api_key: str = None,
         aspect_ratio:tuple = (16,9),
+        fused_post_build: bool = False,
+        flatten_composites: bool = False,
+        sample_index: int = 0,
+        ml_models_gateway: MLModelsGateway = None,
     ):
         """
         VideoBuildSettings class constructor
@@ -54,6 +59,14 @@ class VideoBuildSettings(GeneralBuildSettings.GeneralBuildSettings):
             cascade_build_settings: bool : Whether to cascade the build settings to the sub videos
             target_path: str : The target path to save the video
             output_video_file_name: str : The output video file name (one is generated for you by default)
+            fused_post_build: bool : Whether to run the post build steps (reencoding, background music, read aloud prompt)
+            as a single ffmpeg command, encoding the video once instead of once per step
+            flatten_composites: bool : Whether nested composites only emit an edit decision list, so the whole video tree
+            is encoded once by the root composite. As when concatenating, only the video is sped up, not the audio
+            sample_index: int : The sample of its prompt the video is: videos of the same prompt with distinct sample indexes
+            get distinct clips, never shared in flight or through the generated media cache
+            ml_models_gateway: MLModelsGateway : The ML models gateway to use, one is created from test_mode
+            and vikit_api_key by default
         """
 
         super().__init__(
@@ -70,4 +83,8 @@ class VideoBuildSettings(GeneralBuildSettings.GeneralBuildSettings):
         self.interpolate = interpolate
         self.target_model_provider = target_model_provider
         self.cascade_build_settings = cascade_build_settings
-        self.vikit_api_key = vikit_api_key
\ No newline at end of file
+        self.vikit_api_key = vikit_api_key
+        self.fused_post_build = fused_post_build
+        self.flatten_composites = flatten_composites
+        self.sample_index = sample_index
+        self._ml_models_gateway = ml_models_gateway
\ No newline at end of file
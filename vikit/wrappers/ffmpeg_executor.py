@@ -0,0 +1,303 @@
+# Copyright 2024 Vikit.ai. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+from loguru import logger
+
+import vikit.common.config as config
+from vikit.common.instrumentation import CATEGORY_FFMPEG, get_file_size, get_tracer
+
+# Jobs with a lower priority value are started first
+PRIORITY_HIGH = 0  # typically the final encode of a root composite
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+CPUS_PER_JOB = 4  # used to infer the number of concurrent jobs from the number of CPUs
+
+
+class FFmpegExecutor:
+    """
+    Process wide executor for ffmpeg and ffprobe commands.
+
+    It bounds the number of ffmpeg processes running at the same time, shares the CPUs
+    between them through the -threads option, starts the waiting jobs by priority
+    and keeps track of queueing and latency metrics.
+    """
+
+    def __init__(self, max_concurrent_jobs: int = None, threads_per_job: int = None):
+        """
+        Initialize the executor
+
+        Args:
+            max_concurrent_jobs (int): The maximum number of ffmpeg processes running at the same time,
+            inferred from the configuration or the number of CPUs if not provided
+            threads_per_job (int): The number of threads of each ffmpeg process, inferred from the
+            configuration or shared evenly between jobs if not provided
+        """
+        cpu_count = os.cpu_count() or 1
+        self.max_concurrent_jobs = (
+            max_concurrent_jobs
+            or config.get_ffmpeg_max_concurrent_jobs()
+            or max(1, cpu_count // CPUS_PER_JOB)
+        )
+        self.threads_per_job = (
+            threads_per_job
+            or config.get_ffmpeg_threads_per_job()
+            or max(1, cpu_count // self.max_concurrent_jobs)
+        )
+        self._running_jobs = 0
+        self._waiters = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        """
+        Reset the queueing and latency metrics
+        """
+        self._metrics = {
+            "jobs_submitted": 0,
+            "jobs_completed": 0,
+            "jobs_failed": 0,
+            "max_queue_depth": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "total_run_time": 0.0,
+            "max_run_time": 0.0,
+        }
+
+    def get_metrics(self) -> dict:
+        """
+        Get the queueing and latency metrics of the executor
+
+        Returns:
+            dict: The number of submitted, completed and failed jobs, the current and maximum
+            queue depth, the total, average and maximum wait and run times in seconds
+        """
+        metrics = dict(self._metrics)
+        finished_jobs = metrics["jobs_completed"] + metrics["jobs_failed"]
+        metrics["queue_depth"] = self.queue_depth
+        metrics["running_jobs"] = self._running_jobs
+        metrics["average_wait_time"] = (
+            metrics["total_wait_time"] / finished_jobs if finished_jobs else 0.0
+        )
+        metrics["average_run_time"] = (
+            metrics["total_run_time"] / finished_jobs if finished_jobs else 0.0
+        )
+        return metrics
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of jobs waiting for a slot
+        """
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def run(
+        self,
+        command: list,
+        priority: int = PRIORITY_NORMAL,
+        bounded: bool = True,
+        check: bool = True,
+        input_chunks=None,
+    ):
+        """
+        Run an ffmpeg or ffprobe command once a slot is available
+
+        Args:
+            command (list): The command and its arguments, the output file being the last argument of ffmpeg commands
+            priority (int): The priority of the job, lower values are started first
+            bounded (bool): Whether the job needs a slot, light commands like ffprobe may run right away
+            check (bool): Whether to raise an exception if the command fails
+            input_chunks: An async iterable of bytes written to the standard input of the command
+            as they come, for commands reading from pipe:0
+
+        Returns:
+            tuple: The return code, stdout and stderr of the command
+        """
+        command = self._allocate_threads(list(command)) if bounded else list(command)
+        with get_tracer().span(
+            command[0],
+            CATEGORY_FFMPEG,
+            priority=priority,
+            bytes_in=sum(
+                get_file_size(argument) or 0
+                for option, argument in zip(command, command[1:])
+                if option == "-i"
+            ),
+        ) as span:
+            result = await self._run(
+                command, priority, bounded, check, span, input_chunks
+            )
+            if command[0] == "ffmpeg":
+                span.set_attribute("bytes_out", get_file_size(command[-1]))
+        return result
+
+    async def _run(
+        self,
+        command: list,
+        priority: int,
+        bounded: bool,
+        check: bool,
+        span,
+        input_chunks=None,
+    ):
+        self._metrics["jobs_submitted"] += 1
+
+        submitted_at = time.perf_counter()
+        if bounded:
+            await self._acquire(priority)
+        started_at = time.perf_counter()
+        self._record("wait_time", started_at - submitted_at)
+        span.set_attribute("wait_time", started_at - submitted_at)
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE if input_chunks is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            if input_chunks is not None:
+                stdout, stderr = await _communicate_chunks(process, input_chunks)
+            else:
+                stdout, stderr = await _communicate(process)
+        except BaseException:
+            self._metrics["jobs_failed"] += 1
+            raise
+        finally:
+            if bounded:
+                self._release()
+            self._record("run_time", time.perf_counter() - started_at)
+
+        if process.returncode != 0:
+            self._metrics["jobs_failed"] += 1
+            if check:
+                error_message = get_error_message(command[0], stdout, stderr)
+                logger.error(error_message)
+                raise Exception(error_message)
+        else:
+            self._metrics["jobs_completed"] += 1
+
+        return process.returncode, stdout, stderr
+
+    def _allocate_threads(self, command: list):
+        # -threads is an output option, so it goes right before the output file
+        if command[0] != "ffmpeg" or "-threads" in command:
+            return command
+        return command[:-1] + ["-threads", str(self.threads_per_job), command[-1]]
+
+    async def _acquire(self, priority: int):
+        if self._running_jobs < self.max_concurrent_jobs and not self.queue_depth:
+            self._running_jobs += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._metrics["max_queue_depth"] = max(
+            self._metrics["max_queue_depth"], self.queue_depth
+        )
+        logger.trace(
+            f"ffmpeg job waiting for a slot, {self._running_jobs} running, {self.queue_depth} waiting"
+        )
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over to us right before the cancellation
+                self._release()
+            raise
+
+    def _release(self):
+        # The slot is handed over to the next waiting job, if any
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_result(None)
+                return
+        self._running_jobs -= 1
+
+    def _record(self, name: str, duration: float):
+        self._metrics[f"total_{name}"] += duration
+        self._metrics[f"max_{name}"] = max(self._metrics[f"max_{name}"], duration)
+
+
+def get_error_message(program: str, stdout: bytes, stderr: bytes) -> str:
+    """
+    Get the error message of a failed command out of its outputs
+    """
+    error_messages = []
+    if stdout:
+        error_messages.append(f"stdout: {stdout.decode()}")
+    if stderr:
+        error_messages.append(f"stderr: {stderr.decode()}")
+
+    if error_messages:
+        return f"{program} command failed with: " + " and ".join(error_messages)
+    else:
+        return f"{program} command failed without error output"
+
+
+async def _communicate(process):
+    # A cancelled job must not leave its process running once its slot is released
+    try:
+        return await process.communicate()
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        raise
+
+
+async def _communicate_chunks(process, input_chunks):
+    # Feed the chunks while reading the outputs, so none of the pipes fills up
+    async def feed():
+        try:
+            async for chunk in input_chunks:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the process exited early, its return code tells why
+        finally:
+            process.stdin.close()
+
+    try:
+        stdout, stderr, _ = await asyncio.gather(
+            process.stdout.read(), process.stderr.read(), feed()
+        )
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        raise
+    await process.wait()
+    return stdout, stderr
+
+
+_ffmpeg_executor = None
+
+
+def get_ffmpeg_executor() -> FFmpegExecutor:
+    """
+    Get the process wide ffmpeg executor, as configured
+    """
+    global _ffmpeg_executor
+    if _ffmpeg_executor is None:
+        _ffmpeg_executor = FFmpegExecutor()
+    return _ffmpeg_executor
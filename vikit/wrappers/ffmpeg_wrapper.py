@@ -17,12 +17,179 @@ import asyncio
 import json
 import os
 import subprocess
+from collections import OrderedDict
 
 from loguru import logger
 
 import vikit.common.config as config
 from vikit.common.decorators import log_function_params
 from vikit.common.file_tools import get_canonical_name
+from vikit.wrappers.ffmpeg_executor import PRIORITY_NORMAL, get_ffmpeg_executor
+
+
+MEDIA_PROBE_CACHE_MAX_ENTRIES = 1024
+
+# Probed media metadata, keyed on the absolute path and checked against (mtime, size)
+_media_probe_cache: OrderedDict = OrderedDict()
+
+
+def _get_ffprobe_command(media_path: str):
+    return [
+        "ffprobe",
+        "-v",
+        "quiet",
+        "-print_format",
+        "json",
+        "-show_streams",
+        "-show_format",
+        media_path,
+    ]
+
+
+def _get_file_signature(media_path: str):
+    """
+    Get the signature of a local file used to validate its cached probe, None for remote media
+    """
+    try:
+        stat = os.stat(media_path)
+    except (OSError, ValueError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def clear_media_probe_cache():
+    """
+    Forget the cached media probes, e.g. to measure cold runs
+    """
+    _media_probe_cache.clear()
+
+
+def _get_cached_probe(media_path: str, signature):
+    if signature is None:
+        return None
+    cached = _media_probe_cache.get(os.path.abspath(media_path))
+    if cached is None:
+        return None
+    cached_signature, probe = cached
+    if cached_signature != signature:
+        # The file changed since it was probed
+        del _media_probe_cache[os.path.abspath(media_path)]
+        return None
+    _media_probe_cache.move_to_end(os.path.abspath(media_path))
+    return probe
+
+
+def _cache_probe(media_path: str, signature, probe: dict):
+    if signature is None:
+        return
+    _media_probe_cache[os.path.abspath(media_path)] = (signature, probe)
+    _media_probe_cache.move_to_end(os.path.abspath(media_path))
+    while len(_media_probe_cache) > MEDIA_PROBE_CACHE_MAX_ENTRIES:
+        _media_probe_cache.popitem(last=False)
+
+
+def _parse_frame_rate(frame_rate: str):
+    if not frame_rate:
+        return None
+    numerator, _, denominator = frame_rate.partition("/")
+    if not denominator:
+        return float(numerator)
+    if float(denominator) == 0:
+        return None
+    return float(numerator) / float(denominator)
+
+
+def _parse_probe_output(probe_output) -> dict:
+    """
+    Turn the json output of ffprobe into the media metadata we use
+    """
+    probe = json.loads(probe_output)
+    streams = probe.get("streams", [])
+    media_format = probe.get("format", {})
+    video_stream = next(
+        (stream for stream in streams if stream.get("codec_type") == "video"), None
+    )
+    audio_stream = next(
+        (stream for stream in streams if stream.get("codec_type") == "audio"), None
+    )
+    duration = media_format.get("duration")
+
+    return {
+        "streams": streams,
+        "format": media_format,
+        "duration": float(duration) if duration is not None else None,
+        "fps": (
+            _parse_frame_rate(video_stream.get("r_frame_rate"))
+            if video_stream
+            else None
+        ),
+        "video_codec": video_stream.get("codec_name") if video_stream else None,
+        "audio_codec": audio_stream.get("codec_name") if audio_stream else None,
+        "width": video_stream.get("width") if video_stream else None,
+        "height": video_stream.get("height") if video_stream else None,
+        "pix_fmt": video_stream.get("pix_fmt") if video_stream else None,
+        "has_audio": audio_stream is not None,
+    }
+
+
+def probe_media(media_path: str) -> dict:
+    """
+    Get the metadata of a media with a single ffprobe call.
+
+    Results are cached in process and invalidated when the file changes, so
+    the same media can be probed many times during a build for free
+
+    Args:
+        media_path (str): The path to the media file
+
+    Returns:
+        dict: The streams and format reported by ffprobe, plus the duration, fps,
+        video_codec, audio_codec, width, height, pix_fmt and has_audio shortcuts
+    """
+    signature = _get_file_signature(media_path)
+    probe = _get_cached_probe(media_path, signature)
+    if probe is not None:
+        return probe
+
+    result = subprocess.run(
+        _get_ffprobe_command(media_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        logger.error(f"ffprobe failed on {media_path}: {result.stderr}")
+    result.check_returncode()
+
+    probe = _parse_probe_output(result.stdout)
+    _cache_probe(media_path, signature, probe)
+    return probe
+
+
+async def probe_media_async(media_path: str) -> dict:
+    """
+    Get the metadata of a media with a single ffprobe call, without blocking the event loop.
+
+    Shares its cache with probe_media
+
+    Args:
+        media_path (str): The path to the media file
+
+    Returns:
+        dict: The media metadata, see probe_media
+    """
+    signature = _get_file_signature(media_path)
+    probe = _get_cached_probe(media_path, signature)
+    if probe is not None:
+        return probe
+
+    # Probing is light, it does not need to wait for an encoding slot
+    _, stdout, _ = await get_ffmpeg_executor().run(
+        _get_ffprobe_command(media_path), bounded=False
+    )
+
+    probe = _parse_probe_output(stdout)
+    _cache_probe(media_path, signature, probe)
+    return probe
 
 
 @log_function_params
@@ -37,24 +204,20 @@ def has_audio_track(video_path):
         bool: True if the video has an audio track, False otherwise
 
     """
+    return probe_media(video_path)["has_audio"]
 
-    command = [
-        "ffprobe",
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_streams",
-        video_path,
-    ]
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    logger.debug(f"Subprocess run stdout for has_audio_track :  {result.stdout}")
-    logger.debug(f"Subprocess run stderr for has_audio_track :  {result.stderr}")
 
-    result.check_returncode()
+async def has_audio_track_async(video_path):
+    """
+    Check if the video has an audio track, without blocking the event loop
 
-    streams = json.loads(result.stdout)["streams"]
-    return any(stream["codec_type"] == "audio" for stream in streams)
+    Args:
+        video_path (str): The path to the video file
+
+    Returns:
+        bool: True if the video has an audio track, False otherwise
+    """
+    return (await probe_media_async(video_path))["has_audio"]
 
 
 def get_media_duration(input_video_path):
@@ -68,22 +231,21 @@ def get_media_duration(input_video_path):
         float: The duration of the media file in seconds.
     """
     assert os.path.exists(input_video_path), f"File {input_video_path} does not exist"
-    result = subprocess.run(
-        [
-            "ffprobe",
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            input_video_path,
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-    result.check_returncode()
-    return float(float(result.stdout))
+    return probe_media(input_video_path)["duration"]
+
+
+async def get_media_duration_async(input_video_path):
+    """
+    Get the duration of a media file, without blocking the event loop.
+
+    Args:
+        input_video_path (str): The path to the input video file.
+
+    Returns:
+        float: The duration of the media file in seconds.
+    """
+    assert os.path.exists(input_video_path), f"File {input_video_path} does not exist"
+    return (await probe_media_async(input_video_path))["duration"]
 
 
 def get_media_fps(input_video_path):
@@ -97,28 +259,21 @@ def get_media_fps(input_video_path):
         float: The FPS of the media file in frames per seconds.
     """
     assert os.path.exists(input_video_path), f"File {input_video_path} does not exist"
+    return probe_media(input_video_path)["fps"]
 
-    result = subprocess.run(
-        [
-            "ffprobe",
-            "-v",
-            "0",
-            "-of",
-            "csv=p=0",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "stream=r_frame_rate",
-            input_video_path,
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-    result.check_returncode()
 
-    return float(str(result.stdout).split("/")[0].replace("b'", "")) / float(
-        str(result.stdout).split("/")[1].replace("\\n'", "")
-    )
+async def get_media_fps_async(input_video_path):
+    """
+    Get the frames per second of a media file, without blocking the event loop.
+
+    Args:
+        input_video_path (str): The path to the input video file.
+
+    Returns:
+        float: The FPS of the media file in frames per seconds.
+    """
+    assert os.path.exists(input_video_path), f"File {input_video_path} does not exist"
+    return (await probe_media_async(input_video_path))["fps"]
 
 
 async def extract_audio_slice(
@@ -156,7 +311,7 @@ async def extract_audio_slice(
     else:
         target_file_name = target_file_name
 
-    media_length = get_media_duration(audiofile_path)
+    media_length = await get_media_duration_async(audiofile_path)
     if end is None:
         end = media_length
 
@@ -164,41 +319,132 @@ async def extract_audio_slice(
         raise ValueError("The expected audio length is longer than audio file provided")
 
     # Create sub part of subtitles
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-y",
-        "-ss",
-        str(start),
-        "-t",
-        str(end),
-        "-i",
-        audiofile_path,
-        "-acodec",
-        "copy",
-        target_file_name,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-ss",
+            str(start),
+            "-t",
+            str(end - start),
+            "-i",
+            audiofile_path,
+            "-acodec",
+            "copy",
+            target_file_name,
+        ]
     )
 
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
-            )
-        else:
-            error_message = "ffmpeg command failed without error output"
+    return target_file_name
 
-        logger.error(error_message)
-        raise Exception(error_message)
 
-    return target_file_name
+async def detect_silences_async(
+    audiofile_path: str, noise_level: int = -30, min_silence_duration: float = 0.5
+) -> list[tuple]:
+    """
+    Detect the silences of an audio file using the ffmpeg silencedetect filter
+
+    Args:
+        audiofile_path (str): The path to the audio file
+        noise_level (int): The level under which the sound is considered as silence, in dB
+        min_silence_duration (float): The minimum duration of a silence, in seconds
+
+    Returns:
+        list: The (start, end) of the silences in seconds, in order
+    """
+    _, _, stderr = await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-i",
+            audiofile_path,
+            "-af",
+            f"silencedetect=noise={noise_level}dB:d={min_silence_duration}",
+            "-f",
+            "null",
+            "-",
+        ]
+    )
+
+    silences = []
+    silence_start = None
+    for line in stderr.decode("utf-8", errors="replace").splitlines():
+        if "silence_start:" in line:
+            silence_start = max(0.0, float(line.split("silence_start:")[1].split()[0]))
+        elif "silence_end:" in line and silence_start is not None:
+            silence_end = float(line.split("silence_end:")[1].split()[0])
+            silences.append((silence_start, silence_end))
+            silence_start = None
+
+    if silence_start is not None:  # the file ends with a silence
+        silences.append(
+            (silence_start, await get_media_duration_async(audiofile_path))
+        )
+    return silences
+
+
+async def split_audio_async(
+    audiofile_path: str, cut_times: list = None, target_file_prefix: str = None
+) -> list[tuple]:
+    """
+    Split an audio file into slices in a single ffmpeg pass, the audio being stream copied
+
+    Args:
+        audiofile_path (str): The path to the audio file
+        cut_times (list): The times to cut the audio file at, in seconds
+        target_file_prefix (str): The prefix of the slice file names
+
+    Returns:
+        list: The (path, start, end) of the slices, the start and end in seconds being
+        the exact ones of the slices as cut by ffmpeg on the audio frames
+    """
+    if not cut_times:
+        return [(audiofile_path, 0.0, await get_media_duration_async(audiofile_path))]
+
+    if not target_file_prefix:
+        target_file_prefix = config.get_sub_audio_for_subtitle_prefix()
+    _, extension = os.path.splitext(audiofile_path)
+    segment_list = target_file_prefix + "_slices.csv"
+    logger.debug(f"Splitting audio file {audiofile_path} at {cut_times}")
+
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            audiofile_path,
+            "-map",
+            "0:a",
+            "-c",
+            "copy",
+            "-f",
+            "segment",
+            "-segment_times",
+            ",".join(str(float(cut_time)) for cut_time in cut_times),
+            "-reset_timestamps",
+            "1",
+            "-segment_list",
+            segment_list,
+            "-segment_list_type",
+            "csv",
+            target_file_prefix + "_%03d" + extension,
+        ]
+    )
+
+    # The segment list gives the slice file names, relative to the list, and their times
+    slices = []
+    with open(segment_list, "r") as f:
+        for line in f:
+            if line.strip():
+                file_name, start, end = line.strip().rsplit(",", 2)
+                slices.append(
+                    (
+                        os.path.join(os.path.dirname(segment_list), file_name),
+                        float(start),
+                        float(end),
+                    )
+                )
+    os.remove(segment_list)
+    return slices
 
 
 async def convert_as_mp3_file(fileName, target_file_name: str):
@@ -212,33 +458,191 @@ async def convert_as_mp3_file(fileName, target_file_name: str):
     Returns:
         str: The path to the converted audio file
     """
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-y",
-        "-i",
-        fileName,
-        target_file_name,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            fileName,
+            target_file_name,
+        ]
     )
 
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
+    return target_file_name
+
+
+async def convert_stream_as_mp3_file(chunks, target_file_name: str):
+    """
+    Encode an audio stream, e.g. a download in progress, to an mp3 file, the chunks
+    being piped to ffmpeg as they come so no intermediate file is written
+
+    Args:
+        chunks: An async iterable of the bytes of the audio file
+        target_file_name (str): The path to the mp3 file
+
+    Returns:
+        str: The path to the mp3 file
+    """
+    try:
+        await get_ffmpeg_executor().run(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                "pipe:0",
+                target_file_name,
+            ],
+            input_chunks=chunks,
+        )
+    except BaseException:
+        # Do not leave a truncated audio file behind
+        if os.path.exists(target_file_name):
+            os.remove(target_file_name)
+        raise
+
+    return target_file_name
+
+
+async def concatenate_audio_files(audio_files: list, target_file_name: str):
+    """
+    Concatenate audio files encoded alike, without reencoding them
+
+    Args:
+        audio_files (list): The paths to the audio files, in order
+        target_file_name (str): The path to the concatenated audio file
+
+    Returns:
+        str: The path to the concatenated audio file
+    """
+    concat_file_name = target_file_name + ".concat.txt"
+    with open(concat_file_name, "w") as f:
+        for audio_file in audio_files:
+            f.write(f"file '{os.path.abspath(audio_file)}'\n")
+
+    try:
+        await get_ffmpeg_executor().run(
+            [
+                "ffmpeg",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                concat_file_name,
+                "-c",
+                "copy",
+                target_file_name,
+            ]
+        )
+    finally:
+        os.remove(concat_file_name)
+
+    return target_file_name
+
+
+def _read_concat_list_file(input_file: str):
+    """
+    Get the media paths listed in a concat demuxer list file
+    """
+    list_dir = os.path.dirname(os.path.abspath(input_file))
+    media_paths = []
+    with open(input_file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("file "):
+                continue
+            media_path = line[len("file ") :].strip().strip("'\"")
+            media_paths.append(
+                media_path
+                if os.path.isabs(media_path)
+                else os.path.join(list_dir, media_path)
+            )
+    return media_paths
+
+
+def _get_stream_copy_signature(probe: dict):
+    """
+    Get the stream parameters that must be identical between media concatenated without reencoding
+    """
+    video_stream = next(
+        (stream for stream in probe["streams"] if stream.get("codec_type") == "video"),
+        {},
+    )
+    audio_stream = next(
+        (stream for stream in probe["streams"] if stream.get("codec_type") == "audio"),
+        {},
+    )
+    return (
+        tuple(
+            video_stream.get(name)
+            for name in (
+                "codec_name",
+                "profile",
+                "pix_fmt",
+                "width",
+                "height",
+                "r_frame_rate",
+                "time_base",
             )
-        else:
-            error_message = "ffmpeg command failed without error output"
+        ),
+        tuple(
+            audio_stream.get(name)
+            for name in ("codec_name", "sample_rate", "channels", "time_base")
+        ),
+    )
+
+
+async def can_concatenate_with_stream_copy(media_paths: list):
+    """
+    Check if media can be concatenated without reencoding, i.e. they all have the same
+    codecs, profile, pixel format, resolution, frame rate and audio parameters
+
+    Args:
+        media_paths (list): The paths to the media to concatenate
+
+    Returns:
+        bool: True if the media can be concatenated with stream copy
+    """
+    if not media_paths:
+        return False
+    if not all(os.path.exists(media_path) for media_path in media_paths):
+        return False
+
+    probes = await asyncio.gather(
+        *[probe_media_async(media_path) for media_path in media_paths]
+    )
+    if any(not probe["video_codec"] for probe in probes):
+        return False
+    signatures = {_get_stream_copy_signature(probe) for probe in probes}
+    return len(signatures) == 1
 
-        logger.error(error_message)
-        raise Exception(error_message)
+
+async def _concatenate_videos_with_stream_copy(
+    input_file: str, target_file_name: str, priority: int = PRIORITY_NORMAL
+):
+    returncode, _, stderr = await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            input_file,
+            "-c",
+            "copy",
+            target_file_name,
+        ],
+        priority=priority,
+        check=False,
+    )
+    if returncode != 0:
+        logger.warning(
+            f"Stream copy concatenation failed, falling back to reencoding: {stderr.decode()}"
+        )
+        return None
 
     return target_file_name
 
@@ -250,15 +654,23 @@ async def concatenate_videos(
     bias=0.33,
     fps=16,
     max_fps=16,
+    allow_stream_copy: bool = True,
+    priority: int = PRIORITY_NORMAL,
 ):
     """
     Concatenate all the videos in the list using a concatenation file
 
+    When no speed change is needed and all the videos share the same encoding parameters,
+    typically because they were all reencoded the same way, the streams are just copied
+    instead of being reencoded
+
     Args:
         input_file (str): The path to the input file
         target_file_name (str): The target file name
         ratioToMultiplyAnimations (int): The ratio to multiply animations
         bias (int): The bias to add to the ratio for the sound to be in sync with video frames
+        allow_stream_copy (bool): Whether to use stream copy when the videos allow it
+        priority (int): The priority of the ffmpeg job, see ffmpeg_executor
 
     Returns:
         str: The path to the concatenated video file
@@ -272,6 +684,20 @@ async def concatenate_videos(
             f"Ratio to multiply animations should be greater than 0. Got {ratioToMultiplyAnimations}"
         )
 
+    if (
+        allow_stream_copy
+        and ratioToMultiplyAnimations == 1
+        and await can_concatenate_with_stream_copy(_read_concat_list_file(input_file))
+    ):
+        logger.debug(f"Concatenating {input_file} with stream copy")
+        concatenated_file = await _concatenate_videos_with_stream_copy(
+            input_file=input_file,
+            target_file_name=target_file_name,
+            priority=priority,
+        )
+        if concatenated_file:
+            return concatenated_file
+
     logger.debug(
         "Merge with ffmpeg command: ffmpeg"
         + " "
@@ -313,49 +739,151 @@ async def concatenate_videos(
     )
 
     # Build the ffmpeg command
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-y",
-        "-f",
-        "concat",
-        "-safe",
-        "0",
-        "-i",
-        input_file,
-        "-vf",
-        f"setpts={1 / ratioToMultiplyAnimations} * N/{fps}/TB + STARTPTS,fps={fps}",  #
-        "-c:v",
-        "libx264",
-        "-crf",
-        "23",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "192k",
-        target_file_name,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            input_file,
+            "-vf",
+            f"setpts={1 / ratioToMultiplyAnimations} * N/{fps}/TB + STARTPTS,fps={fps}",  #
+            "-c:v",
+            "libx264",
+            "-crf",
+            "23",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "192k",
+            target_file_name,
+        ],
+        priority=priority,
     )
-    stdout, stderr = await process.communicate()
-
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
+
+    return target_file_name  #
+
+
+def _get_atempo_filters(speed_ratio: float):
+    """
+    Get the atempo filters changing the audio speed by the given ratio, chained as
+    a single atempo filter only accepts ratios between 0.5 and 2
+    """
+    filters = []
+    while speed_ratio > 2.0:
+        filters.append("atempo=2.0")
+        speed_ratio /= 2.0
+    while speed_ratio < 0.5:
+        filters.append("atempo=0.5")
+        speed_ratio /= 0.5
+    filters.append(f"atempo={speed_ratio}")
+    return filters
+
+
+async def render_edit_decision_list(
+    segments: list,
+    target_file_name=None,
+    fps=None,
+    priority: int = PRIORITY_NORMAL,
+    retime_audio: bool = False,
+):
+    """
+    Render a list of media segments, each played at its own speed, as a single video
+    encoded once
+
+    Like concatenate_videos, only the video is sped up by default: the audio of each segment
+    keeps its own speed, padded with silence or cut to the duration of the segment so the
+    next segments stay in sync
+
+    Args:
+        segments (list): The (media path, speed ratio) tuples to render, in order
+        target_file_name (str): The target file name
+        fps (float): The frame rate of the resulting video, defaults to the average frame rate of the segments
+        priority (int): The priority of the ffmpeg job, see ffmpeg_executor
+        retime_audio (bool): Whether to speed the audio of the segments up along with the video
+
+    Returns:
+        str: The path to the rendered video file
+    """
+    if not segments:
+        raise ValueError("At least one segment is required")
+    for _, speed_ratio in segments:
+        if speed_ratio <= 0:
+            raise ValueError(
+                f"Speed ratio should be greater than 0. Got {speed_ratio}"
             )
-        else:
-            error_message = "ffmpeg command failed without error output"
+    target_file_name = (
+        target_file_name if target_file_name is not None else "TargetCompositeVideo.mp4"
+    )
 
-        logger.error(error_message)
-        raise Exception(error_message)
+    probes = await asyncio.gather(
+        *[probe_media_async(media_path) for media_path, _ in segments]
+    )
+    if not fps:
+        fps = sum(probe["fps"] for probe in probes) / len(probes)
+    # Segments are fit in the frame of the first one, as the concat filter needs a single resolution
+    width, height = probes[0]["width"], probes[0]["height"]
+    with_audio = any(probe["has_audio"] for probe in probes)
+
+    inputs = []
+    filters = []
+    concat_inputs = []
+    for index, ((media_path, speed_ratio), probe) in enumerate(zip(segments, probes)):
+        inputs.extend(["-i", media_path])
+        filters.append(
+            f"[{index}:v]setpts=(PTS-STARTPTS)/{speed_ratio},fps={fps},"
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p[v{index}]"
+        )
+        concat_inputs.append(f"[v{index}]")
+        if with_audio:
+            segment_duration = probe["duration"] / speed_ratio
+            if probe["has_audio"]:
+                audio_filters = ["asetpts=PTS-STARTPTS"]
+                if retime_audio:
+                    audio_filters.extend(_get_atempo_filters(speed_ratio))
+                filters.append(
+                    f"[{index}:a]{','.join(audio_filters)},"
+                    "aformat=sample_rates=44100:channel_layouts=stereo,"
+                    f"apad,atrim=duration={segment_duration}[a{index}]"
+                )
+            else:
+                # Silence keeps the audio in sync with the next segments
+                filters.append(
+                    "anullsrc=r=44100:cl=stereo,"
+                    f"atrim=duration={segment_duration}[a{index}]"
+                )
+            concat_inputs.append(f"[a{index}]")
+
+    if with_audio:
+        filters.append(
+            "".join(concat_inputs) + f"concat=n={len(segments)}:v=1:a=1[vout][aout]"
+        )
+    else:
+        filters.append(
+            "".join(concat_inputs) + f"concat=n={len(segments)}:v=1:a=0[vout]"
+        )
 
-    return target_file_name  #
+    command = [
+        "ffmpeg",
+        "-y",
+        *inputs,
+        "-filter_complex",
+        ";".join(filters),
+        "-map",
+        "[vout]",
+    ]
+    if with_audio:
+        command.extend(["-map", "[aout]", "-c:a", "aac", "-b:a", "192k"])
+    command.extend(["-c:v", "libx264", "-crf", "23", target_file_name])
+    logger.debug(f"Edit decision list ffmpeg command: {' '.join(command)}")
+
+    await get_ffmpeg_executor().run(command, priority=priority)
+
+    return target_file_name
 
 
 async def merge_audio(
@@ -380,7 +908,7 @@ async def merge_audio(
     if not target_file_name:
         target_file_name = "merged_audio_video.mp4"
 
-    if has_audio_track(media_url):
+    if await has_audio_track_async(media_url):
         merged_file = await _merge_audio_and_video_with_existing_audio(
             media_url=media_url,
             audio_file_path=audio_file_path,
@@ -418,54 +946,37 @@ async def _merge_audio_and_video_with_existing_audio(
 
     """
 
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-y",
-        "-i",
-        audio_file_path,
-        "-i",
-        media_url,
-        "-filter_complex",
-        f"[0:a]apad,loudnorm,volume={audio_file_relative_volume},aformat=sample_fmts=u8|s16:channel_layouts=stereo[A];[1:a][A]amerge[out]",
-        "-map",
-        "1:v",
-        "-c:v",
-        "libx264",
-        "-profile:v",
-        "baseline",
-        "-level",
-        "3.0",  # This tells FFmpeg to use the H.264 Baseline Profile with a level of 3.0.
-        "-pix_fmt",
-        "yuv420p",  # This tells FFmpeg to use the yuv420p pixel format.
-        "-map",
-        "[out]",
-        "-acodec",
-        "aac",
-        "-ar",
-        "44100",  # This tells FFmpeg to use a sample rate of 44100 Hz for the audio.
-        "-ac",
-        "2",  # This tells FFmpeg to use 2 audio channels.
-        target_file_name,
-        stdout=asyncio.subprocess.PIPE,  # Capture the error output
-        stderr=asyncio.subprocess.PIPE,  # Capture the error output
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            audio_file_path,
+            "-i",
+            media_url,
+            "-filter_complex",
+            f"[0:a]apad,loudnorm,volume={audio_file_relative_volume},aformat=sample_fmts=u8|s16:channel_layouts=stereo[A];[1:a][A]amerge[out]",
+            "-map",
+            "1:v",
+            "-c:v",
+            "libx264",
+            "-profile:v",
+            "baseline",
+            "-level",
+            "3.0",  # This tells FFmpeg to use the H.264 Baseline Profile with a level of 3.0.
+            "-pix_fmt",
+            "yuv420p",  # This tells FFmpeg to use the yuv420p pixel format.
+            "-map",
+            "[out]",
+            "-acodec",
+            "aac",
+            "-ar",
+            "44100",  # This tells FFmpeg to use a sample rate of 44100 Hz for the audio.
+            "-ac",
+            "2",  # This tells FFmpeg to use 2 audio channels.
+            target_file_name,
+        ]
     )
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
-            )
-        else:
-            error_message = "ffmpeg command failed without error output"
-
-        logger.error(error_message)
-        raise Exception(error_message)
     return target_file_name
 
 
@@ -490,57 +1001,39 @@ async def _merge_audio_and_video_without_audio_track(
 
     """
     logger.debug(f"parameters: {media_url}, {audio_file_path}, {target_file_name}")
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-y",
-        "-i",
-        audio_file_path,
-        "-i",
-        media_url,
-        "-filter_complex",
-        f"[0:a]apad,loudnorm,volume={audio_file_relative_volume}[A]",
-        "-shortest",
-        "-map",
-        "1:v",
-        "-c:v",
-        "libx264",
-        "-profile:v",
-        "baseline",
-        "-level",
-        "3.0",
-        "-pix_fmt",
-        "yuv420p",
-        "-map",
-        "[A]",
-        "-acodec",
-        "aac",
-        "-ar",
-        "44100",
-        "-ac",
-        "2",
-        target_file_name,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            audio_file_path,
+            "-i",
+            media_url,
+            "-filter_complex",
+            f"[0:a]apad,loudnorm,volume={audio_file_relative_volume}[A]",
+            "-shortest",
+            "-map",
+            "1:v",
+            "-c:v",
+            "libx264",
+            "-profile:v",
+            "baseline",
+            "-level",
+            "3.0",
+            "-pix_fmt",
+            "yuv420p",
+            "-map",
+            "[A]",
+            "-acodec",
+            "aac",
+            "-ar",
+            "44100",
+            "-ac",
+            "2",
+            target_file_name,
+        ]
     )
 
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
-            )
-        else:
-            error_message = "ffmpeg command failed without error output"
-
-        logger.error(error_message)
-        raise Exception(error_message)
-
     return target_file_name
 
 
@@ -561,51 +1054,126 @@ async def reencode_video(video_url, target_video_name=None):
     if not target_video_name:
         target_video_name = "reencoded_" + get_canonical_name(video_url) + ".mp4"
 
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-y",
-        "-i",
-        video_url,
-        "-filter:v",
-        "fps=24",
-        "-c:v",
-        "libx264",
-        "-profile:v",
-        "baseline",
-        "-level",
-        "3.0",  # This tells FFmpeg to use the H.264 Baseline Profile with a level of 3.0.
-        "-pix_fmt",
-        "yuv420p",  # This tells FFmpeg to use the yuv420p pixel format.
-        "-acodec",
-        "aac",
-        "-ar",
-        "44100",  # This tells FFmpeg to use a sample rate of 44100 Hz for the audio.
-        "-ac",
-        "2",  # This tells FFmpeg to use 2 audio channels.
-        target_video_name,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            video_url,
+            "-filter:v",
+            "fps=24",
+            "-c:v",
+            "libx264",
+            "-profile:v",
+            "baseline",
+            "-level",
+            "3.0",  # This tells FFmpeg to use the H.264 Baseline Profile with a level of 3.0.
+            "-pix_fmt",
+            "yuv420p",  # This tells FFmpeg to use the yuv420p pixel format.
+            "-acodec",
+            "aac",
+            "-ar",
+            "44100",  # This tells FFmpeg to use a sample rate of 44100 Hz for the audio.
+            "-ac",
+            "2",  # This tells FFmpeg to use 2 audio channels.
+            target_video_name,
+        ]
     )
 
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
-            )
-        else:
-            error_message = "ffmpeg command failed without error output"
+    return target_video_name
 
-        logger.error(error_message)
-        raise Exception(error_message)
 
-    return target_video_name
+async def reencode_and_merge_audio(
+    media_url: str,
+    audio_tracks: list = None,
+    reencode: bool = False,
+    target_file_name=None,
+):
+    """
+    Reencode the video and merge several audio tracks with it in a single ffmpeg pass,
+    so the video is decoded and encoded once instead of once per post build step
+
+    The tracks are merged as merge_audio does for each track in turn: every track is padded,
+    normalized and set to its relative volume, then merged with the audio merged so far, the
+    existing audio of the video if any, and mixed down to stereo. Merging pairwise keeps every
+    stage in stereo, where merging all the tracks at once would make a multichannel layout
+    (e.g. 5.1 for 3 tracks) that the final stereo downmix would not mix evenly.
+    The output stops with the video.
+
+    Args:
+        media_url (str): The media url to process
+        audio_tracks (list): The (audio file path, relative volume) tuples to merge, in order
+        reencode (bool): Whether to normalize the video frame rate, as reencode_video does
+        target_file_name (str): The target file name
+
+    Returns:
+        str: The path to the processed video file
+    """
+    if media_url is None:
+        raise ValueError("The video url is not provided")
+    if not target_file_name:
+        target_file_name = "merged_audio_video.mp4"
+    audio_tracks = audio_tracks if audio_tracks else []
+
+    inputs = ["-i", media_url]
+    filters = []
+    video_output = "0:v"
+    if reencode:
+        filters.append("[0:v]fps=24[v]")
+        video_output = "[v]"
+
+    merged_audio_labels = []
+    if await has_audio_track_async(media_url):
+        filters.append("[0:a]aformat=sample_fmts=u8|s16:channel_layouts=stereo[a0]")
+        merged_audio_labels.append("[a0]")
+
+    for index, (audio_file_path, relative_volume) in enumerate(audio_tracks, start=1):
+        inputs.extend(["-i", audio_file_path])
+        filters.append(
+            f"[{index}:a]apad,loudnorm,volume={relative_volume if relative_volume else 1.0},"
+            f"aformat=sample_fmts=u8|s16:channel_layouts=stereo[a{index}]"
+        )
+        merged_audio_labels.append(f"[a{index}]")
+
+    audio_output = merged_audio_labels[0] if merged_audio_labels else None
+    for index, audio_label in enumerate(merged_audio_labels[1:], start=1):
+        filters.append(
+            f"{audio_output}{audio_label}amerge=inputs=2,"
+            f"pan=stereo|c0<c0+c2|c1<c1+c3[m{index}]"
+        )
+        audio_output = f"[m{index}]"
+
+    command = ["ffmpeg", "-y", *inputs]
+    if filters:
+        command.extend(["-filter_complex", ";".join(filters)])
+    command.extend(["-map", video_output])
+    if audio_output:
+        command.extend(["-map", audio_output])
+    command.extend(
+        [
+            "-shortest",
+            "-c:v",
+            "libx264",
+            "-profile:v",
+            "baseline",
+            "-level",
+            "3.0",
+            "-pix_fmt",
+            "yuv420p",
+            "-acodec",
+            "aac",
+            "-ar",
+            "44100",
+            "-ac",
+            "2",
+            target_file_name,
+        ]
+    )
+    logger.debug(f"Fused post build ffmpeg command: {' '.join(command)}")
+
+    await get_ffmpeg_executor().run(command)
+
+    return target_file_name
 
 
 async def get_first_frame_as_image_ffmpeg(media_url, target_path=None):
@@ -614,38 +1182,20 @@ async def get_first_frame_as_image_ffmpeg(media_url, target_path=None):
     """
     assert media_url, "no media URL provided"
 
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-i",
-        media_url,
-        "-vf",
-        "select=eq(n\\,0)",  # It is a video filter that selects the frames to extract
-        #  eq(n\\,0) means it selects the frame where n (the frame number) is equal to 0, in other word, the first frame.
-        "-vframes",  # Specifies the number of video frames to output.
-        "1",  # We want one single frame
-        target_path,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-i",
+            media_url,
+            "-vf",
+            "select=eq(n\\,0)",  # It is a video filter that selects the frames to extract
+            #  eq(n\\,0) means it selects the frame where n (the frame number) is equal to 0, in other word, the first frame.
+            "-vframes",  # Specifies the number of video frames to output.
+            "1",  # We want one single frame
+            target_path,
+        ]
     )
 
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
-            )
-        else:
-            error_message = "ffmpeg command failed without error output"
-
-        logger.error(error_message)
-        raise Exception(error_message)
-
     return target_path
 
 
@@ -655,37 +1205,19 @@ async def get_last_frame_as_image_ffmpeg(media_url, target_path=None):
     """
     assert media_url, "no media URL provided"
 
-    process = await asyncio.create_subprocess_exec(
-        "ffmpeg",
-        "-sseof",  # Specifies that it should start x seconds from the end of the file
-        "-3",  # We want the last 3 seconds.
-        "-i",
-        media_url,
-        "-update",  # Means that it should update the output image if a new frame is available
-        "1",  # We want one single frame
-        "-q:v",  # -q:v 1  specifies the quality of the output image (1 being the best quality).
-        "1",
-        target_path,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await get_ffmpeg_executor().run(
+        [
+            "ffmpeg",
+            "-sseof",  # Specifies that it should start x seconds from the end of the file
+            "-3",  # We want the last 3 seconds.
+            "-i",
+            media_url,
+            "-update",  # Means that it should update the output image if a new frame is available
+            "1",  # We want one single frame
+            "-q:v",  # -q:v 1  specifies the quality of the output image (1 being the best quality).
+            "1",
+            target_path,
+        ]
     )
 
-    stdout, stderr = await process.communicate()
-    if process.returncode != 0:
-        error_messages = []
-        if stdout:
-            error_messages.append(f"stdout: {stdout.decode()}")
-        if stderr:
-            error_messages.append(f"stderr: {stderr.decode()}")
-
-        if error_messages:
-            error_message = "ffmpeg command failed with: " + " and ".join(
-                error_messages
-            )
-        else:
-            error_message = "ffmpeg command failed without error output"
-
-        logger.error(error_message)
-        raise Exception(error_message)
-
     return target_path